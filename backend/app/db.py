@@ -16,4 +16,7 @@ Base = declarative_base()
 async def init_db():
     async with engine.begin() as conn:
         # 모든 테이블 생성
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+        # 기존 테이블에 추가된 컬럼/인덱스 반영
+        from app.schema_upgrade import upgrade_schema
+        await conn.run_sync(upgrade_schema)
\ No newline at end of file
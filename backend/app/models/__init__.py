@@ -6,5 +6,9 @@ from .user import User
 from .document import Document
 from .sign import Sign
 from .document_signer import DocumentSigner
+from .blob import Blob
+from .upload_session import UploadSession
+from .document_page import DocumentPage
+from .generated_sign import GeneratedSign
 
-__all__ = ["Base", "User", "Document", "Sign", "DocumentSigner"]
\ No newline at end of file
+__all__ = ["Base", "User", "Document", "Sign", "DocumentSigner", "Blob", "UploadSession", "DocumentPage", "GeneratedSign"]
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from datetime import datetime
+from ..db import Base
+
+
+class Blob(Base):
+    """내용(SHA-256) 기준으로 저장되는 불변 파일, 여러 문서가 공유"""
+    __tablename__ = "blobs"
+
+    digest = Column(String(64), primary_key=True)  # SHA-256 (hex)
+    file_path = Column(Text, nullable=False)  # 파일 저장 경로
+    file_size = Column(Integer, nullable=False)  # 파일 크기 (bytes)
+    ref_count = Column(Integer, nullable=False, default=1)  # 참조 중인 문서 수
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # 참조가 0이 된 이전 revision - 유예 기간 동안 URL 유지 후 정리 작업이 삭제 (null이면 사용 중)
+    released_at = Column(DateTime, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<Blob(digest='{self.digest}', ref_count={self.ref_count})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..db import Base
@@ -6,6 +6,8 @@ from ..db import Base
 
 class Document(Base):
     __tablename__ = "documents"
+    # 내 문서 목록 keyset 페이지네이션 (uploader_id, uploaded_at, id 순서로 바로 읽음)
+    __table_args__ = (Index("ix_documents_uploader_listing", "uploader_id", "uploaded_at", "id"),)
     
     id = Column(Integer, primary_key=True, index=True)
     uploader_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -15,11 +17,18 @@ class Document(Base):
     file_size = Column(Integer)  # 파일 크기 (bytes)
     mime_type = Column(String(100))  # MIME 타입
     file_url = Column(Text, nullable=False)   # 파일 접근 URL
+    blob_digest = Column(String(64), ForeignKey("blobs.digest"), nullable=True, index=True)  # 공유 blob (없으면 기존 단독 파일)
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # PDF 구조 정보 (업로드 후 백그라운드에서 분석, is_encrypted가 null이면 아직 분석 전)
+    page_count = Column(Integer, nullable=True)
+    is_encrypted = Column(Boolean, nullable=True)
+    is_linearized = Column(Boolean, nullable=True)
     
     # 관계 설정 활성화
     uploader = relationship("User", back_populates="documents")
     signers = relationship("DocumentSigner", back_populates="document", cascade="all, delete-orphan")
+    pages = relationship("DocumentPage", back_populates="document", cascade="all, delete-orphan", order_by="DocumentPage.page_number")
     
     def __repr__(self):
         return f"<Document(id={self.id}, filename='{self.original_filename}', uploader_id={self.uploader_id})>"
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from ..db import Base
+
+
+class DocumentPage(Base):
+    """업로드 시 한 번 분석해 둔 PDF 페이지 정보 (페이지 크기는 points 단위)"""
+    __tablename__ = "document_pages"
+    __table_args__ = (UniqueConstraint("document_id", "page_number"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    page_number = Column(Integer, nullable=False)  # 1부터 시작
+    width = Column(Float, nullable=False)  # mediabox 너비
+    height = Column(Float, nullable=False)  # mediabox 높이
+    rotation = Column(Integer, nullable=False, default=0)  # /Rotate (0, 90, 180, 270)
+
+    document = relationship("Document", back_populates="pages")
@@ -5,7 +5,7 @@ from ..db import Base
 class DocumentSigner(Base):
     __tablename__ = "document_signers"
     id = Column(Integer, primary_key=True, index=True)
-    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     email = Column(String(255), nullable=True)
     role = Column(String(255), nullable=True)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
+from datetime import datetime
+from ..db import Base
+
+
+class GeneratedSign(Base):
+    """AI로 생성한 서명 이미지 캐시 (후처리까지 끝난 PNG를 저장소에 보관)"""
+    __tablename__ = "generated_signs"
+    __table_args__ = (
+        # (사용자, 이름, 스타일)별 variant 조회 + LRU 정리
+        Index("ix_generated_signs_lookup", "user_id", "name_key", "style", "last_used_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    name_key = Column(String(100), nullable=False)  # 공백을 정리한 이름
+    style = Column(String(32), nullable=False)  # 서명 스타일 (ballpoint 등)
+    digest = Column(String(64), nullable=False)  # PNG 내용 SHA-256 (같은 variant 중복 저장 방지)
+    file_path = Column(Text, nullable=False)  # 저장소 키
+    file_size = Column(Integer, nullable=False)  # 파일 크기 (bytes)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # 마지막으로 응답한 시각 (LRU/TTL 기준)
+    served_at = Column(DateTime, nullable=True)  # null이면 미리 만들어 두고 아직 보여주지 않은 variant
+
+    def __repr__(self):
+        return f"<GeneratedSign(id={self.id}, user_id={self.user_id}, name_key='{self.name_key}', style='{self.style}')>"
@@ -1,16 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..db import Base
 
 class Sign(Base):
     __tablename__ = "signs"
+    # 내 서명 목록 keyset 페이지네이션
+    __table_args__ = (Index("ix_signs_user_listing", "user_id", "uploaded_at", "id"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     stored_filename = Column(String(255), unique=True, nullable=False)
     file_url = Column(Text, nullable=False)   # 파일 접근 URL
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    strokes = Column(Text, nullable=True)  # 벡터 서명 stroke 좌표 (JSON), 이미지 서명은 null
+    # 저장된 서명의 픽셀 크기 (이미지 서명은 잉크 영역으로 자른 뒤 크기, 벡터 서명은 패드 크기), 이전 서명은 null
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    aspect_ratio = Column(Float, nullable=True)  # width / height - 서명 배치 영역 비율 계산용
     
     # 관계 설정
     user = relationship("User", back_populates="signs")
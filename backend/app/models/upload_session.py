@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from datetime import datetime
+from ..db import Base
+
+
+class UploadSession(Base):
+    """이어 올리기(resumable) 업로드 세션 - 완료 전까지 청크는 spool 영역에 저장"""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    uploader_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    original_filename = Column(String(255), nullable=False)
+    total_size = Column(Integer, nullable=False)  # 전체 파일 크기 (bytes)
+    committed_offset = Column(Integer, nullable=False, default=0)  # 저장 완료된 바이트 수
+    chunk_count = Column(Integer, nullable=False, default=0)  # 저장 완료된 청크 수 (다음 청크 번호)
+    signers = Column(Text)  # JSON 형식의 구성원 정보
+    spool_path = Column(Text, nullable=False)  # 임시 파일 경로
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # 마지막 활동 + TTL
+
+    def __repr__(self):
+        return f"<UploadSession(id='{self.id}', committed_offset={self.committed_offset}/{self.total_size})>"
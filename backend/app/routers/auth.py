@@ -3,8 +3,9 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
 from dotenv import load_dotenv
-import requests
 from app.services.user import create_or_update_user, get_user_by_id
+from app.services.principal_cache import principal_cache, token_digest
+from app.services.google_oauth import google_oauth, GoogleOAuthError
 from app.dependencies.database import get_db
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
@@ -36,31 +37,53 @@ async def get_current_user_from_cookie(
     request: Request,
     db: AsyncSession = Depends(get_db)  # dependency injection 추가
 ):
-    """쿠키에서 JWT 토큰을 읽어 DB에서 사용자 정보를 반환하는 함수"""
+    """
+    쿠키에서 JWT 토큰을 읽어 DB에서 사용자 정보를 반환하는 함수
+    검증한 토큰과 사용자 정보는 principal_cache에 잠시 보관 (캐시에 있으면 JWT 검증/DB 조회 생략)
+    """
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated"
         )
-    
-    payload = verify_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    
-    # JWT에서 user_id 추출
-    user_id = payload.get("sub")
-    if not user_id:
+
+    # 이미 검증에 실패했던 토큰은 바로 거부
+    digest = token_digest(token)
+    bad_token_detail = principal_cache.get_bad_token(digest)
+    if bad_token_detail:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload"
+            detail=bad_token_detail
         )
-    
+
+    user_id = principal_cache.get_token(digest)
+    if user_id is None:
+        payload = verify_token(token)
+        if payload is None:
+            principal_cache.put_bad_token(digest, "Invalid token")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+
+        # JWT에서 user_id 추출
+        sub = payload.get("sub")
+        if not sub or not str(sub).isdigit():
+            principal_cache.put_bad_token(digest, "Invalid token payload")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token payload"
+            )
+        user_id = int(sub)
+        principal_cache.put_token(digest, user_id, payload.get("exp"))
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
     # DB에서 사용자 정보 조회 (dependency injection 사용)
-    user = await get_user_by_id(db, int(user_id))
+    user = await get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -68,13 +91,27 @@ async def get_current_user_from_cookie(
             detail="User not found"
         )
     
-    return {
+    principal = {
         "id": user.id,
         "email": user.email,
         "name": user.name,
         "picture": user.picture,
         "created_at": user.created_at.isoformat() if user.created_at else None
     }
+    principal_cache.put(user_id, principal)
+    return principal
+
+async def get_optional_user_from_cookie(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """비로그인 사용자도 호출하는 API용 - 로그인하지 않았거나 토큰이 유효하지 않으면 None"""
+    if not request.cookies.get("access_token"):
+        return None
+    try:
+        return await get_current_user_from_cookie(request, db)
+    except HTTPException:
+        return None
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     if not SECRET_KEY:
@@ -134,21 +171,18 @@ async def google_auth_callback(
     db: AsyncSession = Depends(get_db)  # dependency injection 추가
 ):
     """구글 로그인 콜백"""
-    token_url = "https://oauth2.googleapis.com/token"
-    data = {
-        "code": code,
-        "client_id": GOOGLE_CLIENT_ID,
-        "client_secret": GOOGLE_CLIENT_SECRET,
-        "redirect_uri": REDIRECT_URI,
-        "grant_type": "authorization_code",
-    }
-    token_response = requests.post(token_url, data=data).json()
-    access_token = token_response.get("access_token")
-
-    user_info = requests.get(
-        "https://www.googleapis.com/oauth2/v2/userinfo",
-        headers={"Authorization": f"Bearer {access_token}"}
-    ).json()
+    # 공유 비동기 클라이언트로 토큰 교환 + 사용자 정보 조회 (이벤트 루프를 막지 않음)
+    try:
+        token_response = await google_oauth.exchange_code(
+            code, GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, REDIRECT_URI
+        )
+        user_info = await google_oauth.fetch_userinfo(token_response["access_token"])
+    except GoogleOAuthError as e:
+        print(f"구글 로그인 실패: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="구글 로그인에 실패했습니다. 잠시 후 다시 시도해주세요."
+        )
 
     # DB에 사용자 정보 저장 (dependency injection 사용)
     user = await create_or_update_user(db, user_info)
@@ -1,19 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, exists, and_, not_
+from sqlalchemy.orm import selectinload
+import hashlib
 import os
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional, Literal
+import json
+from starlette.concurrency import run_in_threadpool
 from app.dependencies.database import get_db
 from app.models import Document, Sign, DocumentSigner
-from app.routers.auth import get_current_user_from_cookie
-import base64
-import io
-from PyPDF2 import PdfWriter,PdfReader as RLReader
-from PIL import Image
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.utils import ImageReader
+from app.routers.auth import get_current_user_from_cookie, get_optional_user_from_cookie
+from app.services.blob import release_document_file, remove_released_files
+from app.services.signing import signing_coordinator, AlreadySignedError, DocumentNotFoundError
+from app.services.stamping import StampTimeoutError
+from app.services.document_structure import ensure_document_structure, document_structure_info
+from app.services.vector_sign import normalize_vector_sign, InvalidVectorSignError
+from app.services.sign_image import check_sign_payload, InvalidSignImageError
+from app.services.file_response import is_not_modified, not_modified_response
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page, split_page
 
 
 router = APIRouter(prefix="/documents", tags=["documents"])
@@ -22,7 +29,9 @@ class SignerStatusUpdate(BaseModel):
     is_signed: bool
     
 class SignInfo(BaseModel):
-       base64: str
+       base64: Optional[str] = None  # PNG 서명 (data URL 또는 base64)
+       strokes: Optional[dict] = None  # 벡터 서명 stroke 데이터 ({"width", "height", "strokes"})
+       sign_filename: Optional[str] = None  # 저장된 벡터 서명 파일명 (strokes 대신 사용)
        x: float
        y: float
        width: float
@@ -31,51 +40,95 @@ class SignInfo(BaseModel):
 
 @router.get("/",responses={
         200: {
-            "description": "현재 로그인한 사용자가 업로드한 파일들 목록 예시",
+            "description": "현재 로그인한 사용자가 업로드한 파일들 목록 예시 (최신순, 다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 반환)",
             "content": {
                 "application/json": {
                     "example": [
   {
     "original_filename": "[별지 12] 개인정보 수집&middot%3B이용&middot%3B제공 동의서(개인투자조합 등록 및 투자확인….pdf",
-    "doc_filename": "9140fff4-b53c-4e10-aa12-914abb4e818e.pdf",
-    "file_url": "/resources/docs/9140fff4-b53c-4e10-aa12-914abb4e818e.pdf",
-    "uploaded_at": "2025-07-13T06:30:36.440971",
+    "doc_filename": "85479f10-e2c4-4f9c-82a8-0839841cdf57.pdf",
+    "file_url": "/resources/docs/9c/0e/9c0e4f3b2a1d5e6f708192a3b4c5d6e7f8091a2b3c4d5e6f708192a3b4c5d6e7.pdf",
+    "uploaded_at": "2025-07-13T08:05:51.085329",
     "file_size": 52206,
-    "mime_type": "application/pdf"
+    "mime_type": "application/pdf",
+    "signer_count": 2,
+    "signed_count": 2
   },
   {
     "original_filename": "[별지 12] 개인정보 수집&middot%3B이용&middot%3B제공 동의서(개인투자조합 등록 및 투자확인….pdf",
-    "doc_filename": "85479f10-e2c4-4f9c-82a8-0839841cdf57.pdf",
-    "file_url": "/resources/docs/85479f10-e2c4-4f9c-82a8-0839841cdf57.pdf",
-    "uploaded_at": "2025-07-13T08:05:51.085329",
+    "doc_filename": "9140fff4-b53c-4e10-aa12-914abb4e818e.pdf",
+    "file_url": "/resources/docs/62/68/62686c8f18dc6aeacd5e00fca1619466dcce42ec6cb4606d314598619c425b8d.pdf",
+    "uploaded_at": "2025-07-13T06:30:36.440971",
     "file_size": 52206,
-    "mime_type": "application/pdf"
+    "mime_type": "application/pdf",
+    "signer_count": 3,
+    "signed_count": 1
   }]
                 }
             }
         }})
 async def get_my_documents(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="한 페이지 문서 수"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    status: Optional[Literal["completed", "pending"]] = Query(None, description="completed: 모두 서명 완료, pending: 서명 대기 중인 signer 있음"),
     current_user: dict = Depends(get_current_user_from_cookie),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    로그인한 사용자가 업로드한 문서 목록 반환
+    로그인한 사용자가 업로드한 문서 목록 반환 (최신순, 커서 기반 페이지네이션)
+    응답에 필요한 컬럼만 조회하고, 서명 진행 상황과 상태 필터는 SQL에서 계산
     """
-    result = await db.execute(
-        select(Document).where(Document.uploader_id == current_user["id"])
+    signer_count = (
+        select(func.count(DocumentSigner.id))
+        .where(DocumentSigner.document_id == Document.id)
+        .scalar_subquery()
     )
-    documents = result.scalars().all()
-    # 원하는 필드만 추려서 반환
+    signed_count = (
+        select(func.count(DocumentSigner.id))
+        .where(DocumentSigner.document_id == Document.id, DocumentSigner.is_signed == True)
+        .scalar_subquery()
+    )
+    has_unsigned = exists().where(
+        DocumentSigner.document_id == Document.id,
+        DocumentSigner.is_signed.is_not(True)
+    )
+
+    query = select(
+        Document.id,
+        Document.original_filename,
+        Document.stored_filename,
+        Document.file_url,
+        Document.uploaded_at,
+        Document.file_size,
+        Document.mime_type,
+        signer_count.label("signer_count"),
+        signed_count.label("signed_count"),
+    ).where(Document.uploader_id == current_user["id"])
+    if status == "pending":
+        query = query.where(has_unsigned)
+    elif status == "completed":
+        query = query.where(and_(
+            exists().where(DocumentSigner.document_id == Document.id),
+            not_(has_unsigned)
+        ))
+
+    result = await db.execute(keyset_page(query, Document.uploaded_at, Document.id, cursor, limit))
+    rows, next_cursor = split_page(result.all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
-            "original_filename": doc.original_filename,
-            "doc_filename": doc.stored_filename,
-            "file_url": doc.file_url,
-            "uploaded_at": doc.uploaded_at,
-            "file_size": doc.file_size,
-            "mime_type": doc.mime_type,
+            "original_filename": row.original_filename,
+            "doc_filename": row.stored_filename,
+            "file_url": row.file_url,
+            "uploaded_at": row.uploaded_at,
+            "file_size": row.file_size,
+            "mime_type": row.mime_type,
+            "signer_count": row.signer_count,
+            "signed_count": row.signed_count,
         }
-        for doc in documents
+        for row in rows
     ]
 @router.get("/{doc_filename}",responses={
     200:{
@@ -86,10 +139,17 @@ async def get_my_documents(
                     "message": "문서 조회 성공",
                     "doc_filename": "9140fff4-b53c-4e10-aa12-914abb4e818e.pdf",
                     "original_filename": "[별지 12] 개인정보 수집&middot%3B이용&middot%3B제공 동의서(개인투자조합 등록 및 투자확인….pdf",
-                    "file_url": "/resources/docs/9140fff4-b53c-4e10-aa12-914abb4e818e.pdf",
+                    "file_url": "/resources/docs/62/68/62686c8f18dc6aeacd5e00fca1619466dcce42ec6cb4606d314598619c425b8d.pdf",
                     "uploaded_at": "2025-07-13T06:30:36.440971",
                     "file_size": 52206,
-                    "mime_type": "application/pdf"
+                    "mime_type": "application/pdf",
+                    "page_count": 2,
+                    "is_encrypted": False,
+                    "is_linearized": False,
+                    "pages": [
+                        {"num_page": 1, "width": 595.28, "height": 841.89, "rotation": 0},
+                        {"num_page": 2, "width": 841.89, "height": 595.28, "rotation": 90}
+                    ]
                 }
             }
         }
@@ -99,7 +159,7 @@ async def get_document(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    문서 조회
+    문서 조회 (페이지 수, 페이지별 크기/회전 등 PDF 구조 정보 포함)
     """
     result = await db.execute(
         select(Document).where(Document.stored_filename == doc_filename)
@@ -107,6 +167,14 @@ async def get_document(
     document = result.scalar_one_or_none()
     if not document:
         raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다.")
+    # 업로드 직후 백그라운드 분석이 아직 끝나지 않았거나 이전에 올린 문서면 여기서 분석
+    try:
+        pages = await ensure_document_structure(db, document)
+    except Exception as e:
+        print(f"문서 구조 분석 실패: {e}")
+        await db.rollback()
+        await db.refresh(document)
+        pages = []
     return {
         "message": "문서 조회 성공",
         "doc_filename": document.stored_filename,
@@ -114,8 +182,140 @@ async def get_document(
         "file_url": document.file_url,
         "uploaded_at": document.uploaded_at,
         "file_size": document.file_size,
-        "mime_type": document.mime_type
+        "mime_type": document.mime_type,
+        **document_structure_info(document, pages)
+    }
+
+def _view_etag(file_url: str, page_count: Optional[int], is_encrypted: Optional[bool], signer_states) -> str:
+    """
+    문서 화면 버전 - revision(file_url, 내용 해시 포함), 구조 분석 결과, signer별 서명 여부가 바뀌면 달라짐
+    signer_states: signer id 순으로 정렬된 (signer_id, is_signed) 목록
+    """
+    h = hashlib.sha256(f"{file_url}|{page_count}|{is_encrypted}".encode())
+    for signer_id, is_signed in signer_states:
+        h.update(f"|{signer_id}:{int(bool(is_signed))}".encode())
+    return f'W/"{h.hexdigest()[:32]}"'
+
+
+async def _current_view_etag(db: AsyncSession, doc_filename: str) -> str:
+    """변경 확인용 가벼운 조회 (문서/signer 행 전체를 읽지 않고 ETag 계산에 쓰는 컬럼만)"""
+    result = await db.execute(
+        select(Document.file_url, Document.page_count, Document.is_encrypted, DocumentSigner.id, DocumentSigner.is_signed)
+        .outerjoin(DocumentSigner, DocumentSigner.document_id == Document.id)
+        .where(Document.stored_filename == doc_filename)
+        .order_by(DocumentSigner.id)
+    )
+    rows = result.all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다.")
+    first = rows[0]
+    return _view_etag(
+        first.file_url, first.page_count, first.is_encrypted,
+        [(row.id, row.is_signed) for row in rows if row.id is not None]
+    )
+
+
+@router.api_route("/{doc_filename}/view", methods=["GET", "HEAD"], responses={
+    200:{
+        "description":"문서 정보 + 서명자 목록 + 서명 진행 상황 (ETag 포함, HEAD는 본문 없이 ETag만)",
+        "content":{
+            "application/json":{
+                "example":{
+                    "message": "문서 조회 성공",
+                    "doc_filename": "9140fff4-b53c-4e10-aa12-914abb4e818e.pdf",
+                    "original_filename": "[별지 12] 개인정보 수집&middot%3B이용&middot%3B제공 동의서(개인투자조합 등록 및 투자확인….pdf",
+                    "file_url": "/resources/docs/62/68/62686c8f18dc6aeacd5e00fca1619466dcce42ec6cb4606d314598619c425b8d.pdf",
+                    "uploaded_at": "2025-07-13T06:30:36.440971",
+                    "file_size": 52206,
+                    "mime_type": "application/pdf",
+                    "page_count": 1,
+                    "is_encrypted": False,
+                    "is_linearized": False,
+                    "pages": [
+                        {"num_page": 1, "width": 595.28, "height": 841.89, "rotation": 0}
+                    ],
+                    "signers": [
+                        {"signer_id": 6, "name": "홍길동", "email": "hong@example.com", "role": "대표", "is_signed": True},
+                        {"signer_id": 7, "name": "김철수", "email": "kim@example.com", "role": "부장", "is_signed": False}
+                    ],
+                    "progress": {"signed": 1, "total": 2, "completed": False}
+                }
+            }
+        }
+    },
+    304:{"description":"If-None-Match의 ETag와 같음 (변경 없음)"}
+})
+async def get_document_view(
+    doc_filename: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    문서 화면에 필요한 정보를 한 번에 반환 (GET /{doc_filename} + GET /{doc_filename}/signer)
+    변경 확인(polling)은 HEAD 또는 If-None-Match로 - 바뀌지 않았으면 가벼운 조회 한 번으로 304
+    """
+    headers = {"Cache-Control": "no-cache"}
+    if request.method == "HEAD" or "if-none-match" in request.headers:
+        etag = await _current_view_etag(db, doc_filename)
+        headers["ETag"] = etag
+        if is_not_modified(request.headers, etag, None):
+            return not_modified_response(headers)
+        if request.method == "HEAD":
+            return Response(headers=headers)
+
+    # 문서와 signer, 페이지 정보를 한 번에 로드
+    result = await db.execute(
+        select(Document)
+        .options(selectinload(Document.signers), selectinload(Document.pages))
+        .where(Document.stored_filename == doc_filename)
+    )
+    document = result.scalar_one_or_none()
+    if not document:
+        raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다.")
+    pages = list(document.pages)
+    # 구조 분석 실패 시 rollback으로 객체가 만료되므로 signer 정보는 먼저 꺼내둠
+    signers = [
+        {
+            "signer_id": signer.id,
+            "name": signer.name,
+            "email": signer.email,
+            "role": signer.role,
+            "is_signed": signer.is_signed
+        }
+        for signer in sorted(document.signers, key=lambda signer: signer.id)
+    ]
+    if document.is_encrypted is None:
+        # 아직 구조 분석 전 - GET /{doc_filename}과 같이 여기서 분석
+        try:
+            pages = await ensure_document_structure(db, document)
+        except Exception as e:
+            print(f"문서 구조 분석 실패: {e}")
+            await db.rollback()
+            await db.refresh(document)
+            pages = []
+
+    signed = sum(1 for signer in signers if signer["is_signed"])
+    headers["ETag"] = _view_etag(
+        document.file_url, document.page_count, document.is_encrypted,
+        [(signer["signer_id"], signer["is_signed"]) for signer in signers]
+    )
+    body = {
+        "message": "문서 조회 성공",
+        "doc_filename": document.stored_filename,
+        "original_filename": document.original_filename,
+        "file_url": document.file_url,
+        "uploaded_at": document.uploaded_at,
+        "file_size": document.file_size,
+        "mime_type": document.mime_type,
+        **document_structure_info(document, pages),
+        "signers": signers,
+        "progress": {
+            "signed": signed,
+            "total": len(signers),
+            "completed": len(signers) > 0 and signed == len(signers)
+        }
     }
+    return JSONResponse(content=jsonable_encoder(body), headers=headers)
 
 @router.delete("/{doc_filename}",responses={
     200:{
@@ -148,14 +348,13 @@ async def delete_document(
     if document.uploader_id != current_user["id"]:
         raise HTTPException(status_code=403, detail="본인이 업로드한 문서만 삭제할 수 있습니다.")
 
-    # 파일 삭제
-    file_path = document.file_path
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    # blob 참조 해제 (마지막 참조일 때만 파일 삭제)
+    garbage = await release_document_file(db, document)
 
     # DB에서 삭제
     await db.delete(document)
     await db.commit()
+    await remove_released_files(garbage)
 
     return {"message": "문서 삭제 성공", "deleted_filename": doc_filename}
 
@@ -167,7 +366,8 @@ async def delete_document(
         "content":{
             "application/json":{
                 "example":{
-                    "message": "문서에 서명 삽입 성공"
+                    "message": "문서에 서명 삽입 성공",
+                    "file_url": "/resources/docs/3f/a1/3fa1c2d4e5b6a7980f1e2d3c4b5a69788796a5b4c3d2e1f00f1e2d3c4b5a6978.pdf"
                 }
             }
         }
@@ -176,10 +376,11 @@ async def insert_sign_to_document(
     doc_filename: str,
     signer_id: int,
     signs: List[SignInfo] = Body(...,description="서명 삽입 정보"),
+    current_user: Optional[dict] = Depends(get_optional_user_from_cookie),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    문서에 서명 삽입 (doc_filename, signer_id, [base 64 ,위치값과 비율, 페이지번호] 필요)
+    문서에 서명 삽입 (doc_filename, signer_id, [base 64 또는 벡터 stroke ,위치값과 비율, 페이지번호] 필요)
     """
     result = await db.execute(
         select(Document).where(Document.stored_filename == doc_filename)
@@ -199,68 +400,67 @@ async def insert_sign_to_document(
     if not signer:
         raise HTTPException(status_code=404, detail="해당 signer를 찾을 수 없습니다.")
 
-    # 3. is_signed 값 변경
-    if signer.is_signed == False:
-        signer.is_signed = True;
-    else:
+    # 3. 이미 서명한 signer는 바로 거절 (동시 요청은 coordinator에서 한 번 더 확인)
+    if signer.is_signed:
         raise HTTPException(status_code=400, detail="이미 서명된 문서입니다.")
-    
-    await db.commit()
-    await db.refresh(signer)
 
-    reader = RLReader("resources/docs/" + doc_filename)
-    writer = PdfWriter()
-    for page_num in range(len(reader.pages)):
-        page = reader.pages[page_num]
-        page_signs = [s for s in signs if s.num_page == page_num + 1]
-        if not page_signs:
-            writer.add_page(page)
-            continue
-
-        packet = io.BytesIO()
-        # PDF 페이지 크기 가져오기 (points 단위)
-        width = float(page.mediabox.width)
-        height = float(page.mediabox.height)
-        can = canvas.Canvas(packet, pagesize=(width, height))
-
-        for sign in page_signs:
-            # base64 → PIL 이미지 변환
-            img_data = base64.b64decode(sign.base64.split(',')[-1])
-            img = Image.open(io.BytesIO(img_data))
-
-            # 좌표/크기 변환 (PDF 좌표계: 좌하단 0,0)
-            # sign['x'], sign['y'], sign['width'], sign['height']는 PDF 좌표계 기준이어야 함
-            # 만약 퍼센트(0~100)라면 변환 필요
-            pdf_w = float(page.mediabox.width)
-            pdf_h = float(page.mediabox.height)
-
-            x = sign.x * pdf_w/100   
-            w = sign.width * pdf_w/100
-            h = sign.height * pdf_h/100
-            y = pdf_h - sign.y * pdf_h/100 - h
-
-            # reportlab은 좌하단 기준, y좌표 변환 필요
-            can.drawImage(ImageReader(img), x, y, w, h, mask='auto')
-
-        can.save()
-        packet.seek(0)
-
-        # 임시 PDF를 PyPDF2로 읽어서 원본 페이지에 merge
-        
-        overlay = RLReader(packet)
-        page.merge_page(overlay.pages[0])
-        writer.add_page(page)
-
-    # 5. 저장
-    with open("resources/docs/" + doc_filename, "wb") as f:
-        writer.write(f)
-    
-    
-
-    
+    # 4. 서명 데이터 확인 (벡터 서명은 stroke 좌표를 정규화해서 경로로 그림)
+    sign_data = []
+    for sign in signs:
+        item = sign.model_dump()
+        if sign.sign_filename and not sign.strokes:
+            # 본인 서명만 사용 가능 (비로그인 사용자는 user_id가 없는 게스트 서명만)
+            owner = Sign.user_id == current_user["id"] if current_user else Sign.user_id.is_(None)
+            result = await db.execute(
+                select(Sign).where(Sign.stored_filename == sign.sign_filename, owner)
+            )
+            stored_sign = result.scalar_one_or_none()
+            if not stored_sign or not stored_sign.strokes:
+                raise HTTPException(status_code=404, detail="벡터 서명을 찾을 수 없습니다.")
+            item["strokes"] = json.loads(stored_sign.strokes)
+        elif sign.strokes:
+            try:
+                item["strokes"] = normalize_vector_sign(sign.strokes)
+            except InvalidVectorSignError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        elif sign.base64:
+            # 잘못된 이미지가 다른 요청과 묶여 함께 실패하지 않도록 coordinator에 넘기기 전에 확인
+            try:
+                await run_in_threadpool(check_sign_payload, sign.base64)
+            except InvalidSignImageError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            raise HTTPException(status_code=400, detail="서명 이미지(base64) 또는 벡터 서명(strokes)이 필요합니다.")
+        sign_data.append(item)
+
+    # 5. 페이지 번호 검증 (업로드 시 분석해 둔 페이지 수 사용)
+    document_id, signer_id = document.id, signer.id
+    try:
+        await ensure_document_structure(db, document)
+        page_count = document.page_count
+    except Exception:
+        await db.rollback()
+        page_count = None
+    if page_count:
+        for sign in signs:
+            if not 1 <= sign.num_page <= page_count:
+                raise HTTPException(status_code=400, detail=f"페이지 번호가 올바르지 않습니다. (1~{page_count})")
+
+    # 6. 같은 문서에 대한 서명 요청은 coordinator가 모아서 한 번에 합성/저장
+    #    (기다리는 동안 이 요청의 읽기 트랜잭션은 닫아둠)
+    await db.rollback()
+    try:
+        file_url = await signing_coordinator.submit(document_id, signer_id, sign_data)
+    except DocumentNotFoundError:
+        raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다.")
+    except AlreadySignedError:
+        raise HTTPException(status_code=400, detail="이미 서명된 문서입니다.")
+    except StampTimeoutError:
+        raise HTTPException(status_code=504, detail="서명 삽입 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
 
     return {
-        "message": "문서에 서명 삽입 성공"
+        "message": "문서에 서명 삽입 성공",
+        "file_url": file_url
     }
 
 
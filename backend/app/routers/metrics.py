@@ -0,0 +1,125 @@
+from fastapi import APIRouter, HTTPException, Header
+from typing import Optional
+import os
+from dotenv import load_dotenv
+from app.services.mail import mail_outbox
+from app.services.signing import signing_coordinator
+from app.services.resource_cache import resource_cache
+from app.services.principal_cache import principal_cache
+from app.services.sign_generation import sign_generator
+from app.services import sign_cache
+from app.services.sign_relay import sign_relay
+
+load_dotenv()
+# 설정하지 않으면 metrics 엔드포인트는 비활성화
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/",responses={
+    200:{
+        "description":"서버 내부 처리 현황",
+        "content":{
+            "application/json":{
+                "example":{
+                    "mail": {
+                        "enqueued": 12,
+                        "sent": 11,
+                        "failed": 0,
+                        "retried": 1,
+                        "dropped": 0,
+                        "send_count": 12,
+                        "send_seconds_total": 3.42,
+                        "send_seconds_max": 0.81,
+                        "queue_depth": 1,
+                        "retry_pending": 0,
+                        "send_seconds_avg": 0.285
+                    },
+                    "signing": {
+                        "requests": 5,
+                        "signed": 5,
+                        "rejected": 0,
+                        "failed": 0,
+                        "batches": 2,
+                        "batched": 5,
+                        "batch_size_max": 4,
+                        "batch_seconds_total": 0.93,
+                        "active_documents": 0,
+                        "queued": 0,
+                        "batch_size_avg": 2.5
+                    },
+                    "resource_cache": {
+                        "hits": 940,
+                        "misses": 61,
+                        "stale": 0,
+                        "evictions": 3,
+                        "invalidations": 5,
+                        "entries": 42,
+                        "bytes": 18350080,
+                        "max_bytes": 67108864,
+                        "hit_ratio": 0.939
+                    },
+                    "principal_cache": {
+                        "hits": 5120,
+                        "misses": 87,
+                        "token_hits": 5190,
+                        "bad_token_hits": 14,
+                        "bad_tokens": 3,
+                        "invalidations": 2,
+                        "entries": 85,
+                        "tokens": 96,
+                        "bad_token_entries": 3,
+                        "hit_ratio": 0.983
+                    },
+                    "sign_generation": {
+                        "requests": 40,
+                        "generated": 31,
+                        "coalesced": 6,
+                        "shed": 2,
+                        "throttled": 1,
+                        "timeouts": 0,
+                        "failed": 0,
+                        "generate_seconds_total": 142.6,
+                        "in_flight": 3,
+                        "waiting": 0,
+                        "concurrency": 4,
+                        "generate_seconds_avg": 4.6
+                    },
+                    "sign_cache": {
+                        "pool_hits": 12,
+                        "rotations": 9,
+                        "generated": 31,
+                        "pregenerated": 24,
+                        "duplicates": 1,
+                        "evictions": 40,
+                        "refilling": 1,
+                        "pool_size": 2
+                    },
+                    "sign_relay": {
+                        "connections": 58,
+                        "messages": 412,
+                        "sent": 388,
+                        "coalesced": 21,
+                        "slow_disconnects": 1,
+                        "send_failures": 2,
+                        "sessions": 3,
+                        "peers": 6,
+                        "queued": 0
+                    }
+                }
+            }
+        }
+    }})
+async def get_metrics(x_metrics_token: Optional[str] = Header(None)):
+    """메일 대기열, 서명 합성 대기열, /resources 캐시, 사용자 정보 캐시, 서명 생성/캐시, 모바일 서명 중계 등 내부 카운터 조회 (X-Metrics-Token 헤더 필요)"""
+    if not METRICS_TOKEN or x_metrics_token != METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {
+        "mail": mail_outbox.stats(),
+        "signing": signing_coordinator.stats(),
+        "resource_cache": resource_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "sign_generation": sign_generator.stats(),
+        "sign_cache": sign_cache.stats(),
+        "sign_relay": sign_relay.stats(),
+    }
@@ -1,29 +1,105 @@
-from fastapi import APIRouter, Response, HTTPException
-import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response
 import mimetypes
+import re
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.services.storage import storage
+from app.services.file_response import (
+    ResourceFileResponse, stat_regular_file, stat_headers, read_file, is_not_modified, not_modified_response
+)
+from app.services.resource_cache import resource_cache
 
 router = APIRouter()
 
-@router.get("/resources/{file_path:path}")
-async def serve_resource(file_path: str):
-    # 실제 파일 경로
-    abs_path = os.path.join("resources", file_path)
-    if not os.path.isfile(abs_path):
-        raise HTTPException(status_code=404, detail="File not found")
+# 내용이 절대 바뀌지 않는 키 - CDN/브라우저가 재검증 없이 캐시
+# docs/ab/cd/<sha256>.pdf: 문서 revision (내용 해시가 곧 버전, 서명하면 새 키로 바뀜)
+# signs/...: 서명 이미지 (업로드마다 새 uuid 이름, 덮어쓰지 않음)
+_IMMUTABLE_KEY = re.compile(r"^(docs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.pdf|signs/.+)$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _cache_control(key: str) -> str:
+    if _IMMUTABLE_KEY.match(key):
+        return IMMUTABLE_CACHE_CONTROL
+    # blob 도입 이전 단독 파일(docs/<uuid>.pdf)은 같은 키에 덮어쓰므로 매번 ETag로 재검증
+    return "no-cache"
+
+
+def _safe_key(file_path: str) -> Optional[str]:
+    """
+    URL 경로 → 저장소 키 (의심스러운 경로는 None)
+    ../, 절대 경로, 역슬래시, NUL, 숨김 파일, 저장 중인 임시 파일(.part) 차단
+    저장소 쪽에서도 실제 경로가 root 밖이면 한 번 더 거부함 (심볼릭 링크 포함)
+    """
+    if not file_path or "\x00" in file_path or "\\" in file_path or file_path.startswith("/"):
+        return None
+    segments = file_path.split("/")
+    if any(not segment or segment.startswith(".") for segment in segments):
+        return None
+    if file_path.endswith(".part"):
+        return None
+    return file_path
+
+
+async def _serve_cached(request: Request, key: str, local_path: str, stat_result, mime_type: str, headers: dict) -> Response:
+    version = (stat_result.st_mtime_ns, stat_result.st_size)
+    cached = resource_cache.get(key, version)
+    if cached is None:
+        data = await run_in_threadpool(read_file, local_path)
+        if len(data) != stat_result.st_size:
+            # 읽는 중에 파일이 바뀜 - 캐시하지 않고 파일 응답으로
+            return ResourceFileResponse(local_path, media_type=mime_type, headers=headers)
+        cached_headers, body = stat_headers(stat_result), data
+        resource_cache.put(key, version, body, cached_headers)
+    else:
+        cached_headers, body = cached.headers, cached.data
 
-    # 파일 읽기
-    with open(abs_path, "rb") as f:
-        content = f.read()
+    headers = {**headers, **cached_headers, "accept-ranges": "bytes"}
+    if is_not_modified(request.headers, headers["etag"], headers["last-modified"]):
+        return not_modified_response(headers)
+    return Response(content=body, media_type=mime_type, headers=headers)
+
+
+@router.api_route("/resources/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_resource(file_path: str, request: Request):
+    # 저장소 키 (root 밖을 가리키는 경로는 404)
+    key = _safe_key(file_path)
+    if key is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    try:
+        local_path = storage.local_path(key)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="File not found")
 
     # MIME 타입 추정
-    mime_type, _ = mimetypes.guess_type(abs_path)
+    mime_type, _ = mimetypes.guess_type(key)
     if not mime_type:
         mime_type = "application/octet-stream"
 
-    # Response에 CORS 헤더 추가
+    # Response에 CORS 헤더 추가 (pdf.js 범위 요청용 헤더 노출)
     headers = {
         "Access-Control-Allow-Origin": "https://sign2gether.vercel.app",
-        "Access-Control-Allow-Methods": "GET, OPTIONS",
-        "Access-Control-Allow-Headers": "*"
+        "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS",
+        "Access-Control-Allow-Headers": "*",
+        "Access-Control-Expose-Headers": "Accept-Ranges, Content-Range, Content-Length, ETag, Last-Modified",
+        "Cache-Control": _cache_control(key),
+        "X-Content-Type-Options": "nosniff",
     }
-    return Response(content, media_type=mime_type, headers=headers)
\ No newline at end of file
+
+    if local_path is not None:
+        # 로컬 파일: Range/조건부 GET/zero-copy 전송 지원
+        stat_result = await run_in_threadpool(stat_regular_file, local_path)
+        if stat_result is None:
+            raise HTTPException(status_code=404, detail="File not found")
+        # 작은 파일의 전체 요청은 메모리 캐시에서 응답 (범위 요청/HEAD는 파일에서 바로)
+        if request.method == "GET" and "range" not in request.headers and resource_cache.cacheable(stat_result.st_size):
+            return await _serve_cached(request, key, local_path, stat_result, mime_type, headers)
+        return ResourceFileResponse(local_path, stat_result=stat_result, media_type=mime_type, headers=headers)
+
+    # 다른 저장소: 파일 전체를 메모리에 올리지 않고 청크 단위로 전송
+    size = await storage.size(key)
+    if size is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(storage.get_stream(key), media_type=mime_type, headers=headers)
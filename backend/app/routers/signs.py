@@ -1,98 +1,97 @@
-from collections import namedtuple
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional, Literal
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import os
-from google import genai
-from google.genai import types
-from PIL import Image
-from io import BytesIO
-import base64   
 from app.dependencies.database import get_db
 from app.models import Sign
 from app.routers.auth import get_current_user_from_cookie
-from dotenv import load_dotenv
+from app.services.storage import storage
+from app.services.resource_cache import resource_cache
+from app.services.sign_generation import (
+    SignGenerationBusyError, SignGenerationTimeoutError, SignGenerationError, DEFAULT_SIGN_STYLE
+)
+from app.services.sign_cache import get_generated_sign
+from app.services.sign_image import png_data_url
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page, split_page
 from fastapi import Query
 from fastapi.websockets import WebSocket, WebSocketDisconnect
-
-sessions ={}
-
-load_dotenv()
-
-def set_white_bg_and_b64(image_bytes, threshold=220):
-    # 1. 이미지 열기
-    img = Image.open(BytesIO(image_bytes)).convert("RGBA")
-    datas = img.getdata()
-    newData = []
-    for item in datas:
-        # 밝은색(흰색~밝은 회색) 픽셀을 투명하게
-        if item[0] > threshold and item[1] > threshold and item[2] > threshold:
-            newData.append((255, 255, 255, 255))  # 완전 흰색
-        else:
-            newData.append(item)
-    img.putdata(newData)
-
-    # 2. 다시 PNG bytes로 저장
-    output = BytesIO()
-    img.save(output, format="PNG")
-    png_bytes = output.getvalue()
-
-    # 3. base64 인코딩
-    b64_str = base64.b64encode(png_bytes).decode("utf-8")
-    b64_png = f"data:image/png;base64,{b64_str}"
-    return b64_png
+from app.services.sign_relay import sign_relay
 
 router = APIRouter(prefix="/signs", tags=["signs"])
 
 @router.get("/",responses={
     200:{
-        "description":"로그인한 사용자가 업로드한 서명 이미지 목록 반환",
+        "description":"로그인한 사용자가 업로드한 서명 이미지 목록 반환 (최신순, 다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 반환)",
         "content":{
             "application/json":{
                 "example":[
   {
     "sign_filename": "sign_893437dd-0070-4f0d-aa83-143ead6f6043.png",
     "file_url": "/resources/signs/sign_893437dd-0070-4f0d-aa83-143ead6f6043.png",
-    "uploaded_at": "2025-07-13T05:06:33.210113"
+    "uploaded_at": "2025-07-13T05:06:33.210113",
+    "is_vector": False
   },
   {
     "sign_filename": "sign_78b47e64-93be-45fc-8244-ef3a99a3e381.png",
     "file_url": "/resources/signs/sign_78b47e64-93be-45fc-8244-ef3a99a3e381.png",
-    "uploaded_at": "2025-07-13T06:29:19.056700"
+    "uploaded_at": "2025-07-13T06:29:19.056700",
+    "is_vector": False
   },
   {
     "sign_filename": "sign_a3478ded-17d1-46c1-bb0d-f5f6419305aa.png",
     "file_url": "/resources/signs/sign_a3478ded-17d1-46c1-bb0d-f5f6419305aa.png",
-    "uploaded_at": "2025-07-13T11:27:50.518180"
+    "uploaded_at": "2025-07-13T11:27:50.518180",
+    "is_vector": False
   },
   {
     "sign_filename": "sign_e4dd1498-fa81-45bf-91a9-63f3f8f2e5a5.png",
     "file_url": "/resources/signs/sign_e4dd1498-fa81-45bf-91a9-63f3f8f2e5a5.png",
-    "uploaded_at": "2025-07-13T11:30:45.210874"
+    "uploaded_at": "2025-07-13T11:30:45.210874",
+    "is_vector": False,
+    "width": 412,
+    "height": 118,
+    "aspect_ratio": 3.49
   }
 ]
             }
         }
     }})
 async def get_my_signs(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="한 페이지 서명 수"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
     current_user: dict = Depends(get_current_user_from_cookie),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    로그인한 사용자가 업로드한 서명 이미지 목록 반환
+    로그인한 사용자가 업로드한 서명 이미지 목록 반환 (최신순, 커서 기반 페이지네이션)
+    stroke JSON 등 응답에 쓰지 않는 컬럼은 조회하지 않음
     """
-    result = await db.execute(
-        select(Sign).where(Sign.user_id == current_user["id"])
-    )
-    signs = result.scalars().all()
-    # 원하는 필드만 추려서 반환
+    query = select(
+        Sign.id,
+        Sign.stored_filename,
+        Sign.file_url,
+        Sign.uploaded_at,
+        Sign.strokes.is_not(None).label("is_vector"),
+        Sign.width,
+        Sign.height,
+        Sign.aspect_ratio,
+    ).where(Sign.user_id == current_user["id"])
+    result = await db.execute(keyset_page(query, Sign.uploaded_at, Sign.id, cursor, limit))
+    rows, next_cursor = split_page(result.all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
-            "sign_filename": sign.stored_filename,
-            "file_url": sign.file_url,
-            "uploaded_at": sign.uploaded_at,
+            "sign_filename": row.stored_filename,
+            "file_url": row.file_url,
+            "uploaded_at": row.uploaded_at,
+            "is_vector": bool(row.is_vector),
+            "width": row.width,
+            "height": row.height,
+            "aspect_ratio": row.aspect_ratio,
         }
-        for sign in signs
+        for row in rows
     ]
 
 @router.delete("/{sign_filename}",responses={
@@ -129,10 +128,10 @@ async def delete_sign(
 
     # 3. document_sign에서 참조 중인지 확인
     
-    # 4. 파일 삭제
-    file_path = sign.file_url.replace("/resources/signs/", "resources/signs/")
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    # 4. 파일 삭제 (/resources 메모리 캐시에서도 제거)
+    sign_key = storage.key_from_url(sign.file_url)
+    resource_cache.invalidate(sign_key)
+    await storage.delete(sign_key)
 
     # 5. DB에서 삭제
     await db.delete(sign)
@@ -148,47 +147,54 @@ async def delete_sign(
             "application/json":{
                 "example":{
                     "message": "서명 생성 성공",
-                    "sign_base64": "base64"
+                    "sign_base64": "base64",
+                    "cached": False
                 }
             }
         }
     }})
 async def generate_sign(
     name: str,
-    current_user: dict = Depends(get_current_user_from_cookie)
+    style: Literal["ballpoint", "fountain", "marker"] = Query(DEFAULT_SIGN_STYLE, description="서명 스타일"),
+    current_user: dict = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    서명 생성
+    서명 생성 (동시 생성 수 제한, 같은 이름의 진행 중인 요청은 결과 공유)
+    생성한 서명은 (사용자, 이름, 스타일)별로 보관 - 재생성 요청은 미리 만들어 둔/보관된 variant로 바로 응답
     """
-    client = genai.Client(api_key=os.getenv("GEMINI_APIKEY"))
-    contents=("Generate a high-resolution PNG image of a handwritten signature for the name "+name+". Use a black ballpoint pen style, with a white background. The signature should appear natural, slightly slanted, and fluid, resembling a real personal signature.")
-    response = client.models.generate_content(
-        model="gemini-2.0-flash-preview-image-generation",
-        contents=contents,
-        config=types.GenerateContentConfig(
-        response_modalities=['TEXT', 'IMAGE']
+    try:
+        png, cached = await get_generated_sign(db, current_user["id"], name, style)
+    except SignGenerationBusyError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="서명 생성 요청이 많습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(e.retry_after)}
         )
-    )
+    except SignGenerationTimeoutError:
+        raise HTTPException(status_code=504, detail="서명 생성 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+    except SignGenerationError as e:
+        print(f"서명 생성 실패: {e}")
+        raise HTTPException(status_code=502, detail="서명 생성에 실패했습니다.")
 
-    for part in response.candidates[0].content.parts:
-        if part.text is not None:
-            print(part.text)
-        elif part.inline_data is not None:
-            b64_png = set_white_bg_and_b64(part.inline_data.data)
-            return {"message": "서명 생성 성공", "sign_base64": b64_png}
+    return {"message": "서명 생성 성공", "sign_base64": png_data_url(png), "cached": cached}
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket, sessionId: str):
+    """모바일 서명 중계 - 받은 메시지를 같은 sessionId의 다른 연결로 전달 (연결별 대기열 + writer task)"""
     await websocket.accept()
-    sessions.setdefault(sessionId, []).append(websocket)
+    peer = sign_relay.join(sessionId, websocket)
     try:
-        while True:
+        while not peer.closed:
             data = await websocket.receive_text()
-            for conn in sessions[sessionId]:
-                if conn != websocket:
-                    await conn.send_text(data)
+            sign_relay.broadcast(peer, data)
     except WebSocketDisconnect:
-        sessions[sessionId].remove(websocket)
+        pass
+    except RuntimeError:
+        # 느린 연결이라 writer task가 먼저 닫은 경우
+        pass
+    finally:
+        await peer.stop()
 
 """
 @router.get("/whitebg")
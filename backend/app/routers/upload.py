@@ -1,23 +1,41 @@
-from fastapi import APIRouter, UploadFile, File,Form, HTTPException, Depends, Body, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File,Form, HTTPException, Depends, Body, Request, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 import os
 import uuid
 import base64
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
+from pydantic import BaseModel
+from starlette.datastructures import UploadFile as StarletteUploadFile
 from app.dependencies.database import get_db
-from app.models import Document, Sign, DocumentSigner
+from app.models import Document, Sign, DocumentSigner, Blob
 from app.routers.auth import get_current_user_from_cookie
+from app.services.ingest import (
+    FileTooLargeError, UnexpectedFileTypeError, append_file, iter_upload_chunks, read_stream, require_prefix, write_stream
+)
+from app.services.blob import store_upload, store_file, blob_url, remove_files
+from app.services.storage import storage
+from app.services.upload_session import (
+    create_upload_session, get_upload_session, claim_chunk, commit_chunk, delete_upload_session, RECOMMENDED_CHUNK_SIZE
+)
 import json
-from dotenv import load_dotenv
-from email.mime.multipart import MIMEMultipart
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.image import MIMEImage
+from starlette.concurrency import run_in_threadpool
+from app.services.mail import mail_outbox
+from app.services.document_structure import index_document_structure
+from starlette.background import BackgroundTask
+from app.services.vector_sign import (
+    normalize_vector_sign, dumps_vector_sign, vector_sign_svg, InvalidVectorSignError
+)
+from app.services.sign_image import normalize_sign_png, NormalizedSign, InvalidSignImageError
 import re
 
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    signers: Optional[List[dict]] = None
+
 def is_valid_email(email: str) -> bool:
     # 간단한 이메일 정규식 (RFC 완벽 대응은 아님, 실무에서 충분)
     pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
@@ -25,93 +43,104 @@ def is_valid_email(email: str) -> bool:
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
-# 업로드 디렉토리 설정
-UPLOAD_DIR = "resources"
-DOC_DIR = os.path.join(UPLOAD_DIR, "docs")
-SIGN_DIR = os.path.join(UPLOAD_DIR, "signs")
-
-load_dotenv()
-gmail_user = str(os.getenv("GMAIL_USER"))
-gmail_password = str(os.getenv("GMAIL_PASSWORD"))
-
-# 디렉토리가 없으면 생성
-os.makedirs(DOC_DIR, exist_ok=True)
-os.makedirs(SIGN_DIR, exist_ok=True)
-
-def send_email_to_signers(emails, names, filename, url):
-    server = smtplib.SMTP('smtp.gmail.com', 587)
-    server.starttls()
-    server.login(gmail_user, gmail_password)
-    for email, name in zip(emails, names):
-        body = f"안녕하세요, {name}님.<br>문서명: {filename}<br>서명을 요청합니다.<br><a href='{url}'>서명하러 가기</a>"
-        msg = MIMEMultipart('related')
-        msg['From'] = str(gmail_user)
-        msg['To'] = email
-        msg['Subject'] = f"sign2gether에서 함께 서명하세요. 문서명: {filename}"
-        #msg_html = MIMEText(f'<html><body><img src="cid:image1"><br>{body}</body></html>', 'html')
-        msg_html = MIMEText(f'''
-        <html>
-        <body style="background:#f9fafb; margin:0; padding:0;">            
-            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background:#f9fafb;">
-            <tr>
-                <td align="center">
-                <table width="600" cellpadding="0" cellspacing="0" border="0" style="background:#fff; border-radius:12px; box-shadow:0 2px 8px #eee; padding:0 0 32px 0;">
-                    <tr>
-                    <td align="center" style="padding-top:0px; padding-bottom:24px;">
-                        <img src="cid:image1" 
-                            style="width:100%; max-width:600px; display:block; margin:0" 
-                            alt="Sign2gether" />
-                    </td>
-                    </tr>
-                    <tr>
-                    <td align="center" style="font-size:15px; color:#444; font-weight:700; padding-bottom:24px;">
-                        Sign2gether 서명 요청
-                    </td>
-                    </tr>
-                    <tr>
-                    <td style="font-size:12px; color:#444; font-weight:600; padding:0 32px 0 32px;">
-                        안녕하세요, <b>{name}님</b>.
-                    </td>
-                    </tr>
-                    <tr>
-                    <td style="font-size:12px; color:#444; font-weight:600; padding:16px 32px 0 32px;">
-                        문서명: <span style="font-weight:bold;">{filename}</span>
-                    </td>
-                    </tr>
-                    <tr>
-                    <td style="font-size:12px; color:#444; padding:16px 32px 0 32px;">
-                        아래 버튼을 눌러 서명에 참여해 주세요!
-                    </td>
-                    </tr>
-                    <tr>
-                    <td align="center" style="padding:40px 0 0 0;">
-                        <a href="{url}" style="background:#2979ff; color:#fff; text-decoration:none; padding:18px 48px; border-radius:8px; font-size:12px; font-weight:bold; display:inline-block;">
-                        서명하러 가기
-                        </a>
-                    </td>
-                    </tr>
-                    <tr>
-                    <td align="center" style="font-size:8px; color:#bbb; padding-top:20px;">
-                        본 메일은 Sign2gether에서 자동 발송되었습니다.
-                    </td>
-                    </tr>
-                </table>
-                </td>
-            </tr>
-            </table>
-        </body>
-        </html>
-        ''', 'html')
-        msg.attach(msg_html)
-
-        # 이미지 파일 읽기 및 추가
-        with open("app/email_header.png", 'rb') as img:
-            msg_image = MIMEImage(img.read(), name="email_header.png")
-        msg_image.add_header('Content-ID', '<image1>')
-        msg.attach(msg_image)
-        #msg.attach(MIMEText(f"안녕하세요, {name}님.\n\n서명을 요청합니다.\n\n감사합니다.\n\n{url}", 'plain'))
-        server.send_message(msg)
-    server.quit()
+# PDF 업로드 최대 크기 (50MB)
+MAX_PDF_SIZE = 50 * 1024 * 1024
+# 서명 이미지 업로드 최대 크기 (5MB)
+MAX_SIGN_SIZE = 5 * 1024 * 1024
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# 서명 이미지 저장 위치 (저장소 키 signs/ab/cd/<파일명>)
+SIGN_NAMESPACE = "signs"
+
+async def _create_document(
+    db: AsyncSession,
+    uploader_id: int,
+    original_filename: str,
+    blob,
+    mime_type: str,
+    signers_data: list
+):
+    """
+    저장된 blob으로 Document, DocumentSigner를 하나의 트랜잭션으로 만들고 서명 요청 메일 발송 등록
+    반환값: (document, 생성된 서명자 정보 목록)
+    """
+    # 고유한 파일명 생성 (문서 식별용, 실제 파일은 내용 기준 blob으로 공유)
+    file_extension = os.path.splitext(original_filename or "")[1]
+    stored_filename = f"{uuid.uuid4()}{file_extension}"
+    
+    # 데이터베이스에 문서 정보 저장 (flush로 id만 받고 commit은 서명자와 함께)
+    document = Document(
+        uploader_id=uploader_id,
+        original_filename=original_filename,
+        stored_filename=stored_filename,
+        file_path=blob.file_path,
+        file_url=blob_url(blob),
+        file_size=blob.file_size,
+        mime_type=mime_type,
+        blob_digest=blob.digest,
+        uploaded_at=datetime.utcnow()
+    )
+    db.add(document)
+    await db.flush()
+
+    signers = []
+    if signers_data:
+        rows = [
+            {
+                "document_id": document.id,
+                "name": signer["name"],
+                "email": signer.get("email"),
+                "role": signer.get("role"),
+                "is_signed": False
+            }
+            for signer in signers_data
+        ]
+        # 서명자 전체를 INSERT 한 번으로 저장하고 id를 입력 순서대로 받음
+        result = await db.execute(
+            insert(DocumentSigner).returning(DocumentSigner.id, sort_by_parameter_order=True),
+            rows
+        )
+        signers = [
+            {
+                "signer_id": signer_id,
+                "name": row["name"],
+                "email": row["email"],
+                "role": row["role"],
+                "is_signed": False
+            }
+            for signer_id, row in zip(result.scalars().all(), rows)
+        ]
+    await db.commit()
+
+    names=[]
+    emails=[]
+    for signer in signers:
+        if signer["email"] and is_valid_email(signer["email"]):
+            names.append(signer["name"])
+            emails.append(signer["email"])
+    # 이메일 전송을 메일 발송 대기열에 등록
+    if names and emails:
+        mail_outbox.enqueue_sign_requests(emails, names, original_filename, "https://sign2gether.vercel.app/document/"+stored_filename)
+    return document, signers
+
+def _document_upload_response(document: Document, signers: list) -> JSONResponse:
+    # 응답 데이터 (서명자 id를 함께 반환해 /documents/{doc_filename}/signer 재조회가 필요 없음)
+    # 응답을 보낸 뒤 페이지 수/크기 등 PDF 구조를 분석해서 저장
+    return JSONResponse(
+        background=BackgroundTask(index_document_structure, document.id),
+        status_code=200,
+        content={
+            "message": "PDF 업로드 성공",
+            "file": {
+                "doc_filename": document.stored_filename,
+                "original_name": document.original_filename,
+                "size": document.file_size,
+                "uploaded_at": document.uploaded_at.isoformat(),
+                "file_url": document.file_url
+            },
+            "signers": signers
+        }
+    )
 
 @router.post("/docs/pdf",responses={
     200:{
@@ -126,7 +155,11 @@ def send_email_to_signers(emails, names, filename, url):
     "size": 52206,
     "uploaded_at": "2025-07-13T11:12:36.974404",
     "file_url": "/resources/docs/b58737ca-166b-4a67-b5ad-5c8e90dee3fb.pdf"
-  }
+  },
+  "signers": [
+    {"signer_id": 6, "name": "홍길동", "email": "hong@example.com", "role": "대표", "is_signed": False},
+    {"signer_id": 7, "name": "김철수", "email": "kim@example.com", "role": "부장", "is_signed": False}
+  ]
 }}
         }
     },
@@ -152,7 +185,6 @@ def send_email_to_signers(emails, names, filename, url):
         }
 })
 async def upload_pdf(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     signers: Optional[str] = Form(None,description="JSON 형식의 구성원 정보",examples=['[{"name":"홍길동","email":"hong@example.com","role":"대표"},{"name":"김철수","email":"kim@example.com","role":"부장"}]']),
     current_user: dict = Depends(get_current_user_from_cookie),
@@ -167,92 +199,270 @@ async def upload_pdf(
             detail="PDF 파일만 업로드 가능합니다."
         )
     
-    # 파일 크기 검증 (50MB 제한)
-    if file.size and file.size > 50 * 1024 * 1024:
+    # 파일 크기 검증 (50MB 제한) - 헤더가 없는 경우는 저장 중에 다시 검사
+    if file.size and file.size > MAX_PDF_SIZE:
         raise HTTPException(
             status_code=400,
             detail="파일 크기는 50MB를 초과할 수 없습니다."
         )
     
     try:
-        # 고유한 파일명 생성
-        file_extension = os.path.splitext(file.filename or "")[1]
-        stored_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(DOC_DIR, stored_filename)
+        # 파일 저장 (청크 단위 스트리밍, 같은 내용이 이미 있으면 참조만 추가)
+        blob, blob_created = await store_upload(db, file, max_size=MAX_PDF_SIZE)
+        file_path = blob.file_path
         
-        # 파일 저장
-        content = await file.read()
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
+        # 문서 및 서명자 정보 저장
+        signers_data = json.loads(signers) if signers else []
+        document, created_signers = await _create_document(
+            db, current_user["id"], file.filename, blob, file.content_type, signers_data
+        )
         
-        # 파일 URL 생성
-        file_url = f"/resources/docs/{stored_filename}"
+        return _document_upload_response(document, created_signers)
         
-        # 데이터베이스에 문서 정보 저장
-        document = Document(
-            uploader_id=current_user["id"],
-            original_filename=file.filename,
-            stored_filename=stored_filename,
-            file_path=file_path,
-            file_url=file_url,
-            file_size=len(content),
-            mime_type=file.content_type,
-            uploaded_at=datetime.utcnow()
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=400,
+            detail="파일 크기는 50MB를 초과할 수 없습니다."
         )
-        db.add(document)
-        await db.commit()
-        await db.refresh(document)
-        if signers:
-            signers_data = json.loads(signers)
-            for signer in signers_data:
-                document_signer = DocumentSigner(
-                    document_id=document.id,
-                    name=signer["name"],
-                    email=signer["email"],
-                    role=signer["role"],
-                    is_signed=False
-                )
-                db.add(document_signer)
-            names=[]
-            emails=[]
-            for signer in signers_data:
-                if signer["email"] and is_valid_email(signer["email"]):
-                    names.append(signer["name"])
-                    emails.append(signer["email"])
-            # 이메일 전송을 백그라운드로 등록
-            if names and emails:
-                background_tasks.add_task(send_email_to_signers, emails, names, file.filename, "https://sign2gether.vercel.app/document/"+stored_filename)
-            await db.commit()
-            await db.refresh(document_signer)   
-        
+    except Exception as e:
+        # 이번 요청에서 새로 만든 blob이 DB에 남지 않았다면 파일 삭제 (공유 중인 파일은 유지)
+        await db.rollback()
+        if locals().get('blob_created') and not await db.get(Blob, blob.digest):
+            await remove_files([file_path])
         
-        # 응답 데이터
-        file_info = {
-            "doc_filename": stored_filename,
-            "original_name": file.filename,
-            "size": len(content),
-            "uploaded_at": document.uploaded_at.isoformat(),
-            "file_url": file_url
+        raise HTTPException(
+            status_code=500,
+            detail=f"파일 업로드 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+
+def _upload_session_info(upload_session) -> dict:
+    return {
+        "upload_id": upload_session.id,
+        "original_name": upload_session.original_filename,
+        "total_size": upload_session.total_size,
+        "committed_offset": upload_session.committed_offset,
+        "next_chunk": upload_session.chunk_count,
+        "chunk_size": RECOMMENDED_CHUNK_SIZE,
+        "expires_at": upload_session.expires_at.isoformat()
+    }
+
+async def _get_upload_session_or_404(db: AsyncSession, upload_id: str, current_user: dict):
+    upload_session = await get_upload_session(db, upload_id, current_user["id"])
+    if not upload_session:
+        raise HTTPException(status_code=404, detail="업로드 세션을 찾을 수 없습니다.")
+    return upload_session
+
+def _read_head(path: str, size: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(size)
+
+@router.post("/sessions",responses={
+    200:{
+        "description":"이어 올리기 업로드 세션 생성 성공",
+        "content":{
+            "application/json":{
+                "example":{
+                    "message": "업로드 세션 생성 성공",
+                    "upload": {
+                        "upload_id": "3f6c1f8e0a3b4c9e8f0d2a1b5c7e9f01",
+                        "original_name": "계약서.pdf",
+                        "total_size": 41943040,
+                        "committed_offset": 0,
+                        "next_chunk": 0,
+                        "chunk_size": 5242880,
+                        "expires_at": "2025-07-14T11:12:36.974404"
+                    }
+                }
+            }
         }
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "message": "PDF 업로드 성공",
-                "file": file_info
+    }})
+async def create_pdf_upload_session(
+    body: UploadSessionCreate,
+    current_user: dict = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db)
+):
+    """이어 올리기(resumable) PDF 업로드 세션 생성 (로그인 사용자만 가능)"""
+    if body.size <= 0:
+        raise HTTPException(status_code=400, detail="파일 크기가 올바르지 않습니다.")
+    if body.size > MAX_PDF_SIZE:
+        raise HTTPException(status_code=400, detail="파일 크기는 50MB를 초과할 수 없습니다.")
+
+    upload_session = await create_upload_session(
+        db,
+        current_user["id"],
+        body.filename,
+        body.size,
+        json.dumps(body.signers, ensure_ascii=False) if body.signers else None
+    )
+    return {"message": "업로드 세션 생성 성공", "upload": _upload_session_info(upload_session)}
+
+@router.get("/sessions/{upload_id}")
+async def get_pdf_upload_session(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db)
+):
+    """업로드 세션 상태 조회 (어디까지 저장되었는지 확인 후 이어서 전송)"""
+    upload_session = await _get_upload_session_or_404(db, upload_id, current_user)
+    return {"message": "업로드 세션 조회 성공", "upload": _upload_session_info(upload_session)}
+
+@router.put("/sessions/{upload_id}/chunks/{chunk_index}")
+async def upload_pdf_chunk(
+    upload_id: str,
+    chunk_index: int,
+    request: Request,
+    offset: int = Query(..., description="청크 시작 위치 (bytes)"),
+    current_user: dict = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    청크 업로드 (요청 본문 = 청크 바이트)
+    offset은 현재 저장된 위치(committed_offset)와 같아야 하며, 이미 저장된 청크를 다시 보내면 현재 상태를 반환
+    """
+    upload_session = await _get_upload_session_or_404(db, upload_id, current_user)
+
+    # 응답을 받지 못해 재전송한 청크는 이미 저장된 것으로 처리
+    if chunk_index < upload_session.chunk_count and offset < upload_session.committed_offset:
+        return {"message": "이미 저장된 청크입니다.", "upload": _upload_session_info(upload_session)}
+
+    if chunk_index != upload_session.chunk_count or offset != upload_session.committed_offset:
+        raise HTTPException(
+            status_code=409,
+            detail=f"청크 순서가 맞지 않습니다. 청크 {upload_session.chunk_count}번, 위치 {upload_session.committed_offset}부터 전송하세요."
+        )
+
+    # 본문을 받는 동안 트랜잭션을 열어 두지 않음
+    await db.commit()
+
+    # 본문은 요청마다 별도 파일로 받고, 세션을 확보한 요청만 spool 파일에 덧붙임
+    # (같은 위치로 동시에 들어온 요청의 바이트가 spool 파일에서 섞이지 않음)
+    part_path = f"{upload_session.spool_path}.{uuid.uuid4().hex}"
+    try:
+        try:
+            result = await write_stream(
+                request.stream(), part_path, max_size=upload_session.total_size - offset
+            )
+        except FileTooLargeError:
+            raise HTTPException(status_code=400, detail="선언한 파일 크기를 초과했습니다.")
+        if result.size == 0:
+            raise HTTPException(status_code=400, detail="빈 청크는 업로드할 수 없습니다.")
+
+        if not await claim_chunk(db, upload_session, offset):
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="같은 위치에 동시에 업로드된 청크가 있습니다. 상태를 다시 조회하세요.")
+        try:
+            await run_in_threadpool(append_file, part_path, upload_session.spool_path, offset)
+            await commit_chunk(db, upload_session, offset, result.size)
+        except BaseException:
+            # offset 뒤에 남은 바이트는 다음 청크가 덧붙일 때 잘라냄
+            await db.rollback()
+            raise
+    finally:
+        if os.path.exists(part_path):
+            await run_in_threadpool(os.remove, part_path)
+
+    return {"message": "청크 업로드 성공", "upload": _upload_session_info(upload_session)}
+
+@router.post("/sessions/{upload_id}/complete",responses={
+    200:{
+        "description":"이어 올리기 업로드 완료, 문서 생성",
+        "content":{
+            "application/json":{
+                "example":{
+                    "message": "PDF 업로드 성공",
+                    "file": {
+                        "doc_filename": "b58737ca-166b-4a67-b5ad-5c8e90dee3fb.pdf",
+                        "original_name": "계약서.pdf",
+                        "size": 41943040,
+                        "uploaded_at": "2025-07-13T11:12:36.974404",
+                        "file_url": "/resources/docs/be/5e/62686c8f18dc6aeacd5e00fca1619466dcce42ec6cb4606d314598619c425b8d.pdf"
+                    },
+                    "signers": [
+                        {"signer_id": 6, "name": "홍길동", "email": "hong@example.com", "role": "대표", "is_signed": False}
+                    ]
+                }
             }
+        }
+    }})
+async def complete_pdf_upload_session(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db)
+):
+    """모든 청크 업로드 후 호출 - upload_pdf와 동일하게 문서와 서명자 생성"""
+    upload_session = await _get_upload_session_or_404(db, upload_id, current_user)
+    if upload_session.committed_offset != upload_session.total_size:
+        raise HTTPException(
+            status_code=409,
+            detail=f"아직 모든 청크가 업로드되지 않았습니다. ({upload_session.committed_offset}/{upload_session.total_size} bytes)"
         )
-        
+
+    # PDF 시그니처 검증
+    try:
+        head = await run_in_threadpool(_read_head, upload_session.spool_path, 5)
+    except FileNotFoundError:
+        # 이전 완료 요청이 spool 파일을 옮긴 뒤 실패한 경우 등 → 이어 올릴 수 없으므로 세션 삭제
+        await delete_upload_session(db, upload_session, remove_spool=False)
+        raise HTTPException(status_code=404, detail="업로드 데이터를 찾을 수 없습니다. 다시 업로드하세요.")
+    if head != b"%PDF-":
+        await delete_upload_session(db, upload_session)
+        raise HTTPException(status_code=400, detail="PDF 파일만 업로드 가능합니다.")
+
+    spool_path = upload_session.spool_path
+    try:
+        original_filename = upload_session.original_filename
+        signers_data = json.loads(upload_session.signers) if upload_session.signers else []
+
+        # spool 파일을 blob으로 옮기고, 세션 삭제는 문서 생성과 같은 commit에 포함
+        blob, blob_created = await store_file(db, spool_path)
+        file_path = blob.file_path
+        await db.delete(upload_session)
+
+        document, created_signers = await _create_document(
+            db, current_user["id"], original_filename, blob, "application/pdf", signers_data
+        )
+
+        return _document_upload_response(document, created_signers)
+
     except Exception as e:
-        # 파일이 저장된 경우 삭제
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
-        
+        await db.rollback()
+        if locals().get('blob_created') and not await db.get(Blob, blob.digest):
+            await remove_files([file_path])
+        if not await run_in_threadpool(os.path.exists, spool_path):
+            # store_file이 spool 파일을 이미 옮기거나 지움 → 다시 완료할 수 없는 세션이므로 삭제
+            upload_session = await get_upload_session(db, upload_id, current_user["id"])
+            if upload_session:
+                await delete_upload_session(db, upload_session, remove_spool=False)
+
         raise HTTPException(
             status_code=500,
             detail=f"파일 업로드 중 오류가 발생했습니다: {str(e)}"
         )
 
+@router.delete("/sessions/{upload_id}")
+async def abort_pdf_upload_session(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db)
+):
+    """업로드 세션 취소 (임시 파일 삭제)"""
+    upload_session = await _get_upload_session_or_404(db, upload_id, current_user)
+    await delete_upload_session(db, upload_session)
+    return {"message": "업로드 세션 취소 성공", "upload_id": upload_id}
+
+
+async def _normalize_sign(image_bytes: bytes) -> NormalizedSign:
+    """업로드한 서명 PNG를 잉크 영역만 남기고 축소/팔레트 압축 (CPU 작업이라 스레드풀에서)"""
+    try:
+        return await run_in_threadpool(normalize_sign_png, image_bytes)
+    except InvalidSignImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _sign_dimensions(sign: Sign) -> dict:
+    return {"width": sign.width, "height": sign.height, "aspect_ratio": sign.aspect_ratio}
+
 
 @router.post("/sign/draw",responses={
     200:{
@@ -265,7 +475,10 @@ async def upload_pdf(
                         "sign_filename": "b58737ca-166b-4a67-b5ad-5c8e90dee3fb.png",
                         "file_url": "/resources/signs/b58737ca-166b-4a67-b5ad-5c8e90dee3fb.png",
                         "uploaded_at": "2025-07-13T11:12:36.974404",
-                        "user_id": 1
+                        "user_id": 1,
+                        "width": 412,
+                        "height": 118,
+                        "aspect_ratio": 3.49
                     }
                 }
             }
@@ -318,22 +531,27 @@ async def upload_sign_draw(
                 detail="PNG 파일 형식이 아닙니다."
             )
         
+        # 잉크 영역만 남기고 축소/팔레트 압축
+        normalized = await _normalize_sign(image_bytes)
+        
         # 고유한 파일명 생성
         stored_filename = f"sign_{uuid.uuid4()}.png"
-        file_path = os.path.join(SIGN_DIR, stored_filename)
+        sign_key = storage.shard_key(SIGN_NAMESPACE, stored_filename)
         
         # 파일 저장
-        with open(file_path, "wb") as buffer:
-            buffer.write(image_bytes)
+        await storage.put_bytes(sign_key, normalized.png)
         
         # 파일 URL 생성
-        file_url = f"/resources/signs/{stored_filename}"
+        file_url = storage.url_for(sign_key)
         
         # 데이터베이스에 서명 정보 저장
         sign = Sign(
             user_id=current_user["id"],
             stored_filename=stored_filename,
             file_url=file_url,
+            width=normalized.width,
+            height=normalized.height,
+            aspect_ratio=normalized.aspect_ratio,
             uploaded_at=datetime.utcnow()
         )
         
@@ -346,7 +564,8 @@ async def upload_sign_draw(
             "sign_filename": stored_filename,
             "file_url": file_url,
             "uploaded_at": sign.uploaded_at.isoformat(),
-            "user_id": sign.user_id
+            "user_id": sign.user_id,
+            **_sign_dimensions(sign)
         }
         
         return JSONResponse(
@@ -361,8 +580,8 @@ async def upload_sign_draw(
         raise
     except Exception as e:
         # 파일이 저장된 경우 삭제
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        if 'sign_key' in locals():
+            await storage.delete(sign_key)
         
         raise HTTPException(
             status_code=500,
@@ -381,7 +600,10 @@ async def upload_sign_draw(
     "sign_filename": "sign_guest_65f7efdf-1a27-475d-80c1-cd6161c44174.png",
     "file_url": "/resources/signs/sign_guest_65f7efdf-1a27-475d-80c1-cd6161c44174.png",
     "uploaded_at": "2025-07-13T11:33:43.965629",
-    "is_guest": True
+    "is_guest": True,
+    "width": 412,
+    "height": 118,
+    "aspect_ratio": 3.49
   }
 }
             }
@@ -422,22 +644,27 @@ async def upload_sign_draw_guest(
                 detail="PNG 파일 형식이 아닙니다."
             )
         
+        # 잉크 영역만 남기고 축소/팔레트 압축
+        normalized = await _normalize_sign(image_bytes)
+        
         # 고유한 파일명 생성
         stored_filename = f"sign_guest_{uuid.uuid4()}.png"
-        file_path = os.path.join(SIGN_DIR, stored_filename)
+        sign_key = storage.shard_key(SIGN_NAMESPACE, stored_filename)
         
         # 파일 저장
-        with open(file_path, "wb") as buffer:
-            buffer.write(image_bytes)
+        await storage.put_bytes(sign_key, normalized.png)
         
         # 파일 URL 생성
-        file_url = f"/resources/signs/{stored_filename}"
+        file_url = storage.url_for(sign_key)
         
         # 데이터베이스에 서명 정보 저장 (user_id는 null)
         sign = Sign(
             user_id=None,  # 비로그인 사용자는 user_id가 null
             stored_filename=stored_filename,
             file_url=file_url,
+            width=normalized.width,
+            height=normalized.height,
+            aspect_ratio=normalized.aspect_ratio,
             uploaded_at=datetime.utcnow()
         )
         
@@ -450,7 +677,8 @@ async def upload_sign_draw_guest(
             "sign_filename": stored_filename,
             "file_url": file_url,
             "uploaded_at": sign.uploaded_at.isoformat(),
-            "is_guest": True  # 게스트 사용자임을 표시
+            "is_guest": True,  # 게스트 사용자임을 표시
+            **_sign_dimensions(sign)
         }
         
         return JSONResponse(
@@ -465,10 +693,269 @@ async def upload_sign_draw_guest(
         raise
     except Exception as e:
         # 파일이 저장된 경우 삭제
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        if 'sign_key' in locals():
+            await storage.delete(sign_key)
         
         raise HTTPException(
             status_code=500,
             detail=f"서명 업로드 중 오류가 발생했습니다: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+async def _request_png_chunks(request: Request):
+    """
+    요청 본문에서 PNG 바이트 스트림 추출
+    - Content-Type: image/png → 본문을 그대로 스트리밍
+    - multipart/form-data → "file" 필드를 청크 단위로 읽기
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        file = form.get("file")
+        if not isinstance(file, StarletteUploadFile):
+            raise HTTPException(status_code=400, detail="이미지 데이터가 필요합니다.")
+        return iter_upload_chunks(file)
+    if content_type.startswith("image/png"):
+        return request.stream()
+    raise HTTPException(status_code=415, detail="image/png 또는 multipart/form-data 형식만 지원합니다.")
+
+async def _save_sign_stream(request: Request, db: AsyncSession, user_id: Optional[int], filename_prefix: str) -> Sign:
+    """PNG 스트림을 검증하며 읽고, 정리한 이미지를 저장한 뒤 Sign row 생성"""
+    chunks = await _request_png_chunks(request)
+
+    # 첫 8바이트로 PNG 시그니처를 확인하면서 크기 제한 안에서 읽기
+    try:
+        image_bytes = await read_stream(require_prefix(chunks, PNG_SIGNATURE), max_size=MAX_SIGN_SIZE)
+    except UnexpectedFileTypeError:
+        raise HTTPException(status_code=400, detail="PNG 파일 형식이 아닙니다.")
+    except FileTooLargeError:
+        raise HTTPException(status_code=400, detail="서명 이미지는 5MB를 초과할 수 없습니다.")
+    normalized = await _normalize_sign(image_bytes)
+
+    # 고유한 파일명 생성
+    stored_filename = f"{filename_prefix}{uuid.uuid4()}.png"
+    sign_key = storage.shard_key(SIGN_NAMESPACE, stored_filename)
+    await storage.put_bytes(sign_key, normalized.png)
+
+    try:
+        sign = Sign(
+            user_id=user_id,
+            stored_filename=stored_filename,
+            file_url=storage.url_for(sign_key),
+            width=normalized.width,
+            height=normalized.height,
+            aspect_ratio=normalized.aspect_ratio,
+            uploaded_at=datetime.utcnow()
+        )
+        db.add(sign)
+        await db.commit()
+        return sign
+    except Exception as e:
+        await storage.delete(sign_key)
+        raise HTTPException(
+            status_code=500,
+            detail=f"서명 업로드 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+@router.post("/sign/draw/binary",responses={
+    200:{
+        "description":"서명 업로드 성공",
+        "content":{
+            "application/json":{
+                "example":{
+                    "message": "서명 업로드 성공",
+                    "sign": {
+                        "sign_filename": "sign_b58737ca-166b-4a67-b5ad-5c8e90dee3fb.png",
+                        "file_url": "/resources/signs/sign_b58737ca-166b-4a67-b5ad-5c8e90dee3fb.png",
+                        "uploaded_at": "2025-07-13T11:12:36.974404",
+                        "user_id": 1,
+                        "width": 412,
+                        "height": 118,
+                        "aspect_ratio": 3.49
+                    }
+                }
+            }
+        }
+    },
+    415: {
+            "description": "지원하지 않는 Content-Type",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "image/png 또는 multipart/form-data 형식만 지원합니다."
+                    }
+                }
+            }
+    }
+})
+async def upload_sign_draw_binary(
+    request: Request,
+    current_user: dict = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db)
+):
+    """서명 그리기 데이터 업로드 (image/png 본문 또는 multipart "file")(로그인 사용자만 가능)"""
+    sign = await _save_sign_stream(request, db, current_user["id"], "sign_")
+    return {
+        "message": "서명 업로드 성공",
+        "sign": {
+            "sign_filename": sign.stored_filename,
+            "file_url": sign.file_url,
+            "uploaded_at": sign.uploaded_at.isoformat(),
+            "user_id": sign.user_id,
+            **_sign_dimensions(sign)
+        }
+    }
+
+
+@router.post("/sign/draw/guest/binary",responses={
+    200:{
+        "description":"서명 업로드 성공",
+        "content":{
+            "application/json":{
+                "example":{
+                    "message": "게스트 서명 업로드 성공",
+                    "sign": {
+                        "sign_filename": "sign_guest_65f7efdf-1a27-475d-80c1-cd6161c44174.png",
+                        "file_url": "/resources/signs/sign_guest_65f7efdf-1a27-475d-80c1-cd6161c44174.png",
+                        "uploaded_at": "2025-07-13T11:33:43.965629",
+                        "is_guest": True,
+                        "width": 412,
+                        "height": 118,
+                        "aspect_ratio": 3.49
+                    }
+                }
+            }
+        }
+    }})
+async def upload_sign_draw_guest_binary(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """비로그인 사용자 서명 그리기 데이터 업로드 (image/png 본문 또는 multipart "file")"""
+    sign = await _save_sign_stream(request, db, None, "sign_guest_")
+    return {
+        "message": "게스트 서명 업로드 성공",
+        "sign": {
+            "sign_filename": sign.stored_filename,
+            "file_url": sign.file_url,
+            "uploaded_at": sign.uploaded_at.isoformat(),
+            "is_guest": True,
+            **_sign_dimensions(sign)
+        }
+    }
+
+
+async def _save_vector_sign(sign_data: dict, db: AsyncSession, user_id: Optional[int], filename_prefix: str) -> Sign:
+    """stroke 좌표를 Sign에 저장하고, 목록/미리보기용 SVG 파일 생성"""
+    try:
+        vector = normalize_vector_sign(sign_data)
+    except InvalidVectorSignError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 고유한 파일명 생성
+    stored_filename = f"{filename_prefix}{uuid.uuid4()}.svg"
+    sign_key = storage.shard_key(SIGN_NAMESPACE, stored_filename)
+    await storage.put_bytes(sign_key, vector_sign_svg(vector).encode())
+
+    try:
+        sign = Sign(
+            user_id=user_id,
+            stored_filename=stored_filename,
+            file_url=storage.url_for(sign_key),
+            strokes=dumps_vector_sign(vector),
+            width=max(1, round(vector["width"])),
+            height=max(1, round(vector["height"])),
+            aspect_ratio=round(vector["width"] / vector["height"], 4),
+            uploaded_at=datetime.utcnow()
+        )
+        db.add(sign)
+        await db.commit()
+        return sign
+    except Exception as e:
+        await storage.delete(sign_key)
+        raise HTTPException(
+            status_code=500,
+            detail=f"서명 업로드 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+@router.post("/sign/draw/vector",responses={
+    200:{
+        "description":"벡터 서명 업로드 성공",
+        "content":{
+            "application/json":{
+                "example":{
+                    "message": "서명 업로드 성공",
+                    "sign": {
+                        "sign_filename": "sign_b58737ca-166b-4a67-b5ad-5c8e90dee3fb.svg",
+                        "file_url": "/resources/signs/sign_b58737ca-166b-4a67-b5ad-5c8e90dee3fb.svg",
+                        "uploaded_at": "2025-07-13T11:12:36.974404",
+                        "user_id": 1,
+                        "is_vector": True,
+                        "width": 400,
+                        "height": 200,
+                        "aspect_ratio": 2.0
+                    }
+                }
+            }
+        }
+    }})
+async def upload_sign_draw_vector(
+    sign_data: dict = Body(...,description="서명 패드 stroke 데이터",examples=[{"width": 400, "height": 200, "strokes": [{"penColor": "black", "minWidth": 0.5, "maxWidth": 2.5, "points": [{"x": 10, "y": 20, "time": 0}, {"x": 30, "y": 40, "time": 16}]}]}]),
+    current_user: dict = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db)
+):
+    """벡터 서명 업로드 (서명 패드 toData() 결과 + 패드 크기)(로그인 사용자만 가능)"""
+    sign = await _save_vector_sign(sign_data, db, current_user["id"], "sign_")
+    return {
+        "message": "서명 업로드 성공",
+        "sign": {
+            "sign_filename": sign.stored_filename,
+            "file_url": sign.file_url,
+            "uploaded_at": sign.uploaded_at.isoformat(),
+            "user_id": sign.user_id,
+            "is_vector": True,
+            **_sign_dimensions(sign)
+        }
+    }
+
+
+@router.post("/sign/draw/guest/vector",responses={
+    200:{
+        "description":"벡터 서명 업로드 성공",
+        "content":{
+            "application/json":{
+                "example":{
+                    "message": "게스트 서명 업로드 성공",
+                    "sign": {
+                        "sign_filename": "sign_guest_65f7efdf-1a27-475d-80c1-cd6161c44174.svg",
+                        "file_url": "/resources/signs/sign_guest_65f7efdf-1a27-475d-80c1-cd6161c44174.svg",
+                        "uploaded_at": "2025-07-13T11:33:43.965629",
+                        "is_guest": True,
+                        "is_vector": True,
+                        "width": 400,
+                        "height": 200,
+                        "aspect_ratio": 2.0
+                    }
+                }
+            }
+        }
+    }})
+async def upload_sign_draw_guest_vector(
+    sign_data: dict = Body(...,description="서명 패드 stroke 데이터"),
+    db: AsyncSession = Depends(get_db)
+):
+    """비로그인 사용자 벡터 서명 업로드 (서명 패드 toData() 결과 + 패드 크기)"""
+    sign = await _save_vector_sign(sign_data, db, None, "sign_guest_")
+    return {
+        "message": "게스트 서명 업로드 성공",
+        "sign": {
+            "sign_filename": sign.stored_filename,
+            "file_url": sign.file_url,
+            "uploaded_at": sign.uploaded_at.isoformat(),
+            "is_guest": True,
+            "is_vector": True,
+            **_sign_dimensions(sign)
+        }
+    }
@@ -0,0 +1,55 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from app.db import Base
+import app.models  # noqa: F401 - 모든 모델을 Base.metadata에 등록
+
+# create_all은 이미 있는 테이블에 컬럼/인덱스를 추가하지 않음
+# 기존 테이블에 추가한 컬럼과 인덱스는 여기에 등록 → init_db가 없는 것만 추가 (여러 번 실행해도 안전)
+# 컬럼 타입/외래 키는 모델 정의를 그대로 사용하므로 nullable 컬럼만 등록할 것
+
+# (테이블, 컬럼)
+ADDED_COLUMNS = [
+    ("documents", "blob_digest"),
+    ("signs", "strokes"),
+    ("documents", "page_count"),
+    ("documents", "is_encrypted"),
+    ("documents", "is_linearized"),
+    ("blobs", "released_at"),
+    ("signs", "width"),
+    ("signs", "height"),
+    ("signs", "aspect_ratio"),
+]
+
+# (테이블, 인덱스 이름) - 모델의 index=True / Index(...)로 정의한 인덱스
+ADDED_INDEXES = [
+    ("documents", "ix_documents_blob_digest"),
+    ("blobs", "ix_blobs_released_at"),
+    ("documents", "ix_documents_uploader_listing"),
+    ("signs", "ix_signs_user_listing"),
+    ("document_signers", "ix_document_signers_document_id"),
+]
+
+
+def _add_column_ddl(conn: Connection, table_name: str, column_name: str) -> str:
+    column = Base.metadata.tables[table_name].c[column_name]
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(dialect=conn.dialect)}"
+    for fk in column.foreign_keys:
+        ddl += f" REFERENCES {fk.column.table.name} ({fk.column.name})"
+    return ddl
+
+
+def upgrade_schema(conn: Connection):
+    """기존 데이터베이스에 빠진 컬럼/인덱스 추가 (create_all 이후 run_sync로 실행)"""
+    inspector = inspect(conn)
+    for table_name, column_name in ADDED_COLUMNS:
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        if column_name not in existing:
+            conn.execute(text(_add_column_ddl(conn, table_name, column_name)))
+            print(f"컬럼 추가: {table_name}.{column_name}")
+
+    for table_name, index_name in ADDED_INDEXES:
+        index = next(index for index in Base.metadata.tables[table_name].indexes if index.name == index_name)
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        if index_name not in existing:
+            index.create(conn)
+            print(f"인덱스 추가: {index_name}")
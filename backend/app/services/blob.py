@@ -0,0 +1,190 @@
+import hashlib
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from fastapi import UploadFile
+from sqlalchemy import update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db import AsyncSessionLocal
+from app.models.blob import Blob
+from app.services.ingest import save_upload_file, CHUNK_SIZE, SPOOL_DIR
+from app.services.storage import storage, normalize_key
+from app.services.resource_cache import resource_cache
+
+# 내용 주소 기반 저장소 - 키는 docs/ab/cd/<digest>.pdf (Blob.file_path에 키 저장)
+BLOB_NAMESPACE = "docs"
+_BLOB_KEY = re.compile(rf"^{BLOB_NAMESPACE}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/[0-9a-f]{{64}}\.[a-z]+$")
+# 서명으로 대체된 이전 revision 파일을 유지하는 시간 (초, 0이면 바로 삭제)
+# blob URL은 내용 해시를 담고 있어 immutable로 캐시되므로, 이전 URL을 들고 있는 뷰어/CDN을 위해 잠시 남겨둠
+REVISION_GRACE_SECONDS = int(os.getenv("REVISION_GRACE_SECONDS", "86400"))
+
+
+def blob_key(digest: str, ext: str = ".pdf") -> str:
+    return storage.shard_key(BLOB_NAMESPACE, f"{digest}{ext}")
+
+
+def blob_url(blob: Blob) -> str:
+    """blob 파일 접근 URL (/resources/...)"""
+    return storage.url_for(normalize_key(blob.file_path))
+
+
+def spool_path(ext: str = "") -> str:
+    return os.path.join(SPOOL_DIR, f"{uuid.uuid4().hex}{ext}")
+
+
+def _hash_file(path: str) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _remove_if_exists(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def acquire_blob(db: AsyncSession, digest: str) -> Optional[Blob]:
+    """이미 저장된 blob이면 참조 카운트를 1 올리고 반환 (유예 중인 이전 revision이면 다시 사용 중으로)"""
+    result = await db.execute(
+        update(Blob)
+        .where(Blob.digest == digest)
+        .values(ref_count=Blob.ref_count + 1, released_at=None)
+        .returning(Blob)
+    )
+    return result.scalar_one_or_none()
+
+
+async def adopt_file(
+    db: AsyncSession, tmp_path: str, digest: str, size: int, ext: str = ".pdf"
+) -> Tuple[Blob, bool]:
+    """
+    임시 파일을 blob으로 등록 (같은 내용이 이미 있으면 임시 파일은 버리고 참조만 추가)
+    반환값: (blob, 새로 만들어졌는지 여부) - commit은 호출하는 쪽에서
+    """
+    blob = await acquire_blob(db, digest)
+    if blob:
+        await run_in_threadpool(_remove_if_exists, tmp_path)
+        return blob, False
+
+    key = blob_key(digest, ext)
+    await storage.put_file(key, tmp_path)
+    blob = Blob(digest=digest, file_path=key, file_size=size, ref_count=1)
+    try:
+        async with db.begin_nested():
+            db.add(blob)
+    except IntegrityError:
+        # 같은 내용이 동시에 업로드된 경우 먼저 등록된 blob을 공유
+        blob = await acquire_blob(db, digest)
+        return blob, False
+    return blob, True
+
+
+async def store_upload(
+    db: AsyncSession, file: UploadFile, max_size: Optional[int] = None, ext: str = ".pdf"
+) -> Tuple[Blob, bool]:
+    """업로드 파일을 스트리밍으로 저장하고 blob으로 등록"""
+    tmp_path = spool_path(ext)
+    ingest = await save_upload_file(file, tmp_path, max_size=max_size)
+    return await adopt_file(db, tmp_path, ingest.sha256, ingest.size, ext)
+
+
+async def store_file(db: AsyncSession, tmp_path: str, ext: str = ".pdf") -> Tuple[Blob, bool]:
+    """이미 디스크에 쓴 임시 파일을 해시 계산 후 blob으로 등록 (서명 삽입 결과 등)"""
+    digest, size = await run_in_threadpool(_hash_file, tmp_path)
+    return await adopt_file(db, tmp_path, digest, size, ext)
+
+
+async def release_blob(db: AsyncSession, digest: str, keep_revision: bool = False) -> Optional[str]:
+    """
+    참조 카운트를 1 내리고, 마지막 참조였다면 released_at 표시 후 저장소 키를 반환
+    row와 파일은 commit 이후에 remove_released_files로 삭제해야 함
+    keep_revision이면 키를 반환하지 않고 유예 기간 뒤 purge_released_blobs가 삭제
+    """
+    result = await db.execute(
+        update(Blob)
+        .where(Blob.digest == digest)
+        .values(ref_count=Blob.ref_count - 1)
+        .returning(Blob.ref_count, Blob.file_path)
+    )
+    row = result.first()
+    if row is None or row.ref_count > 0:
+        return None
+    # row는 남겨 둠 - commit 전에 프로세스가 죽어도 purge_released_blobs가 파일까지 정리
+    await db.execute(
+        update(Blob).where(Blob.digest == digest, Blob.ref_count <= 0).values(released_at=datetime.utcnow())
+    )
+    if keep_revision and REVISION_GRACE_SECONDS > 0:
+        return None
+    return row.file_path
+
+
+async def release_document_file(db: AsyncSession, document, keep_revision: bool = False) -> List[str]:
+    """
+    문서가 가리키던 파일의 참조 해제, 삭제해야 할 저장소 키 목록 반환 (commit 후 remove_released_files로 삭제)
+    keep_revision: 서명으로 새 revision이 생긴 경우 - 이전 blob은 유예 기간 동안 유지
+    """
+    if document.blob_digest:
+        path = await release_blob(db, document.blob_digest, keep_revision)
+        return [path] if path else []
+    # blob 도입 이전에 업로드된 문서는 단독 파일
+    return [document.file_path]
+
+
+async def remove_files(keys: Iterable[str]):
+    """저장소에서 파일 삭제 (이전 버전에서 저장한 "resources/..." 경로도 허용)"""
+    for key in keys:
+        key = normalize_key(key)
+        resource_cache.invalidate(key)
+        await storage.delete(key)
+
+
+def is_blob_key(key: str) -> bool:
+    return _BLOB_KEY.match(normalize_key(key)) is not None
+
+
+async def remove_released_files(keys: Iterable[str]):
+    """
+    release_document_file이 반환한 파일 삭제 (commit 이후 호출)
+    blob 파일은 row 삭제와 같은 트랜잭션(행 잠금) 안에서 지움 - 그 사이 같은 내용이 다시 업로드되어
+    참조가 생겼으면 남겨 두고, 동시에 다시 등록하려는 요청(acquire_blob)은 파일 삭제가 끝난 뒤에 진행됨
+    """
+    keys = list(keys)
+    blob_keys = [key for key in keys if is_blob_key(key)]
+    if blob_keys:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(Blob)
+                .where(Blob.file_path.in_(blob_keys), Blob.ref_count <= 0)
+                .returning(Blob.file_path)
+            )
+            await remove_files(result.scalars().all())
+            await db.commit()
+    await remove_files(key for key in keys if not is_blob_key(key))
+
+
+async def purge_released_blobs():
+    """유예 기간이 지난 이전 revision blob 삭제 (maintenance 주기 작업)"""
+    cutoff = datetime.utcnow() - timedelta(seconds=REVISION_GRACE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            delete(Blob)
+            .where(Blob.ref_count <= 0, Blob.released_at.is_not(None), Blob.released_at <= cutoff)
+            .returning(Blob.file_path)
+        )
+        keys = result.scalars().all()
+        # 행 잠금을 쥔 채로 파일 삭제 - 같은 내용을 동시에 다시 저장하는 요청은 commit 이후에 진행됨
+        await remove_files(keys)
+        await db.commit()
+    if keys:
+        print(f"이전 revision {len(keys)}개 삭제")
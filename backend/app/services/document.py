@@ -1,4 +1,5 @@
 from app.models.document import Document
+from app.services.blob import release_document_file, remove_released_files
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
@@ -56,12 +57,12 @@ async def delete_document(db: AsyncSession, document_id: int, user_id: int):
     document = result.scalar_one_or_none()
     
     if document:
-        # 파일 삭제
-        if os.path.exists(document.file_path):
-            os.remove(document.file_path)
+        # blob 참조 해제 (마지막 참조일 때만 파일 삭제)
+        garbage = await release_document_file(db, document)
         
         # DB에서 삭제
         await db.delete(document)
         await db.commit()
+        await remove_released_files(garbage)
         return True
     return False
\ No newline at end of file
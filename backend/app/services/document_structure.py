@@ -0,0 +1,109 @@
+from typing import List
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import AsyncSessionLocal
+from app.models import Document, DocumentPage
+from app.services.storage import storage, normalize_key
+from app.services.pdf_structure import PdfStructure, inspect_pdf
+from app.services.stamping import run_in_pool
+
+
+async def _load_pages(db: AsyncSession, document_id: int) -> List[DocumentPage]:
+    result = await db.execute(
+        select(DocumentPage)
+        .where(DocumentPage.document_id == document_id)
+        .order_by(DocumentPage.page_number)
+    )
+    return list(result.scalars().all())
+
+
+async def _analyze(db: AsyncSession, document: Document) -> PdfStructure:
+    """같은 blob을 가진 문서가 이미 분석되어 있으면 그 결과를 재사용, 없으면 파일 분석"""
+    if document.blob_digest:
+        result = await db.execute(
+            select(Document)
+            .where(
+                Document.blob_digest == document.blob_digest,
+                Document.id != document.id,
+                Document.is_encrypted.is_not(None)
+            )
+            .limit(1)
+        )
+        other = result.scalar_one_or_none()
+        if other:
+            pages = await _load_pages(db, other.id)
+            return PdfStructure(
+                encrypted=other.is_encrypted,
+                linearized=other.is_linearized,
+                page_count=other.page_count,
+                pages=[(page.width, page.height, page.rotation) for page in pages]
+            )
+
+    async with storage.local_copy(normalize_key(document.file_path)) as path:
+        return await run_in_pool(inspect_pdf, path)
+
+
+async def ensure_document_structure(db: AsyncSession, document: Document) -> List[DocumentPage]:
+    """
+    문서 구조 정보 반환 (아직 분석 전이면 분석 후 저장)
+    백그라운드 분석과 동시에 실행돼도 먼저 저장된 결과를 사용
+    """
+    if document.is_encrypted is not None:
+        return await _load_pages(db, document.id)
+
+    structure = await _analyze(db, document)
+    try:
+        async with db.begin_nested():
+            await db.execute(delete(DocumentPage).where(DocumentPage.document_id == document.id))
+            if structure.pages:
+                await db.execute(
+                    insert(DocumentPage),
+                    [
+                        {
+                            "document_id": document.id,
+                            "page_number": number,
+                            "width": width,
+                            "height": height,
+                            "rotation": rotation
+                        }
+                        for number, (width, height, rotation) in enumerate(structure.pages, start=1)
+                    ]
+                )
+            document.page_count = structure.page_count
+            document.is_encrypted = structure.encrypted
+            document.is_linearized = structure.linearized
+    except IntegrityError:
+        # 다른 요청이 먼저 저장함
+        await db.refresh(document)
+    await db.commit()
+    return await _load_pages(db, document.id)
+
+
+async def index_document_structure(document_id: int):
+    """업로드 응답 후 실행하는 백그라운드 작업 (실패해도 조회 시 다시 분석)"""
+    try:
+        async with AsyncSessionLocal() as db:
+            document = await db.get(Document, document_id)
+            if document:
+                await ensure_document_structure(db, document)
+    except Exception as e:
+        print(f"문서 구조 분석 실패 (document_id={document_id}): {e}")
+
+
+def document_structure_info(document: Document, pages: List[DocumentPage]) -> dict:
+    """GET /documents/{doc_filename} 응답에 포함하는 구조 정보"""
+    return {
+        "page_count": document.page_count,
+        "is_encrypted": document.is_encrypted,
+        "is_linearized": document.is_linearized,
+        "pages": [
+            {
+                "num_page": page.page_number,
+                "width": page.width,
+                "height": page.height,
+                "rotation": page.rotation
+            }
+            for page in pages
+        ]
+    }
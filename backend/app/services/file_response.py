@@ -0,0 +1,139 @@
+import hashlib
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+# 304 응답에 다시 보내는 헤더 (RFC 9110 15.4.5)
+_NOT_MODIFIED_HEADERS = (
+    "cache-control", "content-location", "date", "etag", "expires", "vary", "last-modified",
+    "access-control-allow-origin", "access-control-expose-headers",
+)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 비교 (약한 비교: W/ 접두사 무시, 여러 값 및 * 허용)"""
+    if if_none_match.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in if_none_match.split(","))
+
+
+def is_not_modified(request_headers: Headers, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """조건부 GET 판단 - If-None-Match가 있으면 If-Modified-Since는 무시"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def stat_headers(stat_result: os.stat_result) -> dict:
+    """FileResponse와 같은 방식의 ETag / Last-Modified (메모리 캐시에서 응답할 때도 값이 같도록)"""
+    etag_base = str(stat_result.st_mtime) + "-" + str(stat_result.st_size)
+    return {
+        "etag": f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"',
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def not_modified_response(headers) -> Response:
+    return Response(
+        status_code=304,
+        headers={k: v for k, v in headers.items() if k.lower() in _NOT_MODIFIED_HEADERS}
+    )
+
+
+class ResourceFileResponse(FileResponse):
+    """
+    FileResponse + 조건부 GET(304) + zero-copy 전송
+    - Range(단일/다중), If-Range, HEAD는 FileResponse 그대로 사용
+    - 서버가 ASGI pathsend/zerocopy 확장을 지원하면 파일을 직접 넘겨서 커널이 전송(sendfile)
+    - 지원하지 않으면 64KB 청크 단위로 읽어서 전송 (파일 크기와 무관하게 메모리 사용량 일정)
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._extensions = scope.get("extensions") or {}
+        if self.stat_result is not None and is_not_modified(
+            Headers(scope=scope), self.headers.get("etag"), self.headers.get("last-modified")
+        ):
+            await not_modified_response(self.headers)(scope, receive, send)
+            if self.background is not None:
+                await self.background()
+            return
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if send_header_only:
+            return await super()._handle_simple(send, send_header_only)
+        if "http.response.pathsend" in self._extensions:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+        if "http.response.zerocopy" in self._extensions:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await self._send_zerocopy(send, 0, self.stat_result.st_size)
+            return
+        await super()._handle_simple(send, send_header_only)
+
+    async def _handle_single_range(
+        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool
+    ) -> None:
+        if send_header_only or "http.response.zerocopy" not in self._extensions:
+            return await super()._handle_single_range(send, start, end, file_size, send_header_only)
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        await self._send_zerocopy(send, start, end - start)
+
+    async def _handle_multiple_ranges(
+        self, send: Send, ranges, file_size: int, send_header_only: bool
+    ) -> None:
+        # starlette 0.46은 multipart/byteranges 경계를 Content-Range 헤더에 넣으므로 Content-Type으로 옮김
+        async def fixed_send(message):
+            if message["type"] == "http.response.start":
+                raw = dict(message["headers"])
+                content_range = raw.get(b"content-range", b"")
+                if content_range.startswith(b"multipart/"):
+                    headers = [(k, v) for k, v in message["headers"] if k not in (b"content-range", b"content-type")]
+                    headers.append((b"content-type", content_range))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await super()._handle_multiple_ranges(fixed_send, ranges, file_size, send_header_only)
+
+    async def _send_zerocopy(self, send: Send, offset: int, count: int):
+        f = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            await send({
+                "type": "http.response.zerocopy",
+                "file": f.fileno(),
+                "offset": offset,
+                "count": count,
+                "more_body": False,
+            })
+        finally:
+            await anyio.to_thread.run_sync(f.close)
+
+
+def stat_regular_file(path: str) -> Optional[os.stat_result]:
+    """일반 파일이면 stat 결과, 없거나 디렉토리 등이면 None"""
+    try:
+        result = os.stat(path)
+    except OSError:
+        return None
+    return result if stat.S_ISREG(result.st_mode) else None
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import random
+from typing import Optional
+import httpx
+
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+
+OAUTH_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OAUTH_CONNECT_TIMEOUT_SECONDS", "5"))
+OAUTH_TIMEOUT_SECONDS = float(os.getenv("OAUTH_TIMEOUT_SECONDS", "10"))  # 읽기/쓰기/풀 대기 시간
+OAUTH_MAX_CONNECTIONS = int(os.getenv("OAUTH_MAX_CONNECTIONS", "20"))  # 구글로 동시에 여는 최대 연결 수
+OAUTH_KEEPALIVE_SECONDS = float(os.getenv("OAUTH_KEEPALIVE_SECONDS", "30"))  # 쉬는 연결 유지 시간
+OAUTH_MAX_ATTEMPTS = int(os.getenv("OAUTH_MAX_ATTEMPTS", "3"))  # 첫 시도 포함 최대 시도 횟수
+OAUTH_RETRY_BASE_SECONDS = float(os.getenv("OAUTH_RETRY_BASE_SECONDS", "0.5"))  # 재시도 간격 (0.5, 1, 2초 ...)
+OAUTH_RETRY_MAX_SECONDS = 5.0  # Retry-After가 이보다 길면 기다리지 않고 실패 처리
+
+# 다시 시도하면 성공할 수 있는 응답 (서버가 요청을 처리하지 않은 경우)
+_RETRY_STATUS = {429, 502, 503, 504}
+# 요청이 서버에 전달되기 전에 실패한 경우 - 인가 코드 교환(POST)도 안전하게 재시도 가능
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class GoogleOAuthError(Exception):
+    """구글 토큰 교환/사용자 정보 조회 실패"""
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if value and value.isdigit():
+        return float(value)
+    return None
+
+
+def _json(response: httpx.Response, what: str) -> dict:
+    """응답 본문(JSON 객체) - 프록시 오류 페이지 등 JSON이 아닌 응답도 GoogleOAuthError로"""
+    try:
+        data = response.json()
+    except ValueError as e:
+        raise GoogleOAuthError(f"{what} 응답을 읽을 수 없습니다: {response.text[:200]}") from e
+    if not isinstance(data, dict):
+        raise GoogleOAuthError(f"{what} 응답 형식이 올바르지 않습니다.")
+    return data
+
+
+class GoogleOAuthClient:
+    """
+    구글 OAuth 호출용 비동기 HTTP 클라이언트 (프로세스 전체에서 연결 풀 공유)
+    - keep-alive로 TLS 연결을 재사용하고, 모든 요청에 타임아웃 적용
+    - 일시적인 오류는 지수 백오프로 재시도
+      인가 코드는 한 번만 쓸 수 있으므로 토큰 교환(POST)은 요청이 전달되지 않은 경우(연결 실패, 429/503 등)에만 재시도
+    - 테스트에서는 transport에 httpx.MockTransport를 넘겨 구글 대신 사용
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, max_attempts: int = OAUTH_MAX_ATTEMPTS):
+        self.max_attempts = max(1, max_attempts)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=httpx.Timeout(OAUTH_TIMEOUT_SECONDS, connect=OAUTH_CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=OAUTH_MAX_CONNECTIONS,
+                    max_keepalive_connections=OAUTH_MAX_CONNECTIONS,
+                    keepalive_expiry=OAUTH_KEEPALIVE_SECONDS,
+                ),
+            )
+        return self._client
+
+    async def use_transport(self, transport: Optional[httpx.AsyncBaseTransport]):
+        """다른 transport로 교체 (테스트용 mock 등), 기존 연결은 닫음"""
+        await self.aclose()
+        self._transport = transport
+
+    async def _request(self, method: str, url: str, idempotent: bool, **kwargs) -> httpx.Response:
+        client = self._get_client()
+        for attempt in range(1, self.max_attempts + 1):
+            delay = OAUTH_RETRY_BASE_SECONDS * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, _NOT_SENT_ERRORS)
+                if not retryable or attempt == self.max_attempts:
+                    raise GoogleOAuthError(f"{url} 요청 실패: {e!r}") from e
+                print(f"google oauth 요청 실패, 재시도 ({attempt}/{self.max_attempts}): {e!r}")
+            else:
+                if response.status_code not in _RETRY_STATUS or attempt == self.max_attempts:
+                    return response
+                if not idempotent and response.status_code not in (429, 503):
+                    # 게이트웨이 오류는 코드가 이미 사용됐을 수 있음
+                    return response
+                retry_after = _retry_after(response)
+                if retry_after is not None:
+                    if retry_after > OAUTH_RETRY_MAX_SECONDS:
+                        return response
+                    delay = max(delay, retry_after)
+                print(f"google oauth {response.status_code} 응답, 재시도 ({attempt}/{self.max_attempts})")
+            await asyncio.sleep(delay)
+        raise GoogleOAuthError(f"{url} 요청 실패")
+
+    async def exchange_code(self, code: str, client_id: str, client_secret: str, redirect_uri: str) -> dict:
+        """인가 코드 → 토큰 응답 (access_token 포함)"""
+        response = await self._request(
+            "POST",
+            GOOGLE_TOKEN_URL,
+            idempotent=False,
+            data={
+                "code": code,
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "redirect_uri": redirect_uri,
+                "grant_type": "authorization_code",
+            },
+        )
+        if response.status_code != 200:
+            raise GoogleOAuthError(f"토큰 교환 실패: {response.status_code} {response.text[:200]}")
+        token = _json(response, "토큰 교환")
+        if not token.get("access_token"):
+            raise GoogleOAuthError("토큰 응답에 access_token이 없습니다.")
+        return token
+
+    async def fetch_userinfo(self, access_token: str) -> dict:
+        """구글 사용자 정보 (id, email, name, picture)"""
+        response = await self._request(
+            "GET",
+            GOOGLE_USERINFO_URL,
+            idempotent=True,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        if response.status_code != 200:
+            raise GoogleOAuthError(f"사용자 정보 조회 실패: {response.status_code} {response.text[:200]}")
+        user_info = _json(response, "사용자 정보 조회")
+        if not user_info.get("id") or not user_info.get("email"):
+            raise GoogleOAuthError("사용자 정보에 id/email이 없습니다.")
+        return user_info
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+google_oauth = GoogleOAuthClient()
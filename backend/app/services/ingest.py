@@ -0,0 +1,145 @@
+import hashlib
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# 저장 중인 임시 파일 위치 (/resources로 노출되지 않는 곳)
+SPOOL_DIR = "spool"
+os.makedirs(SPOOL_DIR, exist_ok=True)
+
+# 한 번에 읽고 쓰는 청크 크기 (1MB) - 업로드 한 건당 최대 메모리 사용량은 이 크기로 고정됨
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileTooLargeError(Exception):
+    """스트리밍 중 허용 크기를 초과했을 때 발생"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"file exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+class UnexpectedFileTypeError(Exception):
+    """파일 앞부분(매직 바이트)이 기대한 형식과 다를 때 발생"""
+
+
+@dataclass
+class IngestResult:
+    size: int  # 저장된 바이트 수
+    sha256: str  # 내용의 SHA-256 (hex)
+
+
+async def iter_upload_chunks(file: UploadFile, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """UploadFile을 고정 크기 청크로 나누어 읽기 (전체를 메모리에 올리지 않음)"""
+    await file.seek(0)
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def require_prefix(chunks: AsyncIterator[bytes], prefix: bytes) -> AsyncIterator[bytes]:
+    """스트림 첫 바이트가 prefix로 시작하는지 확인하면서 그대로 전달 (나머지는 버퍼링하지 않음)"""
+    head = b""
+    checked = False
+    async for chunk in chunks:
+        if checked:
+            yield chunk
+            continue
+        head += chunk
+        if len(head) < len(prefix):
+            continue
+        if not head.startswith(prefix):
+            raise UnexpectedFileTypeError()
+        checked = True
+        yield head
+    if not checked:
+        # prefix보다 짧은 스트림
+        raise UnexpectedFileTypeError()
+
+
+async def read_stream(chunks: AsyncIterator[bytes], max_size: int) -> bytes:
+    """작은 파일(서명 이미지 등)을 메모리로 읽기 - max_size를 넘으면 그 시점에 중단"""
+    parts = []
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_size:
+            raise FileTooLargeError(max_size)
+        parts.append(chunk)
+    return b"".join(parts)
+
+
+def _write_chunk(buffer, digest, chunk: bytes):
+    # 해시 계산과 디스크 쓰기를 같은 스레드풀 호출에서 처리
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+async def write_stream(
+    chunks: AsyncIterator[bytes],
+    dest_path: str,
+    max_size: Optional[int] = None,
+) -> IngestResult:
+    """
+    청크 스트림을 dest_path에 저장하면서 크기 제한 검사, SHA-256, 바이트 수를 한 번에 계산
+    임시 파일에 먼저 쓰고 완료되면 rename 하므로 중간에 실패해도 불완전한 파일이 남지 않음
+    """
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            # file.size 헤더가 없어도 도착한 바이트 기준으로 제한
+            if max_size is not None and size > max_size:
+                raise FileTooLargeError(max_size)
+            await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(os.replace, tmp_path, dest_path)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        if os.path.exists(tmp_path):
+            await run_in_threadpool(os.remove, tmp_path)
+        raise
+    return IngestResult(size=size, sha256=digest.hexdigest())
+
+
+async def save_upload_file(
+    file: UploadFile,
+    dest_path: str,
+    max_size: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> IngestResult:
+    """UploadFile을 청크 단위로 dest_path에 저장"""
+    return await write_stream(iter_upload_chunks(file, chunk_size), dest_path, max_size)
+
+
+def _open_for_append(path: str, offset: int):
+    # 이전 시도에서 남은 불완전한 꼬리는 잘라내고 offset 위치부터 이어서 쓰기
+    mode = "r+b" if os.path.exists(path) else "wb"
+    buffer = open(path, mode)
+    buffer.truncate(offset)
+    buffer.seek(offset)
+    return buffer
+
+
+def append_file(src_path: str, dest_path: str, offset: int):
+    """src_path 내용을 dest_path의 offset 위치부터 덧붙이기 (실패하면 offset까지 되돌림, 스레드풀에서 호출)"""
+    with open(src_path, "rb") as src:
+        buffer = _open_for_append(dest_path, offset)
+        try:
+            shutil.copyfileobj(src, buffer, CHUNK_SIZE)
+            buffer.flush()
+        except BaseException:
+            buffer.truncate(offset)
+            raise
+        finally:
+            buffer.close()
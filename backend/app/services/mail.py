@@ -0,0 +1,307 @@
+import asyncio
+import os
+import smtplib
+import time
+from dataclasses import dataclass
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List, Optional
+from dotenv import load_dotenv
+from jinja2 import Environment
+
+load_dotenv()
+
+# SMTP 설정 (테스트 시 SMTP_HOST/SMTP_PORT를 로컬 SMTP 서버로, SMTP_STARTTLS=false로 지정)
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_USER = os.getenv("GMAIL_USER")
+SMTP_PASSWORD = os.getenv("GMAIL_PASSWORD")
+
+MAIL_QUEUE_SIZE = int(os.getenv("MAIL_QUEUE_SIZE", "1000"))  # 대기열 최대 길이
+MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", "2"))  # 워커 수 = 유지하는 SMTP 연결 수
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "4"))  # 첫 시도 포함 최대 전송 시도 횟수
+MAIL_RETRY_BASE_SECONDS = float(os.getenv("MAIL_RETRY_BASE_SECONDS", "2"))  # 재시도 간격 (2, 4, 8초 ...)
+SMTP_IDLE_CHECK_SECONDS = 30  # 이 시간 이상 쉬었던 연결은 NOOP으로 살아있는지 확인 후 사용
+SMTP_TIMEOUT_SECONDS = 30
+
+HEADER_IMAGE_PATH = os.path.join(os.path.dirname(__file__), "..", "email_header.png")
+
+# 서명 요청 메일 제목 - HTML이 아닌 헤더이므로 escape하지 않음 (str.format)
+SIGN_REQUEST_SUBJECT = "sign2gether에서 함께 서명하세요. 문서명: {filename}"
+# 서명 요청 메일 본문 템플릿 (서버 시작 시 한 번만 컴파일)
+_templates = Environment(autoescape=True)
+SIGN_REQUEST_TEMPLATE = _templates.from_string('''
+        <html>
+        <body style="background:#f9fafb; margin:0; padding:0;">
+            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background:#f9fafb;">
+            <tr>
+                <td align="center">
+                <table width="600" cellpadding="0" cellspacing="0" border="0" style="background:#fff; border-radius:12px; box-shadow:0 2px 8px #eee; padding:0 0 32px 0;">
+                    <tr>
+                    <td align="center" style="padding-top:0px; padding-bottom:24px;">
+                        <img src="cid:image1"
+                            style="width:100%; max-width:600px; display:block; margin:0"
+                            alt="Sign2gether" />
+                    </td>
+                    </tr>
+                    <tr>
+                    <td align="center" style="font-size:15px; color:#444; font-weight:700; padding-bottom:24px;">
+                        Sign2gether 서명 요청
+                    </td>
+                    </tr>
+                    <tr>
+                    <td style="font-size:12px; color:#444; font-weight:600; padding:0 32px 0 32px;">
+                        안녕하세요, <b>{{ name }}님</b>.
+                    </td>
+                    </tr>
+                    <tr>
+                    <td style="font-size:12px; color:#444; font-weight:600; padding:16px 32px 0 32px;">
+                        문서명: <span style="font-weight:bold;">{{ filename }}</span>
+                    </td>
+                    </tr>
+                    <tr>
+                    <td style="font-size:12px; color:#444; padding:16px 32px 0 32px;">
+                        아래 버튼을 눌러 서명에 참여해 주세요!
+                    </td>
+                    </tr>
+                    <tr>
+                    <td align="center" style="padding:40px 0 0 0;">
+                        <a href="{{ url }}" style="background:#2979ff; color:#fff; text-decoration:none; padding:18px 48px; border-radius:8px; font-size:12px; font-weight:bold; display:inline-block;">
+                        서명하러 가기
+                        </a>
+                    </td>
+                    </tr>
+                    <tr>
+                    <td align="center" style="font-size:8px; color:#bbb; padding-top:20px;">
+                        본 메일은 Sign2gether에서 자동 발송되었습니다.
+                    </td>
+                    </tr>
+                </table>
+                </td>
+            </tr>
+            </table>
+        </body>
+        </html>
+        ''')
+
+
+@dataclass
+class OutgoingMail:
+    to: str
+    subject: str
+    html: str
+    attempts: int = 0
+
+
+class SMTPConnection:
+    """워커 하나가 계속 재사용하는 SMTP 연결 (STARTTLS, 로그인은 연결할 때 한 번만)"""
+
+    def __init__(self, host: str, port: int, username: Optional[str], password: Optional[str], starttls: bool):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        if self.starttls:
+            server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        self._server = server
+
+    def _is_alive(self) -> bool:
+        try:
+            return self._server.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    def send(self, message: MIMEMultipart):
+        if self._server is not None and time.monotonic() - self._last_used > SMTP_IDLE_CHECK_SECONDS:
+            if not self._is_alive():
+                self.close()
+        if self._server is None:
+            self._connect()
+        try:
+            self._server.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # 서버가 유휴 연결을 끊은 경우 한 번만 다시 연결해서 전송
+            self.close()
+            self._connect()
+            self._server.send_message(message)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+class MailOutbox:
+    """
+    메일 발송 대기열 - 제한된 크기의 큐를 워커들이 각자의 SMTP 연결로 처리
+    실패한 메일은 지수 백오프로 재시도하고, 처리 현황은 stats()로 확인
+    """
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        username: Optional[str] = SMTP_USER,
+        password: Optional[str] = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        sender: Optional[str] = SMTP_USER,
+        workers: int = MAIL_WORKERS,
+        queue_size: int = MAIL_QUEUE_SIZE,
+        max_attempts: int = MAIL_MAX_ATTEMPTS,
+        retry_base_seconds: float = MAIL_RETRY_BASE_SECONDS,
+        header_image_path: str = HEADER_IMAGE_PATH,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.sender = str(sender)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.header_image_path = header_image_path
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._retry_tasks = set()
+        self._connections: List[SMTPConnection] = []
+        self._header_image: Optional[MIMEImage] = None
+        self._stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "dropped": 0,
+            "send_count": 0,
+            "send_seconds_total": 0.0,
+            "send_seconds_max": 0.0,
+        }
+
+    def _header_image_part(self) -> MIMEImage:
+        # 헤더 이미지는 처음 한 번만 읽고 모든 메일에서 같은 파트를 재사용
+        if self._header_image is None:
+            with open(self.header_image_path, "rb") as img:
+                part = MIMEImage(img.read(), name="email_header.png")
+            part.add_header("Content-ID", "<image1>")
+            self._header_image = part
+        return self._header_image
+
+    def _build_message(self, mail: OutgoingMail) -> MIMEMultipart:
+        msg = MIMEMultipart("related")
+        msg["From"] = self.sender
+        msg["To"] = mail.to
+        msg["Subject"] = mail.subject
+        msg.attach(MIMEText(mail.html, "html"))
+        msg.attach(self._header_image_part())
+        return msg
+
+    def enqueue(self, mail: OutgoingMail) -> bool:
+        """대기열에 메일 추가 (가득 찼으면 버리고 False)"""
+        try:
+            self._queue.put_nowait(mail)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            print(f"mail queue full, dropped mail to {mail.to}")
+            return False
+        self._stats["enqueued"] += 1
+        return True
+
+    def enqueue_sign_requests(self, emails: List[str], names: List[str], filename: str, url: str) -> int:
+        """서명자들에게 서명 요청 메일 등록, 등록된 메일 수 반환"""
+        subject = SIGN_REQUEST_SUBJECT.format(filename=filename)
+        queued = 0
+        for email, name in zip(emails, names):
+            html = SIGN_REQUEST_TEMPLATE.render(name=name, filename=filename, url=url)
+            if self.enqueue(OutgoingMail(to=email, subject=subject, html=html)):
+                queued += 1
+        return queued
+
+    async def _retry_later(self, mail: OutgoingMail, delay: float):
+        await asyncio.sleep(delay)
+        await self._queue.put(mail)
+
+    def _record_latency(self, seconds: float):
+        self._stats["send_count"] += 1
+        self._stats["send_seconds_total"] += seconds
+        self._stats["send_seconds_max"] = max(self._stats["send_seconds_max"], seconds)
+
+    async def _worker(self, connection: SMTPConnection):
+        while True:
+            mail = await self._queue.get()
+            try:
+                mail.attempts += 1
+                message = self._build_message(mail)
+                started = time.monotonic()
+                try:
+                    await asyncio.to_thread(connection.send, message)
+                finally:
+                    self._record_latency(time.monotonic() - started)
+                self._stats["sent"] += 1
+            except smtplib.SMTPRecipientsRefused as e:
+                # 받는 주소 문제는 재시도해도 같은 결과
+                self._stats["failed"] += 1
+                print(f"mail to {mail.to} refused: {e}")
+            except Exception as e:
+                connection.close()
+                if mail.attempts < self.max_attempts:
+                    self._stats["retried"] += 1
+                    delay = self.retry_base_seconds * (2 ** (mail.attempts - 1))
+                    task = asyncio.create_task(self._retry_later(mail, delay))
+                    self._retry_tasks.add(task)
+                    task.add_done_callback(self._retry_tasks.discard)
+                else:
+                    self._stats["failed"] += 1
+                    print(f"mail to {mail.to} failed after {mail.attempts} attempts: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def start(self):
+        if self._tasks:
+            return
+        for _ in range(self.workers):
+            connection = SMTPConnection(self.host, self.port, self.username, self.password, self.starttls)
+            self._connections.append(connection)
+            self._tasks.append(asyncio.create_task(self._worker(connection)))
+
+    async def stop(self, drain_timeout: float = 10):
+        """대기 중인 메일을 drain_timeout초 동안 보내본 뒤 워커와 연결 정리"""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"mail outbox stopped with {self._queue.qsize()} mails pending")
+        for task in [*self._tasks, *self._retry_tasks]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retry_tasks, return_exceptions=True)
+        self._tasks = []
+        for connection in self._connections:
+            await asyncio.to_thread(connection.close)
+        self._connections = []
+
+    def stats(self) -> dict:
+        send_count = self._stats["send_count"]
+        return {
+            **self._stats,
+            "queue_depth": self._queue.qsize(),
+            "retry_pending": len(self._retry_tasks),
+            "send_seconds_avg": self._stats["send_seconds_total"] / send_count if send_count else 0.0,
+        }
+
+
+mail_outbox = MailOutbox()
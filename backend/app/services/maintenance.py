@@ -0,0 +1,46 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, List
+
+# 주기 작업 실행 간격 (초)
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "300"))
+
+_jobs: List[Callable[[], Awaitable[None]]] = []
+_task = None
+
+
+def register(job: Callable[[], Awaitable[None]]):
+    """주기적으로 실행할 정리 작업 등록 (인자 없는 async 함수)"""
+    _jobs.append(job)
+
+
+async def run_once():
+    for job in _jobs:
+        try:
+            await job()
+        except Exception as e:
+            # 한 작업이 실패해도 나머지 작업과 다음 주기는 계속 실행
+            print(f"maintenance job {job.__name__} failed: {e}")
+
+
+async def _loop():
+    while True:
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+        await run_once()
+
+
+def start():
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_loop())
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
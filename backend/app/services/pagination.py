@@ -0,0 +1,47 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+
+# 목록 API 한 페이지 기본/최대 크기
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# 다음 페이지 커서를 담는 응답 헤더 (본문은 기존과 같은 배열)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(uploaded_at: datetime, row_id: int) -> str:
+    raw = f"{uploaded_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """커서 → (uploaded_at, id), 형식이 잘못되면 400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        uploaded_at, row_id = raw.split("|")
+        return datetime.fromisoformat(uploaded_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+
+
+def keyset_page(query: Select, uploaded_at_column, id_column, cursor: Optional[str], limit: int) -> Select:
+    """
+    (uploaded_at, id) 기준 최신순 keyset 페이지네이션
+    OFFSET과 달리 앞 페이지를 건너뛰며 읽지 않으므로 목록이 길어져도 페이지 조회 비용이 일정함
+    다음 페이지가 있는지 알기 위해 limit + 1개를 조회
+    """
+    if cursor:
+        query = query.where(tuple_(uploaded_at_column, id_column) < tuple_(*decode_cursor(cursor)))
+    return query.order_by(uploaded_at_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence, limit: int) -> Tuple[Sequence, Optional[str]]:
+    """limit + 1개 조회 결과 → (이번 페이지 행, 다음 페이지 커서 또는 None)"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.uploaded_at, last.id)
@@ -0,0 +1,39 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from PyPDF2 import PdfReader
+
+# 선형화(linearized) PDF는 첫 객체에 /Linearized 사전이 있음
+_LINEARIZED_PATTERN = re.compile(rb"/Linearized\b")
+
+
+@dataclass
+class PdfStructure:
+    """PDF 구조 분석 결과 (워커 프로세스에서 반환, pickle 가능)"""
+    encrypted: bool
+    linearized: bool
+    page_count: Optional[int] = None  # 암호를 풀 수 없으면 None
+    pages: List[Tuple[float, float, int]] = field(default_factory=list)  # (너비, 높이, 회전)
+
+
+def inspect_pdf(path: str) -> PdfStructure:
+    """페이지 수, 페이지별 크기/회전, 암호화/선형화 여부 분석 (워커 프로세스에서 실행)"""
+    with open(path, "rb") as f:
+        head = f.read(1024)
+    linearized = bool(_LINEARIZED_PATTERN.search(head))
+
+    reader = PdfReader(path)
+    encrypted = reader.is_encrypted
+    if encrypted:
+        # 사용자 암호가 없는 문서(열기 암호 없음)는 빈 암호로 열림
+        try:
+            if not reader.decrypt(""):
+                return PdfStructure(encrypted=True, linearized=linearized)
+        except Exception:
+            return PdfStructure(encrypted=True, linearized=linearized)
+
+    pages = []
+    for page in reader.pages:
+        rotation = int(page.get("/Rotate", 0) or 0) % 360
+        pages.append((float(page.mediabox.width), float(page.mediabox.height), rotation))
+    return PdfStructure(encrypted=encrypted, linearized=linearized, page_count=len(pages), pages=pages)
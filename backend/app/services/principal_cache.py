@@ -0,0 +1,113 @@
+import hashlib
+import os
+import time
+from typing import Optional, Tuple
+from cachetools import TTLCache
+
+# 사용자 정보 캐시 유지 시간 (초, 0이면 사용 안 함)
+# 프로세스 안에서만 공유되므로 다른 프로세스에서 바뀐 사용자 정보는 최대 이 시간만큼 늦게 반영됨
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+# 검증에 실패한 토큰을 기억하는 시간 (같은 잘못된 쿠키가 반복해서 들어올 때 서명 검증 생략)
+BAD_TOKEN_CACHE_TTL_SECONDS = int(os.getenv("BAD_TOKEN_CACHE_TTL_SECONDS", "300"))
+BAD_TOKEN_CACHE_SIZE = int(os.getenv("BAD_TOKEN_CACHE_SIZE", "10000"))
+
+
+def token_digest(token: str) -> str:
+    """토큰 원문 대신 해시를 키로 사용 (메모리에 토큰을 그대로 남기지 않음)"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """
+    get_current_user_from_cookie용 캐시
+    - 토큰 해시 → (user_id, 만료 시각): 같은 토큰은 JWT 검증 생략 (만료 시각은 매번 확인)
+    - user_id → 사용자 정보 dict: users 테이블 조회 생략, create_or_update_user에서 invalidate
+    - 잘못된 토큰 해시 → 오류 메시지: 검증 실패 결과를 재사용 (negative cache)
+    """
+
+    def __init__(
+        self,
+        ttl: int = PRINCIPAL_CACHE_TTL_SECONDS,
+        maxsize: int = PRINCIPAL_CACHE_SIZE,
+        bad_token_ttl: int = BAD_TOKEN_CACHE_TTL_SECONDS,
+        bad_token_maxsize: int = BAD_TOKEN_CACHE_SIZE,
+    ):
+        self.enabled = ttl > 0
+        self._principals = TTLCache(maxsize=maxsize, ttl=max(ttl, 1))
+        self._tokens = TTLCache(maxsize=maxsize, ttl=max(ttl, 1))
+        self._bad_tokens = TTLCache(maxsize=bad_token_maxsize, ttl=max(bad_token_ttl, 1))
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "token_hits": 0,
+            "bad_token_hits": 0,
+            "bad_tokens": 0,
+            "invalidations": 0,
+        }
+
+    def get_token(self, digest: str) -> Optional[int]:
+        """검증된 적 있는 토큰이면 user_id (만료된 토큰은 None)"""
+        if not self.enabled:
+            return None
+        entry: Optional[Tuple[int, float]] = self._tokens.get(digest)
+        if entry is None:
+            return None
+        user_id, expires_at = entry
+        if expires_at <= time.time():
+            self._tokens.pop(digest, None)
+            return None
+        self._stats["token_hits"] += 1
+        return user_id
+
+    def put_token(self, digest: str, user_id: int, expires_at: Optional[float]):
+        if self.enabled and expires_at:
+            self._tokens[digest] = (user_id, expires_at)
+
+    def get_bad_token(self, digest: str) -> Optional[str]:
+        """검증에 실패했던 토큰이면 그때의 오류 메시지"""
+        detail = self._bad_tokens.get(digest)
+        if detail is not None:
+            self._stats["bad_token_hits"] += 1
+        return detail
+
+    def put_bad_token(self, digest: str, detail: str):
+        self._bad_tokens[digest] = detail
+        self._stats["bad_tokens"] += 1
+
+    def get(self, user_id: int) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        principal = self._principals.get(user_id)
+        if principal is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        # 호출하는 쪽에서 수정해도 캐시는 바뀌지 않도록 복사본 반환
+        return dict(principal)
+
+    def put(self, user_id: int, principal: dict):
+        if self.enabled:
+            self._principals[user_id] = dict(principal)
+
+    def invalidate(self, user_id: int):
+        if self._principals.pop(user_id, None) is not None:
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        self._principals.clear()
+        self._tokens.clear()
+        self._bad_tokens.clear()
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._principals),
+            "tokens": len(self._tokens),
+            "bad_token_entries": len(self._bad_tokens),
+            "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,95 @@
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# /resources 메모리 캐시 전체 크기 (bytes, 0이면 사용 안 함)
+RESOURCE_CACHE_BYTES = int(os.getenv("RESOURCE_CACHE_BYTES", str(64 * 1024 * 1024)))
+# 이보다 큰 파일은 캐시하지 않고 디스크에서 바로 전송
+RESOURCE_CACHE_MAX_OBJECT_BYTES = int(os.getenv("RESOURCE_CACHE_MAX_OBJECT_BYTES", str(8 * 1024 * 1024)))
+
+
+@dataclass
+class CachedResource:
+    data: bytes
+    version: Tuple[int, int]  # (mtime_ns, size) - 파일이 바뀌었는지 확인용
+    headers: dict  # etag, last-modified 등
+
+
+class ResourceCache:
+    """
+    자주 요청되는 파일 내용을 메모리에 보관하는 LRU 캐시 (전체 크기 제한)
+    키는 저장소 키, 파일 버전(mtime, 크기)이 다르면 오래된 항목으로 보고 버림
+    서명 삽입/문서 삭제/서명 삭제 시 invalidate로 명시적으로 제거
+    """
+
+    def __init__(self, max_bytes: int = RESOURCE_CACHE_BYTES, max_object_bytes: int = RESOURCE_CACHE_MAX_OBJECT_BYTES):
+        self.max_bytes = max_bytes
+        self.max_object_bytes = min(max_object_bytes, max_bytes)
+        self._entries: "OrderedDict[str, CachedResource]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    def cacheable(self, size: int) -> bool:
+        return 0 < size <= self.max_object_bytes
+
+    def get(self, key: str, version: Tuple[int, int]) -> Optional[CachedResource]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        if entry.version != version:
+            # 같은 키의 파일이 바뀜 (다른 프로세스가 다시 쓴 경우 등)
+            self._stats["stale"] += 1
+            self._stats["misses"] += 1
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry
+
+    def put(self, key: str, version: Tuple[int, int], data: bytes, headers: dict):
+        if not self.cacheable(len(data)):
+            return
+        self._remove(key)
+        self._entries[key] = CachedResource(data=data, version=version, headers=headers)
+        self._bytes += len(data)
+        # 전체 크기를 넘으면 가장 오래 쓰지 않은 항목부터 제거
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.data)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, key: str):
+        if self._remove(key):
+            self._stats["invalidations"] += 1
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= len(entry.data)
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
+resource_cache = ResourceCache()
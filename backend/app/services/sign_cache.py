@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db import AsyncSessionLocal
+from app.models import GeneratedSign
+from app.services.storage import storage
+from app.services.blob import remove_files
+from app.services.sign_generation import sign_generator, normalize_name, SignGenerationBusyError
+from app.services.sign_image import process_sign_image
+
+# 생성한 서명 캐시 설정
+SIGN_CACHE_TTL_SECONDS = int(os.getenv("SIGN_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # 마지막 사용 후 보관 기간
+SIGN_CACHE_BYTES = int(os.getenv("SIGN_CACHE_BYTES", str(256 * 1024 * 1024)))  # 전체 캐시 크기 (넘으면 LRU 순으로 삭제)
+# (사용자, 이름, 스타일)별로 보관하는 variant 수 - 이만큼 쌓이면 재생성 요청은 모델 호출 없이 보관된 variant를 돌려가며 응답
+SIGN_CACHE_VARIANTS = int(os.getenv("SIGN_CACHE_VARIANTS", "4"))
+# 최근 요청된 이름마다 미리 만들어 둘 variant 수 (0이면 미리 생성하지 않음)
+SIGN_PREGENERATE_POOL = int(os.getenv("SIGN_PREGENERATE_POOL", "0"))
+
+GENERATED_NAMESPACE = "generated"
+
+_refills: Dict[Tuple[int, str, str], asyncio.Task] = {}  # 진행 중인 미리 생성 작업
+_stats = {
+    "pool_hits": 0,
+    "rotations": 0,
+    "generated": 0,
+    "pregenerated": 0,
+    "duplicates": 0,
+    "evictions": 0,
+}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def _variants(db: AsyncSession, user_id: int, name_key: str, style: str) -> List[GeneratedSign]:
+    result = await db.execute(
+        select(GeneratedSign)
+        .where(GeneratedSign.user_id == user_id, GeneratedSign.name_key == name_key, GeneratedSign.style == style)
+        .order_by(GeneratedSign.last_used_at, GeneratedSign.id)
+    )
+    return list(result.scalars().all())
+
+
+async def _read(variant: GeneratedSign) -> Optional[bytes]:
+    chunks = []
+    try:
+        async for chunk in storage.get_stream(variant.file_path):
+            chunks.append(chunk)
+    except FileNotFoundError:
+        return None
+    return b"".join(chunks)
+
+
+async def _store_variant(
+    user_id: int, name_key: str, style: str, png: bytes, served: bool
+) -> Optional[GeneratedSign]:
+    """
+    후처리한 PNG를 저장하고 variant 기록 (이미 있는 내용이면 저장하지 않고 None)
+    served이면 이미 있는 variant도 보여준 것으로 표시 (미리 만들어 둔 pool에서 같은 이미지를 다시 응답하지 않도록)
+    """
+    digest = _sha256(png)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(GeneratedSign).where(
+                GeneratedSign.user_id == user_id,
+                GeneratedSign.name_key == name_key,
+                GeneratedSign.style == style,
+                GeneratedSign.digest == digest
+            )
+        )
+        existing = result.scalars().first()
+        if existing is not None:
+            # 같은 이름의 동시 요청과 결과를 공유한 경우
+            _stats["duplicates"] += 1
+            if served:
+                now = datetime.utcnow()
+                existing.served_at = existing.served_at or now
+                existing.last_used_at = now
+                await db.commit()
+            return None
+
+        key = storage.shard_key(GENERATED_NAMESPACE, f"{uuid.uuid4()}.png")
+        await storage.put_bytes(key, png)
+        now = datetime.utcnow()
+        variant = GeneratedSign(
+            user_id=user_id,
+            name_key=name_key,
+            style=style,
+            digest=digest,
+            file_path=key,
+            file_size=len(png),
+            created_at=now,
+            last_used_at=now,
+            served_at=now if served else None,
+        )
+        db.add(variant)
+        try:
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            await remove_files([key])
+            raise
+        return variant
+
+
+async def _generate_variant(
+    user_id: int, name_key: str, style: str, served: bool
+) -> Tuple[bytes, Optional[GeneratedSign]]:
+    """
+    모델로 새 variant 생성 → 후처리 → 저장
+    생성은 최대 SIGN_GENERATION_TIMEOUT_SECONDS까지 걸리므로 DB 세션 없이 호출하고, 저장할 때만 새 세션 사용
+    """
+    # 미리 생성은 사용자 요청과 결과를 공유하지 않음 (공유하면 방금 보여준 이미지가 pool에 들어감)
+    flight = None if served else f"refill:{user_id}"
+    image_bytes = await sign_generator.generate(name_key, style, flight=flight)
+    png = await run_in_threadpool(process_sign_image, image_bytes, "white")
+    return png, await _store_variant(user_id, name_key, style, png, served)
+
+
+async def get_generated_sign(db: AsyncSession, user_id: int, name: str, style: str) -> Tuple[bytes, bool]:
+    """
+    (사용자, 이름, 스타일)에 해당하는 서명 PNG 반환: (png, 캐시에서 응답했는지)
+    1. 미리 만들어 둔 variant가 있으면 그것을 응답
+    2. 보관된 variant가 SIGN_CACHE_VARIANTS개 이상이면 가장 오래 전에 보여준 것을 다시 응답
+    3. 아니면 모델로 생성해서 저장
+    응답 후 미리 생성 pool을 다시 채움 (설정된 경우)
+    """
+    name_key = normalize_name(name)
+    variants = await _variants(db, user_id, name_key, style)
+    ready = [variant for variant in variants if variant.served_at is None]
+    candidates = ready or (variants if len(variants) >= SIGN_CACHE_VARIANTS else [])
+
+    png = None
+    for variant in candidates:
+        png = await _read(variant)
+        if png is None:
+            # 파일이 사라진 항목은 정리
+            await db.delete(variant)
+            continue
+        now = datetime.utcnow()
+        variant.served_at = variant.served_at or now
+        variant.last_used_at = now
+        _stats["pool_hits" if variant in ready else "rotations"] += 1
+        break
+
+    # 모델을 기다리는 동안 트랜잭션(연결)을 잡고 있지 않도록 먼저 commit
+    await db.commit()
+    cached = png is not None
+    if not cached:
+        png, _ = await _generate_variant(user_id, name_key, style, served=True)
+        _stats["generated"] += 1
+
+    schedule_refill(user_id, name_key, style)
+    return png, cached
+
+
+def schedule_refill(user_id: int, name_key: str, style: str):
+    """미리 생성 pool 채우기를 백그라운드로 실행 (같은 키는 하나만)"""
+    if SIGN_PREGENERATE_POOL <= 0:
+        return
+    key = (user_id, name_key, style)
+    if key in _refills:
+        return
+    task = asyncio.create_task(_refill(user_id, name_key, style))
+    _refills[key] = task
+    task.add_done_callback(lambda _: _refills.pop(key, None))
+
+
+async def _refill(user_id: int, name_key: str, style: str):
+    """아직 보여주지 않은 variant가 SIGN_PREGENERATE_POOL개가 되도록 하나씩 생성 (생성 대기열이 붐비면 중단)"""
+    try:
+        for _ in range(SIGN_PREGENERATE_POOL):
+            # 개수 확인만 짧은 세션으로 (생성하는 동안에는 세션을 열어 두지 않음)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(func.count(GeneratedSign.id)).where(
+                        GeneratedSign.user_id == user_id,
+                        GeneratedSign.name_key == name_key,
+                        GeneratedSign.style == style,
+                        GeneratedSign.served_at.is_(None)
+                    )
+                )
+                ready = result.scalar_one()
+            if ready >= SIGN_PREGENERATE_POOL:
+                break
+            _, variant = await _generate_variant(user_id, name_key, style, served=False)
+            if variant is not None:
+                _stats["pregenerated"] += 1
+    except SignGenerationBusyError:
+        # 사용자 요청이 우선 - 다음 요청 때 다시 시도
+        pass
+    except Exception as e:
+        print(f"서명 미리 생성 실패 ({name_key}): {e}")
+
+
+async def evict_generated_signs():
+    """
+    생성한 서명 캐시 정리 (maintenance 주기 작업)
+    - 마지막 사용 후 SIGN_CACHE_TTL_SECONDS가 지난 항목
+    - 키별 SIGN_CACHE_VARIANTS개를 넘는 오래된 variant (미리 만들어 둔 것 제외)
+    - 전체 크기가 SIGN_CACHE_BYTES를 넘으면 가장 오래 쓰지 않은 항목부터
+    """
+    async with AsyncSessionLocal() as db:
+        expired_before = datetime.utcnow() - timedelta(seconds=SIGN_CACHE_TTL_SECONDS)
+        result = await db.execute(
+            delete(GeneratedSign)
+            .where(GeneratedSign.last_used_at < expired_before)
+            .returning(GeneratedSign.file_path)
+        )
+        keys = list(result.scalars().all())
+
+        ranked = (
+            select(
+                GeneratedSign.id,
+                func.row_number().over(
+                    partition_by=(GeneratedSign.user_id, GeneratedSign.name_key, GeneratedSign.style),
+                    order_by=(GeneratedSign.last_used_at.desc(), GeneratedSign.id.desc())
+                ).label("rank")
+            )
+            .where(GeneratedSign.served_at.is_not(None))
+            .subquery()
+        )
+        result = await db.execute(
+            delete(GeneratedSign)
+            .where(GeneratedSign.id.in_(select(ranked.c.id).where(ranked.c.rank > SIGN_CACHE_VARIANTS)))
+            .returning(GeneratedSign.file_path)
+        )
+        keys += result.scalars().all()
+
+        total = (await db.execute(select(func.coalesce(func.sum(GeneratedSign.file_size), 0)))).scalar_one()
+        if total > SIGN_CACHE_BYTES:
+            result = await db.execute(
+                select(GeneratedSign.id, GeneratedSign.file_path, GeneratedSign.file_size)
+                .order_by(GeneratedSign.last_used_at, GeneratedSign.id)
+            )
+            victims = []
+            for row in result:
+                if total <= SIGN_CACHE_BYTES:
+                    break
+                victims.append(row.id)
+                keys.append(row.file_path)
+                total -= row.file_size
+            await db.execute(delete(GeneratedSign).where(GeneratedSign.id.in_(victims)))
+        await db.commit()
+
+    if keys:
+        _stats["evictions"] += len(keys)
+        await remove_files(keys)
+
+
+def stats() -> dict:
+    return {**_stats, "refilling": len(_refills), "pool_size": SIGN_PREGENERATE_POOL}
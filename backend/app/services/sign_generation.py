@@ -0,0 +1,235 @@
+import asyncio
+import os
+import time
+from io import BytesIO
+from typing import Dict, Optional, Protocol
+from dotenv import load_dotenv
+from PIL import Image, ImageDraw, ImageFont
+
+load_dotenv()
+
+# 이미지 생성 provider: gemini (기본) 또는 stub (네트워크 없이 로컬에서 이름을 그려서 반환)
+SIGN_GENERATION_PROVIDER = os.getenv("SIGN_GENERATION_PROVIDER", "gemini")
+SIGN_GENERATION_MODEL = os.getenv("SIGN_GENERATION_MODEL", "gemini-2.0-flash-preview-image-generation")
+SIGN_GENERATION_CONCURRENCY = int(os.getenv("SIGN_GENERATION_CONCURRENCY", "4"))  # 동시에 진행하는 생성 요청 수
+SIGN_GENERATION_QUEUE_MAX = int(os.getenv("SIGN_GENERATION_QUEUE_MAX", "16"))  # 자리를 기다릴 수 있는 최대 요청 수
+SIGN_GENERATION_TIMEOUT_SECONDS = float(os.getenv("SIGN_GENERATION_TIMEOUT_SECONDS", "60"))  # 한 번의 생성 호출 제한 시간
+SIGN_GENERATION_RETRY_AFTER_SECONDS = int(os.getenv("SIGN_GENERATION_RETRY_AFTER_SECONDS", "10"))  # 429 응답의 Retry-After 기본값
+
+SIGN_PROMPT = (
+    "Generate a high-resolution PNG image of a handwritten signature for the name {name}. "
+    "Use a {pen} style, with a white background. "
+    "The signature should appear natural, slightly slanted, and fluid, resembling a real personal signature."
+)
+# 서명 스타일 → 프롬프트의 필기구 표현
+SIGN_STYLES = {
+    "ballpoint": "black ballpoint pen",
+    "fountain": "black fountain pen with varying stroke width",
+    "marker": "bold black felt-tip marker",
+}
+DEFAULT_SIGN_STYLE = "ballpoint"
+
+
+class SignGenerationBusyError(Exception):
+    """대기열이 가득 찼거나 provider가 429를 돌려줌 - retry_after초 뒤에 다시 시도"""
+
+    def __init__(self, retry_after: int = SIGN_GENERATION_RETRY_AFTER_SECONDS):
+        super().__init__(f"retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class SignGenerationTimeoutError(Exception):
+    """생성 호출이 제한 시간 안에 끝나지 않음"""
+
+
+class SignGenerationError(Exception):
+    """provider 오류 또는 응답에 이미지가 없음"""
+
+
+class SignImageProvider(Protocol):
+    async def generate(self, name: str, style: str = DEFAULT_SIGN_STYLE) -> bytes:
+        """이름 → 서명 이미지 bytes (PNG 등)"""
+        ...
+
+
+class GeminiSignProvider:
+    """Gemini 이미지 생성 (프로세스 전체에서 client 하나를 공유, 비동기 API 사용)"""
+
+    def __init__(self, api_key: Optional[str] = None, model: str = SIGN_GENERATION_MODEL):
+        self.api_key = api_key or os.getenv("GEMINI_APIKEY")
+        self.model = model
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    async def generate(self, name: str, style: str = DEFAULT_SIGN_STYLE) -> bytes:
+        from google.genai import errors, types
+
+        try:
+            response = await self._get_client().aio.models.generate_content(
+                model=self.model,
+                contents=SIGN_PROMPT.format(name=name, pen=SIGN_STYLES[style]),
+                config=types.GenerateContentConfig(response_modalities=["TEXT", "IMAGE"])
+            )
+        except errors.APIError as e:
+            if e.code == 429:
+                raise SignGenerationBusyError(_retry_after(e.response)) from e
+            raise SignGenerationError(f"gemini 오류: {e.code} {e.message}") from e
+
+        for candidate in response.candidates or []:
+            for part in (candidate.content.parts if candidate.content else None) or []:
+                if part.inline_data is not None and part.inline_data.data:
+                    return part.inline_data.data
+                if part.text is not None:
+                    print(part.text)
+        raise SignGenerationError("gemini 응답에 이미지가 없습니다.")
+
+
+def _retry_after(response) -> int:
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    if value and str(value).isdigit():
+        return int(value)
+    return SIGN_GENERATION_RETRY_AFTER_SECONDS
+
+
+class StubSignProvider:
+    """네트워크 없이 이름을 그린 PNG를 반환 (개발/테스트용), delay로 생성 시간을 흉내냄"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(self, name: str, style: str = DEFAULT_SIGN_STYLE) -> bytes:
+        self.calls += 1
+        call = self.calls  # 대기하는 동안 다른 호출이 calls를 올려도 호출마다 다른 이미지
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        img = Image.new("RGB", (600, 200), "white")
+        draw = ImageDraw.Draw(img)
+        draw.text((40, 80), f"{name} ({style})", fill="black", font=ImageFont.load_default())
+        # 호출마다 밑줄 길이를 바꿔서 variant마다 다른 이미지가 되도록 (위치만 바꾸면 잉크 영역으로 자를 때 같아짐)
+        draw.line((40, 100, 140 + call % 50 * 5, 100), fill="black", width=2)
+        output = BytesIO()
+        img.save(output, format="PNG")
+        return output.getvalue()
+
+
+def create_provider(name: str = SIGN_GENERATION_PROVIDER) -> SignImageProvider:
+    if name == "stub":
+        return StubSignProvider()
+    if name == "gemini":
+        return GeminiSignProvider()
+    raise ValueError(f"지원하지 않는 SIGN_GENERATION_PROVIDER: {name}")
+
+
+def normalize_name(name: str) -> str:
+    """같은 이름으로 볼 기준 (앞뒤/연속 공백 무시)"""
+    return " ".join(name.split())
+
+
+class SignGenerator:
+    """
+    서명 이미지 생성 요청 관리
+    - 동시에 진행하는 provider 호출 수를 semaphore로 제한, 자리를 기다리는 요청이 queue_max를 넘으면 바로 거절(429)
+    - 같은 이름/스타일의 요청이 진행 중이면 새로 호출하지 않고 그 결과를 함께 받음 (single-flight, flight로 공유 범위를 나눔)
+    - 호출마다 timeout 적용
+    """
+
+    def __init__(
+        self,
+        provider: Optional[SignImageProvider] = None,
+        concurrency: int = SIGN_GENERATION_CONCURRENCY,
+        queue_max: int = SIGN_GENERATION_QUEUE_MAX,
+        timeout: float = SIGN_GENERATION_TIMEOUT_SECONDS,
+    ):
+        self._provider = provider
+        self.concurrency = concurrency
+        self.queue_max = queue_max
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight: Dict[str, asyncio.Task] = {}  # [flight:]스타일:이름 → 진행 중이거나 자리를 기다리는 작업
+        self._stats = {
+            "requests": 0,
+            "generated": 0,
+            "coalesced": 0,
+            "shed": 0,
+            "throttled": 0,
+            "timeouts": 0,
+            "failed": 0,
+            "generate_seconds_total": 0.0,
+        }
+
+    @property
+    def provider(self) -> SignImageProvider:
+        if self._provider is None:
+            self._provider = create_provider()
+        return self._provider
+
+    def use_provider(self, provider: SignImageProvider):
+        """provider 교체 (테스트에서 StubSignProvider 등)"""
+        self._provider = provider
+
+    async def generate(self, name: str, style: str = DEFAULT_SIGN_STYLE, flight: Optional[str] = None) -> bytes:
+        """flight를 주면 같은 flight의 요청끼리만 결과를 공유 (예: 미리 생성 작업이 사용자 요청과 같은 이미지를 받지 않도록)"""
+        self._stats["requests"] += 1
+        name = normalize_name(name)
+        key = f"{flight}:{style}:{name}" if flight else f"{style}:{name}"
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            # 진행 중 + 대기 중인 작업이 모두 차 있으면 provider를 부르지 않고 거절
+            if len(self._inflight) >= self.concurrency + self.queue_max:
+                self._stats["shed"] += 1
+                raise SignGenerationBusyError()
+            task = asyncio.create_task(self._run(name, style))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+        # 요청한 클라이언트 하나가 끊겨도 같은 이름을 기다리는 다른 요청을 위해 작업은 계속 진행
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 기다리는 요청이 없을 때 "exception was never retrieved" 경고 방지
+
+    async def _run(self, name: str, style: str) -> bytes:
+        await self._semaphore.acquire()
+        started = time.monotonic()
+        try:
+            data = await asyncio.wait_for(self.provider.generate(name, style), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise SignGenerationTimeoutError()
+        except SignGenerationBusyError:
+            self._stats["throttled"] += 1
+            raise
+        except SignGenerationError:
+            self._stats["failed"] += 1
+            raise
+        except Exception as e:
+            self._stats["failed"] += 1
+            raise SignGenerationError(str(e)) from e
+        finally:
+            self._semaphore.release()
+        self._stats["generated"] += 1
+        self._stats["generate_seconds_total"] += time.monotonic() - started
+        return data
+
+    def stats(self) -> dict:
+        generated = self._stats["generated"]
+        return {
+            **self._stats,
+            "in_flight": len(self._inflight),
+            "waiting": max(0, len(self._inflight) - self.concurrency),
+            "concurrency": self.concurrency,
+            "generate_seconds_avg": self._stats["generate_seconds_total"] / generated if generated else 0.0,
+        }
+
+
+sign_generator = SignGenerator()
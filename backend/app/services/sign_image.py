@@ -0,0 +1,179 @@
+import base64
+import os
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Literal, Optional, Tuple
+from PIL import Image, ImageChops
+
+# 서명 이미지 후처리 설정 - 문서에 찍히는 서명 크기(인치)와 해상도 기준으로 픽셀 수 상한 결정
+SIGN_IMAGE_DPI = int(os.getenv("SIGN_IMAGE_DPI", "200"))
+SIGN_IMAGE_MAX_WIDTH_INCHES = float(os.getenv("SIGN_IMAGE_MAX_WIDTH_INCHES", "3"))
+SIGN_IMAGE_MAX_HEIGHT_INCHES = float(os.getenv("SIGN_IMAGE_MAX_HEIGHT_INCHES", "1.5"))
+SIGN_IMAGE_PALETTE_COLORS = int(os.getenv("SIGN_IMAGE_PALETTE_COLORS", "64"))  # 0이면 팔레트 변환 안 함
+SIGN_IMAGE_CROP_PADDING = 8  # 잉크 영역 바깥 여백 (px)
+# 업로드한 서명 저장 시 팔레트 색 수 (펜 색 + 안티앨리어싱 단계 + 투명, 16색 이하면 4bit PNG로 저장됨)
+SIGN_INGEST_PALETTE_COLORS = int(os.getenv("SIGN_INGEST_PALETTE_COLORS", "16"))
+# 업로드한 서명 이미지의 최대 픽셀 수 (압축된 PNG는 작아도 디코딩하면 커질 수 있음)
+SIGN_INGEST_MAX_PIXELS = int(os.getenv("SIGN_INGEST_MAX_PIXELS", str(4096 * 4096)))
+
+Background = Literal["white", "transparent"]
+
+
+def _binary(band: Image.Image, threshold: int) -> Image.Image:
+    """L 밴드 → threshold보다 크면 255, 아니면 0 (LUT 한 번으로 처리)"""
+    return band.point(lambda v: 255 if v > threshold else 0)
+
+
+def _background_mask(img: Image.Image, threshold: int) -> Image.Image:
+    """밝은색(흰색~밝은 회색) 픽셀 = 255인 마스크 - R, G, B 중 가장 어두운 값이 threshold보다 밝은 픽셀"""
+    r, g, b, _ = img.split()
+    return _binary(ImageChops.darker(ImageChops.darker(r, g), b), threshold)
+
+
+def _open_rgba(image_bytes: bytes) -> Image.Image:
+    img = Image.open(BytesIO(image_bytes))
+    img.load()
+    return img if img.mode == "RGBA" else img.convert("RGBA")
+
+
+def _fit_box(dpi: int) -> Tuple[int, int]:
+    return (
+        max(1, round(SIGN_IMAGE_MAX_WIDTH_INCHES * dpi)),
+        max(1, round(SIGN_IMAGE_MAX_HEIGHT_INCHES * dpi)),
+    )
+
+
+def _palette_bits(img: Image.Image) -> int:
+    """팔레트 이미지가 실제로 쓰는 인덱스 범위에 맞는 PNG bit depth (두 색이면 1bit)"""
+    _, max_index = img.getextrema()
+    for bits in (1, 2, 4):
+        if max_index < (1 << bits):
+            return bits
+    return 8
+
+
+def process_sign_image(
+    image_bytes: bytes,
+    background: Background = "white",
+    threshold: int = 220,
+    crop: bool = True,
+    dpi: Optional[int] = SIGN_IMAGE_DPI,
+    palette_colors: int = SIGN_IMAGE_PALETTE_COLORS,
+) -> bytes:
+    """
+    서명 이미지 후처리 (픽셀 단위 Python 반복 없이 PIL 밴드 연산으로 처리)
+    1. 밝은 배경을 완전 흰색(white) 또는 완전 투명(transparent)으로
+    2. 잉크가 있는 영역만 남기고 잘라냄 (crop)
+    3. 최대 서명 크기 x dpi를 넘으면 축소 (dpi=None이면 원본 크기 유지)
+    4. 팔레트 PNG로 압축 (palette_colors=0이면 RGBA/RGB 그대로)
+    """
+    img = _open_rgba(image_bytes)
+    background_mask = _background_mask(img, threshold)
+    alpha = img.getchannel("A")
+
+    if background == "transparent":
+        # 배경은 alpha 0, 나머지는 원래 alpha 유지
+        img.putalpha(ImageChops.multiply(alpha, ImageChops.invert(background_mask)))
+    else:
+        img.paste((255, 255, 255, 255), mask=background_mask)
+
+    if crop:
+        # 잉크 = 배경이 아니고 투명하지 않은 픽셀
+        ink = ImageChops.multiply(ImageChops.invert(background_mask), _binary(alpha, 0))
+        bbox = ink.getbbox()
+        if bbox:
+            left, top, right, bottom = bbox
+            pad = SIGN_IMAGE_CROP_PADDING
+            img = img.crop((
+                max(0, left - pad), max(0, top - pad),
+                min(img.width, right + pad), min(img.height, bottom + pad)
+            ))
+
+    if dpi:
+        img.thumbnail(_fit_box(dpi), Image.LANCZOS)
+
+    if background == "white":
+        # 반투명/투명 픽셀은 흰 종이 위에 합성 (흰 종이 위의 서명)
+        img = Image.alpha_composite(Image.new("RGBA", img.size, (255, 255, 255, 255)), img).convert("RGB")
+    if palette_colors:
+        # 서명은 잉크색 몇 가지 + 배경이라 적은 색으로도 충분 (RGBA는 FASTOCTREE만 지원)
+        method = Image.Quantize.FASTOCTREE if img.mode == "RGBA" else Image.Quantize.MEDIANCUT
+        img = img.quantize(colors=palette_colors, method=method, dither=Image.Dither.NONE)
+
+    output = BytesIO()
+    save_options = {"format": "PNG", "optimize": True}
+    if dpi:
+        save_options["dpi"] = (dpi, dpi)
+    if img.mode == "P":
+        save_options["bits"] = _palette_bits(img)
+    img.save(output, **save_options)
+    return output.getvalue()
+
+
+class InvalidSignImageError(ValueError):
+    """PNG가 아니거나 디코딩할 수 없는 서명 이미지"""
+
+
+@dataclass
+class NormalizedSign:
+    png: bytes
+    width: int
+    height: int
+
+    @property
+    def aspect_ratio(self) -> float:
+        return round(self.width / self.height, 4)
+
+
+def normalize_sign_png(image_bytes: bytes) -> NormalizedSign:
+    """
+    업로드한 서명 PNG를 저장용으로 정리
+    - 캔버스 배경은 투명하게, 잉크 영역만 남기고 자름
+    - 최대 서명 크기 x SIGN_IMAGE_DPI로 축소
+    - SIGN_INGEST_PALETTE_COLORS색 팔레트 + 투명도 PNG로 저장
+    """
+    try:
+        # 헤더만 읽어서 형식/크기 확인 (픽셀 디코딩 전)
+        with Image.open(BytesIO(image_bytes)) as probe:
+            image_format, (width, height) = probe.format, probe.size
+    except Image.DecompressionBombError as e:
+        raise InvalidSignImageError("서명 이미지 크기가 너무 큽니다.") from e
+    except (OSError, SyntaxError, ValueError) as e:
+        raise InvalidSignImageError("PNG 파일 형식이 아닙니다.") from e
+    if image_format != "PNG":
+        raise InvalidSignImageError("PNG 파일 형식이 아닙니다.")
+    if width * height > SIGN_INGEST_MAX_PIXELS:
+        raise InvalidSignImageError("서명 이미지 크기가 너무 큽니다.")
+
+    try:
+        png = process_sign_image(image_bytes, "transparent", palette_colors=SIGN_INGEST_PALETTE_COLORS)
+    except (OSError, SyntaxError, ValueError) as e:
+        # 잘린 파일, 잘못된 청크 등
+        raise InvalidSignImageError("PNG 파일 형식이 아닙니다.") from e
+    with Image.open(BytesIO(png)) as result:
+        width, height = result.size
+    return NormalizedSign(png=png, width=width, height=height)
+
+
+def check_sign_payload(payload: str):
+    """문서에 합성할 base64 서명 이미지(data URL 가능)를 미리 디코딩해서 확인 - 실패하면 InvalidSignImageError"""
+    try:
+        data = base64.b64decode(payload.split(",")[-1])
+        with Image.open(BytesIO(data)) as img:
+            if img.width * img.height > SIGN_INGEST_MAX_PIXELS:
+                raise InvalidSignImageError("서명 이미지 크기가 너무 큽니다.")
+            img.load()
+    except Image.DecompressionBombError as e:
+        raise InvalidSignImageError("서명 이미지 크기가 너무 큽니다.") from e
+    except (OSError, SyntaxError, ValueError) as e:
+        if isinstance(e, InvalidSignImageError):
+            raise
+        # base64 오류(binascii.Error), 이미지가 아니거나 잘린 파일 등
+        raise InvalidSignImageError("서명 이미지를 읽을 수 없습니다.") from e
+
+
+def png_data_url(png_bytes: bytes) -> str:
+    """PNG bytes → data:image/png;base64,... 문자열"""
+    b64_str = base64.b64encode(png_bytes).decode("utf-8")
+    return f"data:image/png;base64,{b64_str}"
+
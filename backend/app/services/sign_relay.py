@@ -0,0 +1,168 @@
+import asyncio
+import os
+import re
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+from fastapi.websockets import WebSocket
+
+# 모바일 서명 중계 (/signs/ws) 설정
+SIGN_RELAY_QUEUE_SIZE = int(os.getenv("SIGN_RELAY_QUEUE_SIZE", "32"))  # 연결마다 보내지 못하고 쌓아 둘 수 있는 최대 메시지 수
+SIGN_RELAY_SEND_TIMEOUT_SECONDS = float(os.getenv("SIGN_RELAY_SEND_TIMEOUT_SECONDS", "10"))  # 메시지 하나를 보내는 제한 시간
+
+# 서명 패드 전체 상태를 담은 메시지 - 아직 보내지 못한 이전 상태는 최신 상태로 대체해도 됨
+SNAPSHOT_TYPES = {"stroke", "clear"}
+# 1013 Try Again Later - 너무 느려서 끊은 연결
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# 프론트엔드는 JSON.stringify({type: ..., ...})로 보내므로 type이 맨 앞에 옴 (큰 stroke/이미지 본문은 파싱하지 않음)
+_TYPE_PATTERN = re.compile(r'^\s*\{\s*"type"\s*:\s*"([A-Za-z_]+)"')
+
+
+def message_type(data: str) -> Optional[str]:
+    match = _TYPE_PATTERN.match(data[:64])
+    return match.group(1) if match else None
+
+
+class RelayPeer:
+    """
+    중계 세션에 연결된 WebSocket 하나
+    보낼 메시지는 연결별 대기열에 넣고, writer task가 순서대로 전송 (느린 연결이 다른 연결을 기다리게 하지 않음)
+    """
+
+    def __init__(self, relay: "SignRelay", session_id: str, websocket: WebSocket, queue_size: int):
+        self.relay = relay
+        self.session_id = session_id
+        self.websocket = websocket
+        self.queue_size = queue_size
+        self._queue: Deque[Tuple[Optional[str], str]] = deque()  # (메시지 type, 본문)
+        self._ready = asyncio.Event()
+        self._close_code: Optional[int] = None
+        self.closed = False
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def offer(self, data: str, kind: Optional[str]) -> bool:
+        """
+        대기열에 메시지 추가 (기다리지 않음), 받을 수 없으면 False
+        - 서명 패드 상태 메시지는 아직 보내지 못한 이전 상태 메시지를 대체 (coalesce)
+        - 그 밖의 메시지(완성된 서명 등)로 대기열이 가득 차면 받지 않음 → 호출하는 쪽에서 연결을 끊음
+        """
+        if self.closed:
+            return False
+        if kind in SNAPSHOT_TYPES:
+            pending = len(self._queue)
+            self._queue = deque(item for item in self._queue if item[0] not in SNAPSHOT_TYPES)
+            self.relay._stats["coalesced"] += pending - len(self._queue)
+        if len(self._queue) >= self.queue_size:
+            return False
+        self._queue.append((kind, data))
+        self._ready.set()
+        return True
+
+    def close(self, code: int = 1000):
+        """writer task가 남은 작업을 멈추고 연결을 닫도록 표시"""
+        if self.closed:
+            return
+        self.closed = True
+        self._close_code = code
+        self._queue.clear()
+        self._ready.set()
+
+    async def _write_loop(self):
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._queue and not self.closed:
+                    _, data = self._queue.popleft()
+                    await asyncio.wait_for(self.websocket.send_text(data), timeout=SIGN_RELAY_SEND_TIMEOUT_SECONDS)
+                    self.relay._stats["sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 보내기 실패 = 끊긴 연결, 시간 초과 = 받지 못하는 연결 → 닫아서 endpoint의 receive 루프도 끝나게 함
+            self.relay._stats["send_failures"] += 1
+            print(f"서명 중계 전송 실패 ({self.session_id}): {e!r}")
+            self.closed = True
+            if self._close_code is None:
+                self._close_code = SLOW_CONSUMER_CLOSE_CODE if isinstance(e, asyncio.TimeoutError) else 1011
+        finally:
+            self.relay.leave(self)
+
+        if self._close_code is not None:
+            try:
+                await self.websocket.close(code=self._close_code)
+            except Exception:
+                pass
+
+    async def stop(self):
+        """연결 종료 시 writer task 정리 (endpoint의 receive 루프가 끝난 뒤 호출)"""
+        self.close()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self.relay.leave(self)
+
+
+class SignRelay:
+    """
+    모바일에서 그린 서명을 같은 sessionId의 다른 연결(PC 화면)로 중계
+    - 메시지는 연결별 대기열에 넣기만 하고 바로 반환 (모든 연결에 동시에 전달)
+    - 느린 연결: 서명 패드 상태 메시지는 최신 것만 남기고, 그래도 대기열이 가득 차면 연결을 끊음
+    - 끊긴 연결은 세션에서 제거, 연결이 없는 세션도 제거
+    """
+
+    def __init__(self, queue_size: int = SIGN_RELAY_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.sessions: Dict[str, Set[RelayPeer]] = {}
+        self._stats = {
+            "connections": 0,
+            "messages": 0,
+            "sent": 0,
+            "coalesced": 0,
+            "slow_disconnects": 0,
+            "send_failures": 0,
+        }
+
+    def join(self, session_id: str, websocket: WebSocket) -> RelayPeer:
+        peer = RelayPeer(self, session_id, websocket, self.queue_size)
+        self.sessions.setdefault(session_id, set()).add(peer)
+        self._stats["connections"] += 1
+        return peer
+
+    def leave(self, peer: RelayPeer):
+        peers = self.sessions.get(peer.session_id)
+        if peers is None:
+            return
+        peers.discard(peer)
+        if not peers:
+            del self.sessions[peer.session_id]
+
+    def broadcast(self, sender: RelayPeer, data: str):
+        """sender를 제외한 같은 세션의 연결에 전달 (전송을 기다리지 않음)"""
+        if sender.closed:
+            # 끊기로 한 연결이 닫히기 전에 받은 메시지
+            return
+        self._stats["messages"] += 1
+        kind = message_type(data)
+        for peer in list(self.sessions.get(sender.session_id, ())):
+            if peer is sender:
+                continue
+            if not peer.offer(data, kind):
+                if not peer.closed:
+                    self._stats["slow_disconnects"] += 1
+                    print(f"서명 중계 대기열 초과, 연결 종료 ({peer.session_id})")
+                    peer.close(SLOW_CONSUMER_CLOSE_CODE)
+                self.leave(peer)
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "sessions": len(self.sessions),
+            "peers": sum(len(peers) for peers in self.sessions.values()),
+            "queued": sum(len(peer._queue) for peers in self.sessions.values() for peer in peers),
+        }
+
+
+sign_relay = SignRelay()
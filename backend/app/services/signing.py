@@ -0,0 +1,209 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
+from app.db import AsyncSessionLocal
+from app.models import Document, DocumentSigner
+from app.services.blob import store_file, blob_url, spool_path, release_document_file, remove_released_files
+from app.services.storage import storage, normalize_key
+from app.services.resource_cache import resource_cache
+from app.services.stamping import StampJob, StampTimeoutError, run_stamp_job
+
+# 한 번의 합성 작업에 묶을 최대 서명 요청 수
+SIGN_BATCH_MAX = int(os.getenv("SIGN_BATCH_MAX", "32"))
+
+
+class DocumentNotFoundError(Exception):
+    """서명 처리 시점에 문서가 사라짐 (삭제됨)"""
+
+
+class AlreadySignedError(Exception):
+    """이미 서명한 signer (같은 signer의 중복 요청 포함)"""
+
+
+@dataclass
+class SignRequest:
+    signer_id: int
+    signs: List[dict]  # SignInfo.model_dump() 목록
+    future: asyncio.Future = field(repr=False)
+
+
+class SigningCoordinator:
+    """
+    문서별 서명 삽입 직렬화
+    같은 문서에 동시에 들어온 서명 요청은 대기열에 모았다가 한 번의 합성(읽기 → 서명 합성 → 저장)으로 처리하고
+    대기 중인 요청 모두에 결과를 돌려줌 - 서로의 결과를 덮어쓰는 lost update 방지
+    """
+
+    def __init__(self, batch_max: int = SIGN_BATCH_MAX):
+        self.batch_max = batch_max
+        self._pending: Dict[int, List[SignRequest]] = {}  # document_id → 대기 중인 요청
+        self._workers: Dict[int, asyncio.Task] = {}  # document_id → 대기열 처리 task
+        self._stats = {
+            "requests": 0,
+            "signed": 0,
+            "rejected": 0,
+            "failed": 0,
+            "batches": 0,
+            "batched": 0,
+            "batch_size_max": 0,
+            "batch_seconds_total": 0.0,
+            "split_batches": 0,
+        }
+
+    async def submit(self, document_id: int, signer_id: int, signs: List[dict]) -> str:
+        """
+        서명 요청을 문서 대기열에 넣고 처리가 끝날 때까지 대기, 새 revision의 file_url 반환
+        실패 시 DocumentNotFoundError / AlreadySignedError / StampTimeoutError 등을 그대로 raise
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(document_id, []).append(SignRequest(signer_id, signs, future))
+        self._stats["requests"] += 1
+        if document_id not in self._workers:
+            self._workers[document_id] = asyncio.create_task(self._drain(document_id))
+        # 클라이언트 연결이 끊겨도 이미 묶인 작업은 끝까지 진행되도록 shield
+        return await asyncio.shield(future)
+
+    async def _drain(self, document_id: int):
+        """대기열이 빌 때까지 요청을 묶어서 처리"""
+        try:
+            while self._pending.get(document_id):
+                queue = self._pending[document_id]
+                batch, self._pending[document_id] = queue[:self.batch_max], queue[self.batch_max:]
+                await self._process_isolated(document_id, batch)
+        finally:
+            self._pending.pop(document_id, None)
+            self._workers.pop(document_id, None)
+
+    async def _process_isolated(self, document_id: int, batch: List[SignRequest]):
+        """
+        묶음 처리가 실패하면 결과를 받지 못한 요청을 하나씩 다시 처리 (문제 있는 요청만 실패)
+        문서 삭제/시간 초과처럼 요청과 관계없는 실패는 다시 처리하지 않음
+        """
+        try:
+            await self._process_batch(document_id, batch)
+        except Exception as e:
+            remaining = [request for request in batch if not request.future.done()]
+            if len(remaining) > 1 and not isinstance(e, (DocumentNotFoundError, StampTimeoutError)):
+                print(f"서명 합성 실패, 요청 {len(remaining)}개를 하나씩 다시 처리 (document {document_id}): {e!r}")
+                self._stats["split_batches"] += 1
+                for request in remaining:
+                    await self._process_isolated(document_id, [request])
+                return
+            if not remaining:
+                # 결과를 돌려준 뒤(commit 이후) 정리 중 실패
+                print(f"서명 합성 후 정리 실패 (document {document_id}): {e!r}")
+            self._stats["failed"] += len(remaining)
+            for request in remaining:
+                _resolve(request, exception=e)
+
+    async def _process_batch(self, document_id: int, batch: List[SignRequest]):
+        started = time.monotonic()
+        self._stats["batches"] += 1
+        self._stats["batched"] += len(batch)
+        self._stats["batch_size_max"] = max(self._stats["batch_size_max"], len(batch))
+
+        async with AsyncSessionLocal() as db:
+            # 여러 서버 프로세스가 같은 문서를 처리하는 경우 대비 행 잠금 (PostgreSQL)
+            result = await db.execute(
+                select(Document).where(Document.id == document_id).with_for_update()
+            )
+            document = result.scalar_one_or_none()
+            if not document:
+                raise DocumentNotFoundError()
+
+            # 아직 서명하지 않은 signer만 조건부로 서명 완료 처리 (중복 요청은 여기서 걸러짐)
+            accepted: List[SignRequest] = []
+            for request in batch:
+                result = await db.execute(
+                    update(DocumentSigner)
+                    .where(
+                        DocumentSigner.id == request.signer_id,
+                        DocumentSigner.document_id == document_id,
+                        DocumentSigner.is_signed == False,
+                    )
+                    .values(is_signed=True)
+                    .returning(DocumentSigner.id)
+                )
+                if result.first() is None:
+                    self._stats["rejected"] += 1
+                    _resolve(request, exception=AlreadySignedError())
+                else:
+                    accepted.append(request)
+            if not accepted:
+                await db.rollback()
+                return
+
+            # 묶인 요청의 서명을 모두 한 번에 합성 (copy-on-write: 결과는 새 blob)
+            tmp_path = spool_path(".pdf")
+            async with storage.local_copy(normalize_key(document.file_path)) as source_path:
+                job = StampJob(
+                    source_path=source_path,
+                    output_path=tmp_path,
+                    signs=[sign for request in accepted for sign in request.signs]
+                )
+                try:
+                    await run_stamp_job(job)
+                except Exception:
+                    # 서명 완료 표시도 함께 되돌림
+                    await db.rollback()
+                    await run_in_threadpool(_remove_if_exists, tmp_path)
+                    raise
+
+            blob, _ = await store_file(db, tmp_path)
+            previous_key = normalize_key(document.file_path)
+            # 이전 revision URL은 유예 기간 동안 유지 (삭제는 purge_released_blobs)
+            garbage = await release_document_file(db, document, keep_revision=True)
+            document.blob_digest = blob.digest
+            document.file_path = blob.file_path
+            document.file_url = blob_url(blob)
+            document.file_size = blob.file_size
+            # 뒤에 덧붙인 revision 때문에 더 이상 선형화(linearized) 파일이 아님
+            if document.is_linearized:
+                document.is_linearized = False
+            file_url = document.file_url
+            await db.commit()
+
+        self._stats["signed"] += len(accepted)
+        self._stats["batch_seconds_total"] += time.monotonic() - started
+        for request in accepted:
+            _resolve(request, result=file_url)
+
+        # 이전 revision은 /resources 메모리 캐시에서 제거 (단독 파일이었다면 파일도 삭제)
+        resource_cache.invalidate(previous_key)
+        await remove_released_files(garbage)
+
+    async def stop(self):
+        """처리 중인 대기열이 끝날 때까지 대기 (서버 종료 시)"""
+        workers: Set[asyncio.Task] = set(self._workers.values())
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def stats(self) -> dict:
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "active_documents": len(self._workers),
+            "queued": sum(len(queue) for queue in self._pending.values()),
+            "batch_size_avg": self._stats["batched"] / batches if batches else 0.0,
+        }
+
+
+def _remove_if_exists(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _resolve(request: SignRequest, exception: Exception = None, result: str = None):
+    if request.future.done():
+        return
+    if exception is not None:
+        request.future.set_exception(exception)
+    else:
+        request.future.set_result(result)
+
+
+signing_coordinator = SigningCoordinator()
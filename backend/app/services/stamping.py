@@ -0,0 +1,454 @@
+import asyncio
+import base64
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import shutil
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from cachetools import LRUCache
+from PyPDF2 import PdfWriter, PdfReader
+from PyPDF2.generic import (
+    ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject, FloatObject,
+    IndirectObject, NameObject, NumberObject, PdfObject, StreamObject
+)
+from PIL import Image
+from reportlab.pdfgen import canvas
+from reportlab.lib.utils import ImageReader
+from app.services.vector_sign import draw_vector_sign
+
+# 서명 삽입 전용 프로세스 풀 크기 (기본: CPU 수 - 1, 최소 1)
+STAMP_POOL_SIZE = int(os.getenv("STAMP_POOL_SIZE", str(max(1, (os.cpu_count() or 2) - 1))))
+# 서명 삽입 작업 하나의 최대 실행 시간 (초, 넘으면 워커 프로세스를 종료)
+STAMP_JOB_TIMEOUT_SECONDS = float(os.getenv("STAMP_JOB_TIMEOUT_SECONDS", "60"))
+# 기본 저장 방식: incremental (서명된 페이지만 덧붙이기) / rewrite (전체 다시 쓰기)
+STAMP_MODE = os.getenv("STAMP_MODE", "incremental")
+# 워커 프로세스마다 유지하는 디코딩된 서명 이미지 캐시 크기 (개수)
+STAMP_IMAGE_CACHE_SIZE = int(os.getenv("STAMP_IMAGE_CACHE_SIZE", "32"))
+
+_image_cache = LRUCache(maxsize=STAMP_IMAGE_CACHE_SIZE)
+
+
+class StampTimeoutError(Exception):
+    """서명 삽입 작업이 제한 시간 안에 끝나지 않음"""
+
+
+@dataclass
+class StampJob:
+    """프로세스 풀로 넘기는 작업 정보 (pickle 가능한 값만 포함)"""
+    source_path: str  # 원본 PDF 경로
+    output_path: str  # 결과 PDF를 쓸 경로
+    signs: List[dict] = field(default_factory=list)  # SignInfo.model_dump() 목록 (벡터 서명은 정규화된 strokes 포함)
+    mode: str = STAMP_MODE  # "incremental" (변경분만 덧붙이기) 또는 "rewrite" (전체 다시 쓰기)
+
+
+def _sign_image(payload: str) -> ImageReader:
+    """
+    base64 서명 이미지 → ImageReader (payload의 sha256 기준 캐시)
+    reportlab은 픽셀 데이터가 같은 이미지를 canvas 안에서 XObject 하나로 합치므로
+    같은 서명을 여러 페이지에 넣어도 출력 PDF에는 이미지가 한 번만 들어감
+    """
+    data = payload.split(',')[-1]
+    digest = hashlib.sha256(data.encode()).hexdigest()
+    image = _image_cache.get(digest)
+    if image is None:
+        img = Image.open(io.BytesIO(base64.b64decode(data)))
+        if img.mode in ("P", "LA") or "transparency" in img.info:
+            # 팔레트+투명도 PNG (업로드 시 정리된 서명)는 reportlab이 alpha를 읽을 수 있도록 RGBA로
+            img = img.convert("RGBA")
+        image = ImageReader(img)
+        _image_cache[digest] = image
+    return image
+
+
+def _build_overlay(page_sizes: List[Tuple[float, float]], page_signs: List[List[dict]]) -> PdfReader:
+    """
+    서명이 들어갈 페이지마다 한 장씩, 서명 이미지만 그린 overlay PDF 생성
+    page_sizes[i], page_signs[i]는 overlay의 i번째 페이지에 대응
+    """
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet)
+    for (pdf_w, pdf_h), signs in zip(page_sizes, page_signs):
+        # PDF 페이지 크기 (points 단위)
+        can.setPageSize((pdf_w, pdf_h))
+        for sign in signs:
+            # 좌표/크기 변환 (퍼센트(0~100) → PDF 좌표계: 좌하단 0,0)
+            x = sign["x"] * pdf_w/100
+            w = sign["width"] * pdf_w/100
+            h = sign["height"] * pdf_h/100
+            y = pdf_h - sign["y"] * pdf_h/100 - h
+
+            if sign.get("strokes"):
+                # 벡터 서명은 이미지 없이 경로로 그리기
+                draw_vector_sign(can, sign["strokes"], x, y, w, h)
+                continue
+
+            # 같은 서명 이미지는 한 번만 디코딩 (overlay 안에서도 이미지 XObject 하나를 공유)
+            img = _sign_image(sign["base64"])
+
+            # reportlab은 좌하단 기준, y좌표 변환 필요
+            can.drawImage(img, x, y, w, h, mask='auto')
+        can.showPage()
+    can.save()
+    packet.seek(0)
+    return PdfReader(packet)
+
+
+def _signed_pages(reader: PdfReader, signs: List[dict]) -> List[Tuple[int, List[dict]]]:
+    """(0부터 시작하는 페이지 번호, 해당 페이지 서명 목록) - 범위를 벗어난 페이지 번호는 무시"""
+    by_page: Dict[int, List[dict]] = {}
+    for sign in signs:
+        index = sign["num_page"] - 1
+        if 0 <= index < len(reader.pages):
+            by_page.setdefault(index, []).append(sign)
+    return sorted(by_page.items())
+
+
+def _page_size(page) -> Tuple[float, float]:
+    return float(page.mediabox.width), float(page.mediabox.height)
+
+
+def _stamp_rewrite(reader: PdfReader, job: StampJob) -> int:
+    """모든 페이지를 새 PdfWriter로 복사해서 파일 전체를 다시 쓰기"""
+    targets = _signed_pages(reader, job.signs)
+    overlay = _build_overlay(
+        [_page_size(reader.pages[index]) for index, _ in targets],
+        [signs for _, signs in targets]
+    )
+    overlay_pages = {index: overlay.pages[i] for i, (index, _) in enumerate(targets)}
+
+    writer = PdfWriter()
+    for page_num in range(len(reader.pages)):
+        page = reader.pages[page_num]
+        if page_num in overlay_pages:
+            # overlay 페이지를 원본 페이지에 merge
+            page.merge_page(overlay_pages[page_num])
+        writer.add_page(page)
+
+    with open(job.output_path, "wb") as f:
+        writer.write(f)
+    return len(targets)
+
+
+def _find_startxref(path: str) -> int:
+    """파일 끝의 startxref 값 (직전 xref 위치)"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 2048))
+        tail = f.read()
+    index = tail.rfind(b"startxref")
+    if index < 0:
+        raise ValueError("startxref not found")
+    return int(tail[index + len(b"startxref"):].split()[0])
+
+
+_XREF_STREAM_SIZE = re.compile(rb"/Size\s+(\d+)")
+
+
+def _xref_stream_size(path: str, offset: int) -> Optional[int]:
+    """offset의 xref 섹션이 xref stream이면 그 /Size, xref 테이블이면 None"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        head = f.read(4096)
+    if head.lstrip().startswith(b"xref"):
+        return None
+    dictionary = head.split(b"stream", 1)[0]
+    match = _XREF_STREAM_SIZE.search(dictionary)
+    if b"/XRef" not in dictionary or match is None:
+        raise ValueError("unsupported cross-reference section")
+    return int(match.group(1))
+
+
+def _runs(numbers: List[int]) -> Iterator[List[int]]:
+    """정렬된 객체 번호를 연속된 번호끼리 묶기 (xref 하위 섹션 단위)"""
+    start = 0
+    while start < len(numbers):
+        end = start
+        while end + 1 < len(numbers) and numbers[end + 1] == numbers[end] + 1:
+            end += 1
+        yield numbers[start:end + 1]
+        start = end + 1
+
+
+class _IncrementalUpdate:
+    """원본 파일 뒤에 덧붙일 객체들 (새 객체 + 교체되는 페이지 객체)"""
+
+    def __init__(self, reader: PdfReader, xref_stream_size: Optional[int] = None):
+        # xref stream을 쓰는 파일은 PyPDF2 trailer에 /Size가 없음 → xref stream의 /Size 사용
+        # (어느 쪽이든 실제로 쓰이는 가장 큰 객체 번호보다는 크게)
+        used = [number for entries in reader.xref.values() for number in entries] + list(reader.xref_objStm)
+        size = xref_stream_size if xref_stream_size is not None else int(reader.trailer.get("/Size", 0))
+        self.next_number = max(size, max(used, default=0) + 1)
+        self.xref_stream = xref_stream_size is not None  # 원본과 같은 형식의 xref 섹션을 덧붙임
+        self.objects: Dict[int, Tuple[int, PdfObject]] = {}  # 객체 번호 → (generation, 객체)
+        self._cloned: Dict[Tuple[int, int], IndirectObject] = {}
+
+    def add(self, obj: PdfObject) -> IndirectObject:
+        number = self.next_number
+        self.next_number += 1
+        self.objects[number] = (0, obj)
+        return IndirectObject(number, 0, None)
+
+    def replace(self, ref: IndirectObject, obj: PdfObject):
+        self.objects[ref.idnum] = (ref.generation, obj)
+
+    def clone(self, obj):
+        """overlay PDF의 객체를 새 객체 번호로 복사 (간접 참조도 재귀적으로 복사)"""
+        if isinstance(obj, IndirectObject):
+            key = (obj.idnum, obj.generation)
+            if key not in self._cloned:
+                # 순환 참조 대비로 번호를 먼저 예약
+                number = self.next_number
+                self.next_number += 1
+                self._cloned[key] = IndirectObject(number, 0, None)
+                self.objects[number] = (0, self.clone(obj.get_object()))
+            return self._cloned[key]
+        if isinstance(obj, StreamObject):
+            copied = DecodedStreamObject() if not isinstance(obj, EncodedStreamObject) else EncodedStreamObject()
+            for key, value in dict.items(obj):
+                copied[key] = self.clone(value)
+            copied._data = obj._data
+            return copied
+        if isinstance(obj, DictionaryObject):
+            copied = DictionaryObject()
+            for key, value in dict.items(obj):
+                copied[key] = self.clone(value)
+            return copied
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self.clone(value) for value in obj)
+        return obj
+
+    def _trailer(self, trailer: DictionaryObject, reader: PdfReader, prev_xref: int) -> DictionaryObject:
+        trailer[NameObject("/Size")] = NumberObject(self.next_number)
+        for key in ("/Root", "/Info", "/ID"):
+            if key in reader.trailer:
+                trailer[NameObject(key)] = reader.trailer.raw_get(key)
+        trailer[NameObject("/Prev")] = NumberObject(prev_xref)
+        return trailer
+
+    def write(self, f, base_offset: int, reader: PdfReader, prev_xref: int):
+        """객체, xref 섹션, trailer를 f에 쓰기 (base_offset = 원본 파일 크기)"""
+        offsets = {}
+        position = base_offset
+        for number in sorted(self.objects):
+            generation, obj = self.objects[number]
+            buffer = io.BytesIO()
+            buffer.write(f"{number} {generation} obj\n".encode())
+            obj.write_to_stream(buffer, None)
+            buffer.write(b"\nendobj\n")
+            data = buffer.getvalue()
+            offsets[number] = (position, generation)
+            f.write(data)
+            position += len(data)
+
+        if self.xref_stream:
+            self._write_xref_stream(f, position, offsets, reader, prev_xref)
+        else:
+            self._write_xref_table(f, position, offsets, reader, prev_xref)
+        f.write(f"\nstartxref\n{position}\n%%EOF\n".encode())
+
+    def _write_xref_table(self, f, position: int, offsets: Dict[int, Tuple[int, int]], reader: PdfReader, prev_xref: int):
+        xref = [b"xref\n"]
+        for run in _runs(sorted(offsets)):
+            xref.append(f"{run[0]} {len(run)}\n".encode())
+            for number in run:
+                offset, generation = offsets[number]
+                xref.append(f"{offset:010d} {generation:05d} n\r\n".encode())
+
+        f.write(b"".join(xref))
+        f.write(b"trailer\n")
+        self._trailer(DictionaryObject(), reader, prev_xref).write_to_stream(f, None)
+
+    def _write_xref_stream(self, f, position: int, offsets: Dict[int, Tuple[int, int]], reader: PdfReader, prev_xref: int):
+        """xref stream (PDF 1.5) 형식 - xref stream 객체 자신도 항목에 포함"""
+        number = self.next_number
+        self.next_number += 1
+        offsets = {**offsets, number: (position, 0)}
+        index = ArrayObject()
+        rows = []
+        for run in _runs(sorted(offsets)):
+            index.extend([NumberObject(run[0]), NumberObject(len(run))])
+            for n in run:
+                offset, generation = offsets[n]
+                rows.append(struct.pack(">BIH", 1, offset, generation))  # 형식 1 = 파일 안의 위치
+
+        xref = EncodedStreamObject()
+        xref[NameObject("/Type")] = NameObject("/XRef")
+        xref[NameObject("/W")] = ArrayObject([NumberObject(1), NumberObject(4), NumberObject(2)])
+        xref[NameObject("/Index")] = index
+        xref[NameObject("/Filter")] = NameObject("/FlateDecode")
+        xref._data = zlib.compress(b"".join(rows))
+        self._trailer(xref, reader, prev_xref)
+
+        f.write(f"{number} 0 obj\n".encode())
+        xref.write_to_stream(f, None)
+        f.write(b"\nendobj")
+
+
+def _content_refs(page) -> List[PdfObject]:
+    """페이지 /Contents를 스트림 참조 목록으로 변환"""
+    if "/Contents" not in page:
+        return []
+    contents = page.raw_get("/Contents")
+    resolved = contents.get_object()
+    if isinstance(resolved, ArrayObject):
+        return list(resolved)
+    return [contents]
+
+
+def _stamp_incremental(reader: PdfReader, job: StampJob) -> int:
+    """
+    원본 바이트는 그대로 두고, 서명이 들어간 페이지 객체/overlay 스트림/xref만 뒤에 덧붙이기
+    (PDF incremental update - 이전 revision은 파일 안에 그대로 남음)
+    """
+    targets = _signed_pages(reader, job.signs)
+    prev_xref = _find_startxref(job.source_path)
+    overlay = _build_overlay(
+        [_page_size(reader.pages[index]) for index, _ in targets],
+        [signs for _, signs in targets]
+    )
+
+    update = _IncrementalUpdate(reader, _xref_stream_size(job.source_path, prev_xref))
+    # 원본 페이지 내용의 그래픽 상태가 서명에 영향을 주지 않도록 q ... Q로 감싸기
+    save_state = DecodedStreamObject()
+    save_state._data = b"q\n"
+    save_state_ref = update.add(save_state)
+
+    for i, (index, _) in enumerate(targets):
+        page = reader.pages[index]
+        if page.indirect_reference is None:
+            raise ValueError("page without indirect reference")
+        overlay_page = overlay.pages[i]
+        pdf_w, pdf_h = _page_size(page)
+
+        # overlay 페이지 전체를 Form XObject 하나로 만들어 자원 이름 충돌 없이 그리기
+        form = EncodedStreamObject()
+        form[NameObject("/Type")] = NameObject("/XObject")
+        form[NameObject("/Subtype")] = NameObject("/Form")
+        form[NameObject("/BBox")] = ArrayObject(
+            [FloatObject(0), FloatObject(0), FloatObject(pdf_w), FloatObject(pdf_h)]
+        )
+        form[NameObject("/Resources")] = update.clone(overlay_page.raw_get("/Resources"))
+        form[NameObject("/Filter")] = NameObject("/FlateDecode")
+        form._data = zlib.compress(overlay_page.get_contents().get_data())
+        form_ref = update.add(form)
+
+        # 페이지 자원에 Form XObject 이름 추가 (기존 자원은 참조 그대로 유지)
+        resources = DictionaryObject()
+        if "/Resources" in page:
+            resources.update(dict.items(page["/Resources"]))
+        xobjects = DictionaryObject()
+        if "/XObject" in resources:
+            xobjects.update(dict.items(resources["/XObject"]))
+        name_number = 0
+        while f"/S2gSign{name_number}" in xobjects:
+            name_number += 1
+        name = NameObject(f"/S2gSign{name_number}")
+        xobjects[name] = form_ref
+        resources[NameObject("/XObject")] = xobjects
+
+        draw = DecodedStreamObject()
+        draw._data = f"Q\nq\n{name} Do\nQ\n".encode()
+        draw_ref = update.add(draw)
+
+        new_page = DictionaryObject()
+        for key, value in dict.items(page):
+            new_page[key] = value
+        new_page[NameObject("/Resources")] = resources
+        new_page[NameObject("/Contents")] = ArrayObject([save_state_ref, *_content_refs(page), draw_ref])
+        update.replace(page.indirect_reference, new_page)
+
+    # 원본 파일을 복사한 뒤 (내용 주소 blob은 수정하지 않음) 변경분만 덧붙임
+    shutil.copyfile(job.source_path, job.output_path)
+    with open(job.output_path, "ab") as f:
+        base_offset = f.tell()
+        if base_offset:
+            f.write(b"\n")
+            base_offset += 1
+        update.write(f, base_offset, reader, prev_xref)
+    return len(targets)
+
+
+def stamp_pdf(job: StampJob) -> int:
+    """
+    PDF에 서명 이미지를 합성해 output_path에 저장 (워커 프로세스에서 실행)
+    반환값: 서명이 삽입된 페이지 수
+    """
+    reader = PdfReader(job.source_path)
+    if job.mode == "incremental" and not reader.is_encrypted:
+        try:
+            return _stamp_incremental(reader, job)
+        except Exception as e:
+            # 구조가 특이한 PDF는 전체 다시 쓰기로 처리
+            print(f"incremental stamping failed, falling back to rewrite: {e}")
+            reader = PdfReader(job.source_path)
+    return _stamp_rewrite(reader, job)
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 이벤트 루프/DB 연결을 가진 프로세스를 fork하지 않도록 spawn 사용
+        _executor = ProcessPoolExecutor(
+            max_workers=STAMP_POOL_SIZE,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _retire_executor(executor: ProcessPoolExecutor):
+    """풀을 버리고 워커 프로세스 종료 (다음 작업은 새 풀에서 실행)"""
+    global _executor
+    if _executor is executor:
+        _executor = None
+    # 실행 중인 작업은 프로세스를 종료해야만 멈춤 (ProcessPoolExecutor에 공개 API 없음)
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_pool(fn, *args, timeout: float = STAMP_JOB_TIMEOUT_SECONDS):
+    """
+    PDF 처리 함수를 서명 삽입용 프로세스 풀에서 실행 (이벤트 루프는 막지 않음)
+    fn은 모듈 최상위 함수여야 함 (spawn된 워커에서 import)
+    timeout을 넘기면 풀의 워커 프로세스를 종료하고 풀을 새로 만듦
+    → 같은 풀에서 실행 중이던 다른 작업은 남은 시간 안에서 새 풀로 한 번 다시 실행
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    for attempt in range(2):
+        executor = _get_executor()
+        future = loop.run_in_executor(executor, fn, *args)
+        try:
+            return await asyncio.wait_for(future, timeout=max(0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            # 남은 결과 파일(작성 중이던 임시 파일)은 spool 정리 작업이 지움
+            _retire_executor(executor)
+            raise StampTimeoutError()
+        except BrokenProcessPool:
+            # 다른 작업의 시간 초과로 풀이 종료되었거나 워커가 비정상 종료됨
+            _retire_executor(executor)
+            if attempt:
+                raise
+
+
+async def run_stamp_job(job: StampJob, timeout: float = STAMP_JOB_TIMEOUT_SECONDS) -> int:
+    """프로세스 풀에서 서명 삽입 실행 후 결과 대기"""
+    return await run_in_pool(stamp_pdf, job, timeout=timeout)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
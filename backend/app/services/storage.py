@@ -0,0 +1,170 @@
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from app.services.ingest import CHUNK_SIZE, SPOOL_DIR, IngestResult, write_stream
+
+load_dotenv()
+
+# 저장소 설정 (STORAGE_BACKEND로 구현체 선택, 기본은 로컬 디스크)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+STORAGE_ROOT = os.getenv("STORAGE_ROOT", "resources")
+# 저장된 파일은 /resources/<key> 로 노출
+URL_PREFIX = "/resources/"
+
+
+class Storage(ABC):
+    """
+    파일 저장소 인터페이스
+    키는 "docs/ab/cd/<이름>" 형태의 상대 경로이며, 모든 입출력은 이벤트 루프를 막지 않음
+    """
+
+    def shard_key(self, namespace: str, name: str) -> str:
+        """이름의 해시로 2단계 하위 디렉토리를 나눈 키 (한 디렉토리에 파일이 몰리지 않도록)"""
+        h = hashlib.sha256(name.encode()).hexdigest()
+        return f"{namespace}/{h[:2]}/{h[2:4]}/{name}"
+
+    def url_for(self, key: str) -> str:
+        return URL_PREFIX + key
+
+    def key_from_url(self, url: str) -> str:
+        return normalize_key(url[len(URL_PREFIX):] if url.startswith(URL_PREFIX) else url)
+
+    @abstractmethod
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes], max_size: Optional[int] = None) -> IngestResult:
+        ...
+
+    @abstractmethod
+    async def put_file(self, key: str, src_path: str):
+        """로컬 임시 파일을 저장소로 옮기기 (src_path는 이동 후 사라짐)"""
+        ...
+
+    async def put_bytes(self, key: str, data: bytes) -> IngestResult:
+        async def _single():
+            yield data
+        return await self.put_stream(key, _single())
+
+    @abstractmethod
+    def get_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        ...
+
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """파일 크기, 없으면 None"""
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    def local_path(self, key: str) -> Optional[str]:
+        """로컬 디스크 경로 (로컬 저장소가 아니면 None)"""
+        return None
+
+    @asynccontextmanager
+    async def local_copy(self, key: str):
+        """
+        PyPDF2처럼 파일 경로가 필요한 작업용
+        로컬 저장소는 원본 경로를, 다른 저장소는 임시 파일로 받아서 경로를 넘겨줌
+        """
+        path = self.local_path(key)
+        if path is not None:
+            yield path
+            return
+        tmp_path = os.path.join(SPOOL_DIR, f"{uuid.uuid4().hex}{os.path.splitext(key)[1]}")
+        await write_stream(self.get_stream(key), tmp_path)
+        try:
+            yield tmp_path
+        finally:
+            if os.path.exists(tmp_path):
+                await run_in_threadpool(os.remove, tmp_path)
+
+
+def _move_into_place(src: str, dest: str):
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    os.replace(src, dest)
+
+
+def _remove_if_exists(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _file_size(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_size if os.path.isfile(path) else None
+    except OSError:
+        return None
+
+
+class LocalStorage(Storage):
+    """로컬 디스크 저장소 (root 아래에 키 경로 그대로 저장)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._real_root = os.path.realpath(root)
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self._real_root, key))
+        # ../ 등으로 root 밖을 가리키는 키 차단
+        if not path.startswith(self._real_root + os.sep):
+            raise ValueError(f"invalid storage key: {key}")
+        return path
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes], max_size: Optional[int] = None) -> IngestResult:
+        return await write_stream(chunks, self._path(key), max_size=max_size)
+
+    async def put_file(self, key: str, src_path: str):
+        await run_in_threadpool(_move_into_place, src_path, self._path(key))
+
+    async def get_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        f = await run_in_threadpool(open, self._path(key), "rb")
+        try:
+            while True:
+                chunk = await run_in_threadpool(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await run_in_threadpool(f.close)
+
+    async def size(self, key: str) -> Optional[int]:
+        return await run_in_threadpool(_file_size, self._path(key))
+
+    async def delete(self, key: str):
+        await run_in_threadpool(_remove_if_exists, self._path(key))
+
+
+def normalize_key(value: str) -> str:
+    """
+    DB에 저장된 경로를 저장소 키로 변환
+    이전 버전은 "resources/docs/x.pdf"처럼 루트를 포함한 경로를 저장했으므로 앞부분을 제거
+    """
+    value = value.replace(os.sep, "/").lstrip("/")
+    root = STORAGE_ROOT.replace(os.sep, "/").strip("/") + "/"
+    if value.startswith(root):
+        value = value[len(root):]
+    return value
+
+
+# 저장소 구현 목록 - 다른 구현(예: S3)은 Storage를 상속해서 여기에 추가하고 STORAGE_BACKEND로 선택
+_backends: Dict[str, Callable[[], Storage]] = {
+    "local": lambda: LocalStorage(STORAGE_ROOT),
+}
+
+
+def create_storage(name: str = STORAGE_BACKEND) -> Storage:
+    if name not in _backends:
+        raise ValueError(f"unknown storage backend: {name}")
+    return _backends[name]()
+
+
+storage = create_storage()
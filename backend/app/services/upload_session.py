@@ -0,0 +1,149 @@
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db import AsyncSessionLocal
+from app.models.upload_session import UploadSession
+from app.services.ingest import SPOOL_DIR
+
+# 업로드 세션 유지 시간 (마지막 청크 이후 기준, 초)
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+# 클라이언트에 권장하는 청크 크기 (5MB)
+RECOMMENDED_CHUNK_SIZE = 5 * 1024 * 1024
+# 이어 올리기 임시 파일 위치
+UPLOAD_SPOOL_DIR = os.path.join(SPOOL_DIR, "uploads")
+
+os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+
+
+def _expires_at() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS)
+
+
+def _touch(path: str):
+    open(path, "wb").close()
+
+
+def _remove_spool_files(paths):
+    # spool 파일은 저장소(storage)가 아닌 로컬 임시 영역에 있음
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def create_upload_session(
+    db: AsyncSession,
+    uploader_id: int,
+    original_filename: str,
+    total_size: int,
+    signers: Optional[str]
+) -> UploadSession:
+    """업로드 세션과 비어 있는 spool 파일 생성"""
+    session_id = uuid.uuid4().hex
+    spool_path = os.path.join(UPLOAD_SPOOL_DIR, f"{session_id}.part")
+    await run_in_threadpool(_touch, spool_path)
+    upload_session = UploadSession(
+        id=session_id,
+        uploader_id=uploader_id,
+        original_filename=original_filename,
+        total_size=total_size,
+        committed_offset=0,
+        chunk_count=0,
+        signers=signers,
+        spool_path=spool_path,
+        created_at=datetime.utcnow(),
+        expires_at=_expires_at()
+    )
+    db.add(upload_session)
+    await db.commit()
+    return upload_session
+
+
+async def get_upload_session(db: AsyncSession, session_id: str, uploader_id: int) -> Optional[UploadSession]:
+    """만료되지 않은 본인 소유의 업로드 세션 조회"""
+    result = await db.execute(
+        select(UploadSession).where(
+            UploadSession.id == session_id,
+            UploadSession.uploader_id == uploader_id,
+            UploadSession.expires_at > datetime.utcnow()
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def claim_chunk(db: AsyncSession, upload_session: UploadSession, offset: int) -> bool:
+    """
+    offset 위치에 청크를 쓸 권리 확보 (committed_offset이 offset 그대로일 때만, commit하지 않음)
+    UPDATE가 잡은 row lock은 commit_chunk/rollback까지 유지되므로 같은 세션의 다른 청크 요청은 기다렸다가 False
+    """
+    result = await db.execute(
+        update(UploadSession)
+        .where(
+            UploadSession.id == upload_session.id,
+            UploadSession.committed_offset == offset
+        )
+        .values(expires_at=_expires_at())
+    )
+    return result.rowcount == 1
+
+
+async def commit_chunk(db: AsyncSession, upload_session: UploadSession, offset: int, written: int):
+    """claim_chunk로 확보한 청크 저장 완료 기록 (같은 트랜잭션에서 commit)"""
+    await db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_session.id)
+        .values(
+            committed_offset=offset + written,
+            chunk_count=UploadSession.chunk_count + 1
+        )
+    )
+    await db.commit()
+    await db.refresh(upload_session)
+
+
+async def delete_upload_session(db: AsyncSession, upload_session: UploadSession, remove_spool: bool = True):
+    spool_path = upload_session.spool_path
+    # 다른 요청이 이미 지운 세션이어도 실패하지 않도록 id로 삭제
+    await db.execute(delete(UploadSession).where(UploadSession.id == upload_session.id))
+    await db.commit()
+    if remove_spool:
+        await run_in_threadpool(_remove_spool_files, [spool_path])
+
+
+def _remove_stale_spool_files(max_age: int) -> int:
+    """세션 row 없이 남은 오래된 임시 파일 정리 (서버 중단 등으로 남은 파일)"""
+    removed = 0
+    now = time.time()
+    for root, _, files in os.walk(SPOOL_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+async def cleanup_expired_upload_sessions():
+    """만료된 업로드 세션과 spool 파일 정리 (maintenance 주기 작업)"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(UploadSession.id, UploadSession.spool_path).where(
+                UploadSession.expires_at <= datetime.utcnow()
+            )
+        )
+        expired = result.all()
+        if expired:
+            await db.execute(
+                delete(UploadSession).where(UploadSession.id.in_([row.id for row in expired]))
+            )
+            await db.commit()
+            await run_in_threadpool(_remove_spool_files, [row.spool_path for row in expired])
+    # 세션 TTL보다 오래된 spool 파일은 어떤 세션에도 속하지 않음
+    await run_in_threadpool(_remove_stale_spool_files, UPLOAD_SESSION_TTL_SECONDS + 3600)
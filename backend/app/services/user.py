@@ -1,6 +1,7 @@
 from app.models.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.services.principal_cache import principal_cache
 
 async def get_user_by_google_id(db: AsyncSession, google_id: str):
     result = await db.execute(
@@ -24,6 +25,8 @@ async def create_or_update_user(db: AsyncSession, userinfo: dict):
         existing_user.picture = userinfo.get("picture", existing_user.picture)
         existing_user.google_id = userinfo.get("id", existing_user.google_id)
         await db.commit()
+        # 캐시된 사용자 정보(이름, 프로필 사진)는 다음 요청에서 다시 조회
+        principal_cache.invalidate(existing_user.id)
         return existing_user
     else:
         # 새 사용자 생성
@@ -0,0 +1,182 @@
+import json
+import re
+from typing import List, Tuple
+
+# 벡터 서명 (서명 패드의 stroke 좌표) 처리
+# 저장 형식: {"width": 패드 너비, "height": 패드 높이, "color": "#000000", "line_width": 2.5,
+#            "strokes": [[[x, y], [x, y], ...], ...]}  (좌표는 패드 기준 px, 좌상단 0,0)
+
+# 한 서명에 허용하는 최대 점 개수 / stroke 개수
+MAX_VECTOR_POINTS = 20000
+MAX_VECTOR_STROKES = 500
+DEFAULT_COLOR = "#000000"
+DEFAULT_LINE_WIDTH = 2.5
+
+_COLOR_PATTERN = re.compile(r"^#[0-9a-fA-F]{6}$")
+_RGB_PATTERN = re.compile(r"^rgba?\((\d{1,3}),\s*(\d{1,3}),\s*(\d{1,3})")
+
+
+class InvalidVectorSignError(ValueError):
+    """stroke 데이터 형식 오류"""
+
+
+def _normalize_color(value) -> str:
+    if not isinstance(value, str):
+        return DEFAULT_COLOR
+    value = value.strip()
+    if _COLOR_PATTERN.match(value):
+        return value.lower()
+    # signature_pad 기본 penColor는 "rgb(0, 0, 0)" / "black"
+    match = _RGB_PATTERN.match(value)
+    if match:
+        return "#" + "".join(f"{min(int(c), 255):02x}" for c in match.groups())
+    return DEFAULT_COLOR
+
+
+def _point(value) -> Tuple[float, float]:
+    # {"x":..,"y":..,"time":..,"pressure":..} (signature_pad) 또는 [x, y]
+    if isinstance(value, dict):
+        x, y = value.get("x"), value.get("y")
+    elif isinstance(value, (list, tuple)) and len(value) >= 2:
+        x, y = value[0], value[1]
+    else:
+        raise InvalidVectorSignError("잘못된 좌표 형식입니다.")
+    if isinstance(x, bool) or isinstance(y, bool) or not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+        raise InvalidVectorSignError("좌표는 숫자여야 합니다.")
+    return round(float(x), 2), round(float(y), 2)
+
+
+def normalize_vector_sign(data: dict) -> dict:
+    """
+    클라이언트가 보낸 stroke 데이터를 저장 형식으로 정규화
+    signature_pad toData() 결과([{penColor, minWidth, maxWidth, points: [...]}, ...])와
+    점 배열의 배열([[{x, y}, ...], ...]) 모두 허용
+    """
+    if not isinstance(data, dict):
+        raise InvalidVectorSignError("벡터 서명 데이터가 필요합니다.")
+    try:
+        width = float(data.get("width"))
+        height = float(data.get("height"))
+    except (TypeError, ValueError):
+        raise InvalidVectorSignError("패드 크기(width, height)가 필요합니다.")
+    if not (0 < width <= 10000 and 0 < height <= 10000):
+        raise InvalidVectorSignError("패드 크기가 올바르지 않습니다.")
+
+    raw_strokes = data.get("strokes")
+    if not isinstance(raw_strokes, list) or not raw_strokes:
+        raise InvalidVectorSignError("stroke 데이터가 비어 있습니다.")
+    if len(raw_strokes) > MAX_VECTOR_STROKES:
+        raise InvalidVectorSignError("stroke 개수가 너무 많습니다.")
+
+    color = _normalize_color(data.get("color"))
+    line_width = data.get("line_width")
+    strokes: List[List[List[float]]] = []
+    total = 0
+    for raw in raw_strokes:
+        if isinstance(raw, dict):
+            # signature_pad 그룹: 펜 설정은 첫 stroke 기준으로 사용
+            if not strokes:
+                color = _normalize_color(raw.get("penColor", data.get("color")))
+                if line_width is None and isinstance(raw.get("minWidth"), (int, float)) and isinstance(raw.get("maxWidth"), (int, float)):
+                    line_width = (raw["minWidth"] + raw["maxWidth"]) / 2
+            points = raw.get("points")
+        else:
+            points = raw
+        if not isinstance(points, list) or not points:
+            continue
+        total += len(points)
+        if total > MAX_VECTOR_POINTS:
+            raise InvalidVectorSignError("점 개수가 너무 많습니다.")
+        strokes.append([list(_point(p)) for p in points])
+    if not strokes:
+        raise InvalidVectorSignError("stroke 데이터가 비어 있습니다.")
+
+    if not isinstance(line_width, (int, float)) or isinstance(line_width, bool) or not 0 < line_width <= 100:
+        line_width = DEFAULT_LINE_WIDTH
+    return {
+        "width": width,
+        "height": height,
+        "color": color,
+        "line_width": float(line_width),
+        "strokes": strokes,
+    }
+
+
+def dumps_vector_sign(vector: dict) -> str:
+    return json.dumps(vector, separators=(",", ":"))
+
+
+def _smoothed_segments(points: List[List[float]]):
+    """
+    점 사이 중점을 지나는 2차 베지어 곡선 → 3차 베지어 제어점 (c1, c2, end) 목록
+    시작점은 points[0]
+    """
+    segments = []
+    for i in range(1, len(points) - 1):
+        start = points[0] if i == 1 else [(points[i - 1][0] + points[i][0]) / 2, (points[i - 1][1] + points[i][1]) / 2]
+        control = points[i]
+        end = [(points[i][0] + points[i + 1][0]) / 2, (points[i][1] + points[i + 1][1]) / 2]
+        if i == len(points) - 2:
+            end = points[i + 1]
+        c1 = [start[0] + 2 / 3 * (control[0] - start[0]), start[1] + 2 / 3 * (control[1] - start[1])]
+        c2 = [end[0] + 2 / 3 * (control[0] - end[0]), end[1] + 2 / 3 * (control[1] - end[1])]
+        segments.append((c1, c2, end))
+    if len(points) == 2:
+        segments.append((points[0], points[1], points[1]))
+    return segments
+
+
+def vector_sign_svg(vector: dict) -> str:
+    """미리보기/목록용 SVG (좌표만 사용해서 생성하므로 스크립트가 들어갈 수 없음)"""
+    width, height, line_width = vector["width"], vector["height"], vector["line_width"]
+    paths = []
+    dots = []
+    for points in vector["strokes"]:
+        if len(points) == 1:
+            x, y = points[0]
+            dots.append(f'<circle cx="{x:g}" cy="{y:g}" r="{line_width / 2:g}"/>')
+            continue
+        d = [f"M{points[0][0]:g} {points[0][1]:g}"]
+        for c1, c2, end in _smoothed_segments(points):
+            d.append(f"C{c1[0]:.2f} {c1[1]:.2f} {c2[0]:.2f} {c2[1]:.2f} {end[0]:g} {end[1]:g}")
+        paths.append(f'<path d="{"".join(d)}"/>')
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{height:g}" viewBox="0 0 {width:g} {height:g}">'
+        f'<g fill="none" stroke="{vector["color"]}" stroke-width="{line_width:g}" stroke-linecap="round" stroke-linejoin="round">'
+        + "".join(paths)
+        + f'</g><g fill="{vector["color"]}">' + "".join(dots) + "</g></svg>"
+    )
+
+
+def draw_vector_sign(can, vector: dict, x: float, y: float, w: float, h: float):
+    """
+    reportlab canvas에 stroke를 PDF 경로 연산자로 그리기 (이미지 디코딩/삽입 없음)
+    (x, y, w, h)는 PDF 좌표계(좌하단 0,0)의 서명 영역
+    """
+    scale_x = w / vector["width"]
+    scale_y = h / vector["height"]
+
+    def to_pdf(point):
+        # 패드 좌표는 좌상단 기준 → PDF는 좌하단 기준
+        return x + point[0] * scale_x, y + h - point[1] * scale_y
+
+    can.saveState()
+    can.setStrokeColor(vector["color"])
+    can.setFillColor(vector["color"])
+    can.setLineWidth(vector["line_width"] * min(scale_x, scale_y))
+    can.setLineCap(1)
+    can.setLineJoin(1)
+    path = can.beginPath()
+    has_path = False
+    for points in vector["strokes"]:
+        if len(points) == 1:
+            cx, cy = to_pdf(points[0])
+            can.circle(cx, cy, vector["line_width"] * min(scale_x, scale_y) / 2, stroke=0, fill=1)
+            continue
+        path.moveTo(*to_pdf(points[0]))
+        for c1, c2, end in _smoothed_segments(points):
+            path.curveTo(*to_pdf(c1), *to_pdf(c2), *to_pdf(end))
+        has_path = True
+    if has_path:
+        can.drawPath(path, stroke=1, fill=0)
+    can.restoreState()
@@ -0,0 +1,95 @@
+"""
+서명 이미지 후처리 micro-benchmark (기존 픽셀 반복 방식 vs 밴드 연산)
+실행: backend 디렉토리에서 python -m benchmarks.sign_image [--size 1024] [--repeat 5]
+"""
+import argparse
+import base64
+import random
+import time
+from io import BytesIO
+from PIL import Image, ImageDraw
+from app.services.sign_image import _background_mask, _open_rgba, png_data_url, process_sign_image
+
+
+def legacy_set_white_bg_and_b64(image_bytes, threshold=220):
+    """변경 전 app/routers/signs.py의 구현 (기준선)"""
+    img = Image.open(BytesIO(image_bytes)).convert("RGBA")
+    datas = img.getdata()
+    newData = []
+    for item in datas:
+        if item[0] > threshold and item[1] > threshold and item[2] > threshold:
+            newData.append((255, 255, 255, 255))
+        else:
+            newData.append(item)
+    img.putdata(newData)
+    output = BytesIO()
+    img.save(output, format="PNG")
+    b64_str = base64.b64encode(output.getvalue()).decode("utf-8")
+    return f"data:image/png;base64,{b64_str}"
+
+
+def set_white_bg_and_b64(image_bytes, threshold=220):
+    """기준선과 같은 결과를 밴드 연산으로 (process_sign_image의 배경 처리 단계만, 자르기/축소 없이)"""
+    img = _open_rgba(image_bytes)
+    img.paste((255, 255, 255, 255), mask=_background_mask(img, threshold))
+    output = BytesIO()
+    img.save(output, format="PNG")
+    return png_data_url(output.getvalue())
+
+
+def sample_image(size: int) -> bytes:
+    """모델이 돌려주는 이미지와 비슷한 입력: 약간 얼룩진 밝은 배경 + 가운데 손글씨 획"""
+    rng = random.Random(0)
+    img = Image.new("RGB", (size, size), (250, 250, 250))
+    draw = ImageDraw.Draw(img)
+    for _ in range(size * 4):
+        x, y = rng.randrange(size), rng.randrange(size)
+        shade = rng.randint(225, 245)
+        draw.point((x, y), fill=(shade, shade, shade))
+    points = [(size * 0.2 + i * size * 0.012, size * 0.5 + rng.uniform(-1, 1) * size * 0.08) for i in range(50)]
+    draw.line(points, fill=(20, 20, 30), width=max(2, size // 150), joint="curve")
+    output = BytesIO()
+    img.save(output, format="PNG")
+    return output.getvalue()
+
+
+def bench(fn, data: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = sample_image(args.size)
+    legacy = legacy_set_white_bg_and_b64(data)
+    current = set_white_bg_and_b64(data)
+    legacy_pixels = Image.open(BytesIO(base64.b64decode(legacy.split(",")[1]))).tobytes()
+    current_pixels = Image.open(BytesIO(base64.b64decode(current.split(",")[1]))).tobytes()
+    print(f"input {args.size}x{args.size}, {len(data)} bytes")
+    print(f"set_white_bg_and_b64 결과 픽셀 동일: {legacy_pixels == current_pixels}")
+
+    rows = [
+        ("legacy (getdata loop)", lambda d: legacy_set_white_bg_and_b64(d), len(legacy)),
+        ("set_white_bg_and_b64 (band ops)", lambda d: set_white_bg_and_b64(d), len(current)),
+    ]
+    pipeline = process_sign_image(data, "white")
+    rows.append(("process_sign_image white", lambda d: process_sign_image(d, "white"), len(pipeline)))
+    transparent = process_sign_image(data, "transparent")
+    rows.append(("process_sign_image transparent", lambda d: process_sign_image(d, "transparent"), len(transparent)))
+
+    for label, fn, size in rows:
+        seconds = bench(fn, data, args.repeat)
+        print(f"{label:34s} {seconds * 1000:9.1f} ms  output {size:>9d} bytes")
+    print(f"process_sign_image 출력 크기: {Image.open(BytesIO(pipeline)).size}")
+
+
+if __name__ == "__main__":
+    main()
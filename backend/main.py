@@ -1,10 +1,18 @@
 
 
 from fastapi import FastAPI
-from app.routers import auth, upload, documents, signs, resources
+from app.routers import auth, upload, documents, signs, resources, metrics
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.db import init_db
+from app.services import maintenance
+from app.services.upload_session import cleanup_expired_upload_sessions
+from app.services.blob import purge_released_blobs
+from app.services.sign_cache import evict_generated_signs
+from app.services.mail import mail_outbox
+from app.services.signing import signing_coordinator
+from app.services.google_oauth import google_oauth
+from app.services import stamping
 import uvicorn
 import os
 
@@ -18,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,  # 이게 중요!
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 목록 API 다음 페이지 커서
 )
 
 if __name__ == "__main__":
@@ -30,7 +39,27 @@ app.include_router(upload.router)
 app.include_router(documents.router)
 app.include_router(signs.router)
 app.include_router(resources.router)
+app.include_router(metrics.router)
+
+# 주기 정리 작업 등록
+maintenance.register(cleanup_expired_upload_sessions)
+maintenance.register(purge_released_blobs)
+maintenance.register(evict_generated_signs)
+
 @app.on_event("startup")
 async def startup_event():
     await init_db()
-    print("Database initialized successfully!")
\ No newline at end of file
+    print("Database initialized successfully!")
+    # 만료된 업로드 세션 등 주기 정리 작업 시작
+    maintenance.start()
+    # 메일 발송 워커 시작
+    await mail_outbox.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await maintenance.stop()
+    await mail_outbox.stop()
+    await google_oauth.aclose()
+    # 진행 중인 서명 합성을 끝낸 뒤 프로세스 풀 종료
+    await signing_coordinator.stop()
+    stamping.shutdown()
\ No newline at end of file
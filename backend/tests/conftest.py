@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# app.db는 import 시점에 DATABASE_URL로 엔진을 만듦 → 테스트는 임시 SQLite 사용 (.env보다 우선)
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.gettempdir()}/sign2gether-test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("STORAGE_ROOT", f"{tempfile.gettempdir()}/sign2gether-test-resources")
@@ -0,0 +1,135 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import auth
+from app.services import google_oauth as google_oauth_module
+from app.services.google_oauth import (
+    GOOGLE_TOKEN_URL, GOOGLE_USERINFO_URL, GoogleOAuthClient, GoogleOAuthError
+)
+
+TOKEN = {"access_token": "at-1", "token_type": "Bearer", "expires_in": 3599}
+USER = {"id": "g-1", "email": "hong@example.com", "name": "홍길동", "picture": None}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(google_oauth_module, "OAUTH_RETRY_BASE_SECONDS", 0)
+
+
+class Google:
+    """URL별로 미리 정한 응답을 차례로 돌려주는 MockTransport handler (받은 요청은 requests에 기록)"""
+
+    def __init__(self, responses):
+        self.responses = {url: list(items) for url, items in responses.items()}
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        url = str(request.url.copy_with(query=None))
+        return self.responses[url].pop(0)
+
+    def client(self, **kwargs) -> GoogleOAuthClient:
+        return GoogleOAuthClient(transport=httpx.MockTransport(self), **kwargs)
+
+
+def _run(coro_factory, client: GoogleOAuthClient):
+    async def scenario():
+        try:
+            return await coro_factory(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(scenario())
+
+
+def _exchange(client: GoogleOAuthClient):
+    return client.exchange_code("code-1", "client-id", "client-secret", "https://example.com/callback")
+
+
+def test_exchange_code_posts_authorization_code():
+    google = Google({GOOGLE_TOKEN_URL: [httpx.Response(200, json=TOKEN)]})
+
+    token = _run(_exchange, google.client())
+
+    assert token == TOKEN
+    request = google.requests[0]
+    assert request.method == "POST"
+    form = parse_qs(request.content.decode())
+    assert form["code"] == ["code-1"]
+    assert form["grant_type"] == ["authorization_code"]
+    assert form["redirect_uri"] == ["https://example.com/callback"]
+
+
+def test_exchange_code_retries_rate_limited_request():
+    google = Google({GOOGLE_TOKEN_URL: [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json=TOKEN),
+    ]})
+
+    assert _run(_exchange, google.client())["access_token"] == "at-1"
+    assert len(google.requests) == 2
+
+
+def test_exchange_code_does_not_retry_bad_gateway():
+    # 게이트웨이 오류는 인가 코드가 이미 사용됐을 수 있으므로 다시 보내지 않음
+    google = Google({GOOGLE_TOKEN_URL: [httpx.Response(502), httpx.Response(200, json=TOKEN)]})
+
+    with pytest.raises(GoogleOAuthError):
+        _run(_exchange, google.client())
+    assert len(google.requests) == 1
+
+
+def test_exchange_code_does_not_wait_for_long_retry_after():
+    google = Google({GOOGLE_TOKEN_URL: [httpx.Response(429, headers={"Retry-After": "3600"})]})
+
+    with pytest.raises(GoogleOAuthError):
+        _run(_exchange, google.client())
+    assert len(google.requests) == 1
+
+
+def test_fetch_userinfo_retries_bad_gateway():
+    google = Google({GOOGLE_USERINFO_URL: [httpx.Response(502), httpx.Response(200, json=USER)]})
+
+    user_info = _run(lambda client: client.fetch_userinfo("at-1"), google.client())
+
+    assert user_info["email"] == "hong@example.com"
+    assert len(google.requests) == 2
+    assert google.requests[0].headers["Authorization"] == "Bearer at-1"
+
+
+def test_retries_stop_at_max_attempts():
+    google = Google({GOOGLE_USERINFO_URL: [httpx.Response(503)] * 3})
+
+    with pytest.raises(GoogleOAuthError):
+        _run(lambda client: client.fetch_userinfo("at-1"), google.client(max_attempts=3))
+    assert len(google.requests) == 3
+
+
+def test_non_json_response_raises_oauth_error():
+    google = Google({GOOGLE_TOKEN_URL: [
+        httpx.Response(200, text="<html>proxy error</html>", headers={"Content-Type": "text/html"})
+    ]})
+
+    with pytest.raises(GoogleOAuthError):
+        _run(_exchange, google.client())
+
+
+@pytest.mark.parametrize("responses", [
+    {GOOGLE_TOKEN_URL: [httpx.Response(502)]},
+    {GOOGLE_TOKEN_URL: [httpx.Response(200, text="not json")]},
+    {GOOGLE_TOKEN_URL: [httpx.Response(200, json=TOKEN)], GOOGLE_USERINFO_URL: [httpx.Response(401)]},
+], ids=["token-502", "token-not-json", "userinfo-401"])
+def test_callback_maps_google_failures_to_bad_gateway(monkeypatch, responses):
+    monkeypatch.setattr(auth, "google_oauth", Google(responses).client())
+    app = FastAPI()
+    app.include_router(auth.router)
+
+    response = TestClient(app).get("/auth/google/callback", params={"code": "code-1"}, follow_redirects=False)
+
+    assert response.status_code == 502
+    assert response.json() == {"detail": "구글 로그인에 실패했습니다. 잠시 후 다시 시도해주세요."}
+    assert "access_token" not in response.cookies
@@ -0,0 +1,118 @@
+import asyncio
+import socketserver
+import threading
+from email import message_from_bytes, policy
+
+import pytest
+
+from app.services.mail import MailOutbox
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """EHLO/MAIL/RCPT/DATA/QUIT만 처리하는 최소 SMTP 서버 (받은 메일은 server.messages에 저장)"""
+
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self._reply("220 localhost stub")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 localhost")
+            elif verb == "MAIL":
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip("<> ")
+                if address in self.server.refused:
+                    self._reply("550 no such user")
+                else:
+                    recipients.append(address)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 end with .")
+                data = b""
+                while True:
+                    line = self.rfile.readline()
+                    if line in (b".\r\n", b""):
+                        break
+                    data += line[1:] if line.startswith(b"..") else line
+                self.server.messages.append((recipients, data))
+                self._reply("250 queued")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("502 not implemented")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.messages = []
+    server.refused = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _outbox(server) -> MailOutbox:
+    host, port = server.server_address
+    return MailOutbox(
+        host=host,
+        port=port,
+        username=None,
+        password=None,
+        starttls=False,
+        sender="noreply@example.com",
+        workers=1,
+        retry_base_seconds=0.01,
+    )
+
+
+async def _send_sign_requests(outbox: MailOutbox, emails, names, filename: str):
+    await outbox.start()
+    queued = outbox.enqueue_sign_requests(emails, names, filename, "https://example.com/sign/1")
+    await outbox.stop(drain_timeout=5)
+    return queued
+
+
+def test_sign_request_subject_is_not_html_escaped(smtp_server):
+    outbox = _outbox(smtp_server)
+    queued = asyncio.run(_send_sign_requests(outbox, ["hong@example.com"], ["홍길동"], "R&D <계약서>.pdf"))
+
+    assert queued == 1
+    assert outbox.stats()["sent"] == 1
+    recipients, data = smtp_server.messages[0]
+    assert recipients == ["hong@example.com"]
+    message = message_from_bytes(data, policy=policy.default)
+    assert message["Subject"] == "sign2gether에서 함께 서명하세요. 문서명: R&D <계약서>.pdf"
+    # 본문(HTML)은 escape
+    html = message.get_body(("html",)).get_content()
+    assert "R&amp;D &lt;계약서&gt;.pdf" in html
+    assert "홍길동님" in html
+
+
+def test_refused_recipient_is_not_retried(smtp_server):
+    smtp_server.refused.add("nobody@example.com")
+    outbox = _outbox(smtp_server)
+    asyncio.run(_send_sign_requests(
+        outbox, ["nobody@example.com", "hong@example.com"], ["없음", "홍길동"], "계약서.pdf"
+    ))
+
+    stats = outbox.stats()
+    assert stats["failed"] == 1
+    assert stats["retried"] == 0
+    assert stats["sent"] == 1
+    assert [recipients for recipients, _ in smtp_server.messages] == [["hong@example.com"]]
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.db import AsyncSessionLocal, engine, init_db
+from app.models import GeneratedSign
+from app.services import sign_cache
+from app.services.sign_generation import SignGenerator, StubSignProvider
+
+USER_ID = 1
+STYLE = "ballpoint"
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = StubSignProvider(delay=0.2)
+    monkeypatch.setattr(sign_cache, "sign_generator", SignGenerator(provider, concurrency=2, queue_max=2))
+    monkeypatch.setattr(sign_cache, "SIGN_PREGENERATE_POOL", 1)
+    return provider
+
+
+def _run(scenario):
+    async def wrapper():
+        await init_db()
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(GeneratedSign))
+            await db.commit()
+        try:
+            return await scenario()
+        finally:
+            await engine.dispose()
+    return asyncio.run(wrapper())
+
+
+async def _request(name: str):
+    async with AsyncSessionLocal() as db:
+        return await sign_cache.get_generated_sign(db, USER_ID, name, STYLE)
+
+
+async def _wait_refills():
+    while sign_cache._refills:
+        await asyncio.gather(*sign_cache._refills.values())
+
+
+def test_refill_does_not_share_generation_with_user_request(provider):
+    async def scenario():
+        # 비어 있는 pool을 채우는 중에 같은 이름으로 사용자 요청
+        sign_cache.schedule_refill(USER_ID, "홍길동", STYLE)
+        first, first_cached = await _request("홍길동")
+        await _wait_refills()
+        second, second_cached = await _request("홍길동")
+        await _wait_refills()
+        return first, first_cached, second, second_cached
+
+    first, first_cached, second, second_cached = _run(scenario)
+
+    assert first_cached is False
+    # 다음 요청은 미리 만들어 둔 variant로 응답하고, 방금 보여준 이미지가 아님
+    assert second_cached is True
+    assert second != first
+    assert provider.calls >= 2
+
+
+def test_duplicate_variant_served_to_user_leaves_the_ready_pool(provider):
+    async def scenario():
+        png = b"same-image"
+        assert await sign_cache._store_variant(USER_ID, "홍길동", STYLE, png, served=False) is not None
+        assert await sign_cache._store_variant(USER_ID, "홍길동", STYLE, png, served=True) is None
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(GeneratedSign))
+            return list(result.scalars().all())
+
+    variants = _run(scenario)
+
+    assert len(variants) == 1
+    assert variants[0].served_at is not None
@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.dependencies.database import get_db
+from app.routers import signs
+from app.routers.auth import get_current_user_from_cookie
+from app.services.sign_generation import (
+    SIGN_GENERATION_RETRY_AFTER_SECONDS, SignGenerationBusyError, SignGenerationTimeoutError,
+    SignGenerator, StubSignProvider
+)
+
+
+def test_same_name_is_generated_once():
+    provider = StubSignProvider(delay=0.2)
+    generator = SignGenerator(provider, concurrency=2, queue_max=2)
+
+    async def scenario():
+        # 공백만 다른 이름도 같은 요청으로 봄
+        names = ["홍길동", "홍길동", " 홍길동 ", "홍길동", "홍길동"]
+        return await asyncio.gather(*(generator.generate(name) for name in names))
+
+    results = asyncio.run(scenario())
+
+    assert provider.calls == 1
+    assert len(set(results)) == 1
+    stats = generator.stats()
+    assert stats["coalesced"] == 4
+    assert stats["generated"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_different_styles_are_not_coalesced():
+    provider = StubSignProvider(delay=0.1)
+    generator = SignGenerator(provider, concurrency=2, queue_max=2)
+
+    async def scenario():
+        return await asyncio.gather(generator.generate("홍길동", "ballpoint"), generator.generate("홍길동", "marker"))
+
+    asyncio.run(scenario())
+    assert provider.calls == 2
+
+
+def test_different_flights_are_not_coalesced():
+    provider = StubSignProvider(delay=0.1)
+    generator = SignGenerator(provider, concurrency=2, queue_max=2)
+
+    async def scenario():
+        return await asyncio.gather(generator.generate("홍길동"), generator.generate("홍길동", flight="refill:1"))
+
+    first, second = asyncio.run(scenario())
+    assert provider.calls == 2
+    assert first != second
+
+
+def test_requests_over_queue_limit_are_shed():
+    provider = StubSignProvider(delay=0.3)
+    generator = SignGenerator(provider, concurrency=1, queue_max=1)
+
+    async def scenario():
+        running = [asyncio.create_task(generator.generate(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        with pytest.raises(SignGenerationBusyError) as busy:
+            await generator.generate("c")
+        # 진행 중인 이름은 자리가 없어도 결과를 함께 받음
+        shared = await generator.generate("a")
+        await asyncio.gather(*running)
+        return busy.value, shared
+
+    busy, shared = asyncio.run(scenario())
+
+    assert busy.retry_after == SIGN_GENERATION_RETRY_AFTER_SECONDS
+    assert shared
+    assert provider.calls == 2
+    assert generator.stats()["shed"] == 1
+
+
+def test_timeout_releases_the_slot():
+    provider = StubSignProvider(delay=1)
+    generator = SignGenerator(provider, concurrency=1, queue_max=0, timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(SignGenerationTimeoutError):
+            await generator.generate("a")
+        provider.delay = 0
+        return await generator.generate("b")
+
+    assert asyncio.run(scenario())
+    assert generator.stats()["timeouts"] == 1
+
+
+@pytest.fixture
+def generate_client(monkeypatch):
+    """/signs/generate를 StubSignProvider로 호출하는 클라이언트 (생성 결과 보관 없이 생성기만 사용)"""
+    generator = SignGenerator(StubSignProvider(delay=0.5), concurrency=1, queue_max=0, timeout=5)
+
+    async def get_generated_sign(db, user_id, name, style):
+        return await generator.generate(name, style), False
+
+    monkeypatch.setattr(signs, "get_generated_sign", get_generated_sign)
+    app = FastAPI()
+    app.include_router(signs.router)
+    app.dependency_overrides[get_current_user_from_cookie] = lambda: {"id": 1}
+    app.dependency_overrides[get_db] = lambda: None
+    with TestClient(app) as client:
+        yield client, generator
+
+
+def test_generate_endpoint_sheds_with_retry_after(generate_client):
+    client, generator = generate_client
+    # 앱의 이벤트 루프에서 생성 하나를 진행시켜 자리를 채움
+    running = client.portal.start_task_soon(generator.generate, "a")
+    while generator.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+
+    response = client.get("/signs/generate/b")
+    running.result()
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(SIGN_GENERATION_RETRY_AFTER_SECONDS)
+
+
+def test_generate_endpoint_maps_timeout_to_504(generate_client):
+    client, generator = generate_client
+    generator.timeout = 0.05
+
+    response = client.get("/signs/generate/a")
+
+    assert response.status_code == 504
+
+
+def test_generate_endpoint_returns_png(generate_client):
+    client, _ = generate_client
+
+    response = client.get("/signs/generate/홍길동", params={"style": "marker"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sign_base64"].startswith("data:image/png;base64,")
+    assert body["cached"] is False
@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import io
+import os
+import time
+
+import pikepdf
+import pytest
+from PIL import Image
+from PyPDF2 import PdfReader
+from reportlab.pdfgen import canvas
+
+from app.services import stamping
+from app.services.stamping import StampJob, StampTimeoutError, run_in_pool, stamp_pdf
+
+
+def _wait_exited(pid: int, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def stamp_pool():
+    yield
+    stamping.shutdown()
+
+
+def test_run_in_pool_timeout_terminates_worker(stamp_pool):
+    async def scenario():
+        first_pid = await run_in_pool(os.getpid)
+        with pytest.raises(StampTimeoutError):
+            await run_in_pool(time.sleep, 30, timeout=0.5)
+        # 시간 초과한 작업의 워커는 종료되고, 다음 작업은 새 풀에서 실행
+        return first_pid, await run_in_pool(os.getpid)
+
+    started = time.monotonic()
+    first_pid, next_pid = asyncio.run(scenario())
+    assert next_pid != first_pid
+    assert time.monotonic() - started < 25
+    assert _wait_exited(first_pid)
+
+
+def test_run_in_pool_retries_jobs_of_a_retired_pool(stamp_pool, monkeypatch):
+    monkeypatch.setattr(stamping, "STAMP_POOL_SIZE", 2)
+
+    async def scenario():
+        await run_in_pool(os.getpid)
+        # 같은 풀에서 실행 중인 작업이 있을 때 다른 작업이 시간 초과
+        survivor = asyncio.create_task(run_in_pool(time.sleep, 1, timeout=20))
+        await asyncio.sleep(0.2)
+        with pytest.raises(StampTimeoutError):
+            await run_in_pool(time.sleep, 30, timeout=0.5)
+        return await survivor
+
+    assert asyncio.run(scenario()) is None
+
+
+def _source_pdf(path, object_streams: bool, pages: int = 3):
+    buffer = io.BytesIO()
+    can = canvas.Canvas(buffer)
+    for i in range(pages):
+        can.drawString(100, 700, f"page {i + 1}")
+        can.showPage()
+    can.save()
+    with pikepdf.open(io.BytesIO(buffer.getvalue())) as pdf:
+        mode = pikepdf.ObjectStreamMode.generate if object_streams else pikepdf.ObjectStreamMode.disable
+        pdf.save(path, object_stream_mode=mode)
+
+
+def _sign_payload() -> str:
+    img = Image.new("RGBA", (60, 20), (0, 0, 0, 0))
+    img.paste((20, 20, 160, 255), (5, 5, 55, 15))
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(output.getvalue()).decode()
+
+
+@pytest.mark.parametrize("object_streams", [False, True], ids=["xref-table", "xref-stream"])
+def test_incremental_stamp_appends_valid_update(tmp_path, object_streams):
+    source = tmp_path / "source.pdf"
+    output = tmp_path / "signed.pdf"
+    _source_pdf(source, object_streams)
+    sign = {"num_page": 2, "x": 10, "y": 10, "width": 30, "height": 10, "base64": _sign_payload()}
+
+    stamped = stamp_pdf(StampJob(str(source), str(output), signs=[sign], mode="incremental"))
+
+    assert stamped == 1
+    original, signed = source.read_bytes(), output.read_bytes()
+    # 전체 다시 쓰기로 넘어가지 않고 원본 바이트 뒤에 덧붙임
+    assert signed.startswith(original)
+    appended = signed[len(original):]
+    assert (b"/Type /XRef" in appended) == object_streams
+    assert (b"\nxref\n" in appended) != object_streams
+
+    with pikepdf.open(source) as pdf:
+        original_contents = [page.Contents.read_bytes() for page in pdf.pages]
+    with pikepdf.open(output) as pdf:
+        assert pdf.check_pdf_syntax() == []
+        assert pdf.get_warnings() == []
+        assert len(pdf.pages) == 3
+        assert "/S2gSign0" in pdf.pages[1].Resources.XObject
+        assert "/XObject" not in pdf.pages[0].Resources
+        # 새 객체 번호가 기존 객체와 겹치지 않음 (원본 페이지 내용이 그대로)
+        assert pdf.pages[0].Contents.read_bytes() == original_contents[0]
+        assert [stream.read_bytes() for stream in pdf.pages[1].Contents][1] == original_contents[1]
+
+    reader = PdfReader(str(output))
+    assert len(reader.pages) == 3
+    assert "page 2" in reader.pages[1].extract_text()
+
+
+def test_incremental_stamp_can_be_stamped_again(tmp_path):
+    source = tmp_path / "source.pdf"
+    once = tmp_path / "once.pdf"
+    twice = tmp_path / "twice.pdf"
+    _source_pdf(source, object_streams=True)
+    sign = {"num_page": 1, "x": 10, "y": 10, "width": 30, "height": 10, "base64": _sign_payload()}
+
+    stamp_pdf(StampJob(str(source), str(once), signs=[sign], mode="incremental"))
+    stamp_pdf(StampJob(str(once), str(twice), signs=[{**sign, "num_page": 3}], mode="incremental"))
+
+    assert twice.read_bytes().startswith(once.read_bytes())
+    with pikepdf.open(twice) as pdf:
+        assert pdf.check_pdf_syntax() == []
+        assert pdf.get_warnings() == []
+        assert "/S2gSign0" in pdf.pages[0].Resources.XObject
+        assert "/S2gSign0" in pdf.pages[2].Resources.XObject
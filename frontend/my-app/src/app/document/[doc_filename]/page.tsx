@@ -6,7 +6,7 @@ import { Minus, Plus, RotateCw, ChevronLeft, ChevronRight, X } from "lucide-reac
 import { Button } from "@/components/ui/button"
 import { motion, AnimatePresence } from "framer-motion"
 import { UploadedFile, ZoomState, PanState, SignatureImage, ResizeInfo, PreviewType } from "@/types/fileUpload"
-import { getDocument, getDocumentSigners, updateSignerStatus } from '@/services/document'
+import { getDocument, getDocumentView, updateSignerStatus } from '@/services/document'
 import { API_CONFIG } from "@/constants/api"
 
 export default function DocSignPage() {
@@ -95,7 +95,7 @@ export default function DocSignPage() {
           setTimeout(async () => {
             try {
               setPreviewType(null);
-              const fileUrl = `${API_CONFIG.BACKEND_URL}${updatedDoc.file_url}?t=${Date.now()}`;
+              const fileUrl = `${API_CONFIG.BACKEND_URL}${updatedDoc.file_url}`; // revision마다 URL이 바뀌므로 캐시 우회 불필요
               const res = await fetch(fileUrl);
               if (!res.ok) throw new Error('파일을 불러올 수 없습니다.');
               const blob = await res.blob();
@@ -144,11 +144,9 @@ export default function DocSignPage() {
     setLoading(true);
     setError(null);
     
-    Promise.all([
-      getDocument(doc_filename),
-      getDocumentSigners(doc_filename)
-    ])
-      .then(([docData, signersData]) => {
+    getDocumentView(doc_filename)
+      .then((docData) => {
+        const signersData = docData.signers;
         setDocument(docData);
         setSigners(signersData);
         
@@ -170,7 +168,7 @@ export default function DocSignPage() {
       setLoading(true);
       setErrorMsg(null);
       
-      const fileUrl = `${API_CONFIG.BACKEND_URL}${document.file_url}?t=${Date.now()}`;
+      const fileUrl = `${API_CONFIG.BACKEND_URL}${document.file_url}`; // revision마다 URL이 바뀌므로 캐시 우회 불필요
       
       fetch(fileUrl)
         .then(res => {
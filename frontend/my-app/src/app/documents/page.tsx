@@ -1,7 +1,7 @@
 "use client"
 
 import React, { useEffect, useState, useRef } from 'react';
-import { getMyDocuments, deleteDocument, getDocumentSigners } from '@/services/document';
+import { getMyDocuments, deleteDocument } from '@/services/document';
 import gsap from 'gsap';
 
 function truncateFileName(name: string, maxLength = 30) {
@@ -14,6 +14,8 @@ export default function DocumentsPage() {
   const [error, setError] = useState<string | null>(null);
   const [deleting, setDeleting] = useState<string | null>(null);
   const [signerStatus, setSignerStatus] = useState<{ [doc_filename: string]: { total: number, signed: number } }>({});
+  const [nextCursor, setNextCursor] = useState<string | undefined>(undefined);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // 카드 refs
   const cardRefs = useRef<(HTMLDivElement | null)[]>([]);
@@ -97,30 +99,38 @@ export default function DocumentsPage() {
     }
   }, [titleIdx, loading, error]);
 
+  // 받아온 페이지의 문서를 목록 뒤에 붙임 (서명 진행 상황은 목록 응답에 포함됨, 문서마다 signer 목록을 따로 조회하지 않음)
+  const appendPage = (page: { documents: any[], nextCursor?: string }) => {
+    setDocuments((docs) => [...docs, ...page.documents]);
+    setSignerStatus((status) => {
+      const statusObj = { ...status };
+      page.documents.forEach((doc: any) => {
+        statusObj[doc.doc_filename] = { total: doc.signer_count, signed: doc.signed_count };
+      });
+      return statusObj;
+    });
+    setNextCursor(page.nextCursor);
+  };
+
   useEffect(() => {
     getMyDocuments()
-      .then(async (docs) => {
-        setDocuments(docs);
-        const statusObj: { [doc_filename: string]: { total: number, signed: number } } = {};
-        await Promise.all(
-          docs.map(async (doc: any) => {
-            try {
-              const signers = await getDocumentSigners(doc.doc_filename);
-              statusObj[doc.doc_filename] = {
-                total: signers.length,
-                signed: signers.filter((s: any) => s.is_signed).length,
-              };
-            } catch {
-              statusObj[doc.doc_filename] = { total: 0, signed: 0 };
-            }
-          })
-        );
-        setSignerStatus(statusObj);
-      })
+      .then(appendPage)
       .catch(() => setError("로그인이 필요합니다."))
       .finally(() => setLoading(false));
   }, []);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      appendPage(await getMyDocuments(nextCursor));
+    } catch {
+      alert('문서 목록을 불러오지 못했습니다.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (doc_filename: string) => {
     setDeleting(doc_filename);
     try {
@@ -237,6 +247,17 @@ export default function DocumentsPage() {
             </div>
           ))
         )}
+        {nextCursor && (
+          <div className="flex justify-center pt-4">
+            <button
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="px-6 py-2 bg-white text-black rounded-full hover:bg-gray-200 text-base font-bold"
+            >
+              {loadingMore ? '불러오는 중...' : '더 보기'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
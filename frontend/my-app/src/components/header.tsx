@@ -239,13 +239,32 @@ export default function Header() {
 
 function MySignThumbnails({ refreshKey }: { refreshKey?: number }) {
   const [signs, setSigns] = useState<any[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | undefined>(undefined);
 
   useEffect(() => {
     getMySigns()
-      .then(setSigns)
-      .catch(() => setSigns([]));
+      .then((page) => {
+        setSigns(page.signs);
+        setNextCursor(page.nextCursor);
+      })
+      .catch(() => {
+        setSigns([]);
+        setNextCursor(undefined);
+      });
   }, [refreshKey]);
 
+  // 다음 페이지는 "더 보기"를 눌렀을 때만 요청
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      const page = await getMySigns(nextCursor);
+      setSigns(signs => [...signs, ...page.signs]);
+      setNextCursor(page.nextCursor);
+    } catch {
+      alert('서명 목록을 불러오지 못했습니다.');
+    }
+  };
+
   if (signs.length === 0) return null;
 
   return (
@@ -288,6 +307,15 @@ function MySignThumbnails({ refreshKey }: { refreshKey?: number }) {
           </button>
         </div>
       ))}
+      {nextCursor && (
+        <button
+          onClick={loadMore}
+          className="self-start h-12 px-3 text-white text-sm border border-white rounded hover:bg-white hover:text-black"
+          title="서명 더 보기"
+        >
+          더 보기
+        </button>
+      )}
     </div>
   );
 }
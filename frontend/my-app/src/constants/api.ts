@@ -14,10 +14,13 @@ export const API_ENDPOINTS = {
     PDF_UPLOAD: '/upload/docs/pdf',
     GET_DOCUMENT: '/documents/{doc_filename}',
     GET_SIGNERS: '/documents/{doc_filename}/signer',
+    GET_DOCUMENT_VIEW: '/documents/{doc_filename}/view', // 문서 정보 + 서명자 목록 + 진행 상황
     UPDATE_SIGNER_STATUS: '/documents/{doc_filename}/signer/{signer_id}',
     GET_MY_DOCUMENTS: '/documents/',
     DELETE_DOCUMENT: '/documents/{doc_filename}',
     UPLOAD_SIGN_DRAW: '/upload/sign/draw',
+    UPLOAD_SIGN_DRAW_BINARY: '/upload/sign/draw/binary', // PNG 바이너리 업로드
+    UPLOAD_SIGN_DRAW_VECTOR: '/upload/sign/draw/vector', // 벡터(stroke) 서명 업로드
   },
   SIGNS: {
     DELETE_SIGN: '/signs/{sign_filename}',
@@ -15,6 +15,21 @@ export async function getDocument(doc_filename: string) {
   return data;
 }
 
+// 문서 정보, 서명자 목록, 서명 진행 상황을 한 번에 조회
+export async function getDocumentView(doc_filename: string) {
+  const res = await fetch(
+    API_CONFIG.BACKEND_URL + API_ENDPOINTS.DOCS.GET_DOCUMENT_VIEW.replace('{doc_filename}', doc_filename),
+    {
+      method: "GET",
+      credentials: "include",
+    }
+  );
+
+  const data = await res.json();
+  if (!res.ok) throw new Error(data.detail || "문서 조회 실패");
+  return data;
+}
+
 export async function getDocumentSigners(doc_filename: string) {
   const res = await fetch(
     API_CONFIG.BACKEND_URL + API_ENDPOINTS.DOCS.GET_SIGNERS.replace('{doc_filename}', doc_filename),
@@ -50,9 +65,11 @@ export async function updateSignerStatus(doc_filename: string, signer_id: number
   return data;
 } 
 
-export async function getMyDocuments() {
-  const res = await axios.get(API_ENDPOINTS.DOCS.GET_MY_DOCUMENTS);
-  return res.data;
+// 목록은 페이지 단위로 내려옴 (다음 페이지 커서는 X-Next-Cursor 헤더, 마지막 페이지면 없음)
+// 첫 페이지만 받고, 다음 페이지는 화면에서 필요할 때 nextCursor로 요청
+export async function getMyDocuments(cursor?: string, status?: 'completed' | 'pending') {
+  const res = await axios.get(API_ENDPOINTS.DOCS.GET_MY_DOCUMENTS, { params: { cursor, status } });
+  return { documents: res.data, nextCursor: res.headers['x-next-cursor'] as string | undefined };
 } 
 
 export async function deleteDocument(doc_filename: string) {
@@ -61,6 +78,16 @@ export async function deleteDocument(doc_filename: string) {
 } 
 
 export async function uploadSignDraw(imageData: string) {
-  const res = await axios.post(API_ENDPOINTS.DOCS.UPLOAD_SIGN_DRAW, { image: imageData });
+  // data URL을 PNG 바이너리로 변환해서 전송 (base64 JSON보다 전송량이 작음)
+  const png = await (await fetch(imageData)).blob();
+  const res = await axios.post(API_ENDPOINTS.DOCS.UPLOAD_SIGN_DRAW_BINARY, png, {
+    headers: { "Content-Type": "image/png" },
+  });
   return res.data;
-} 
\ No newline at end of file
+}
+
+// 서명 패드 toData() 결과를 그대로 전송 (PNG 대신 좌표만 저장, 문서에는 벡터 경로로 삽입)
+export async function uploadSignVector(strokes: unknown[], width: number, height: number) {
+  const res = await axios.post(API_ENDPOINTS.DOCS.UPLOAD_SIGN_DRAW_VECTOR, { strokes, width, height });
+  return res.data;
+}
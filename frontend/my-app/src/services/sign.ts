@@ -5,9 +5,10 @@ export interface GenerateSignResponse {
   sign_base64: string;
 }
 
-export async function getMySigns() {
-  const res = await axios.get('/signs/');
-  return res.data;
+// 첫 페이지만 받고, 다음 페이지는 필요할 때 nextCursor(X-Next-Cursor 헤더)로 요청
+export async function getMySigns(cursor?: string) {
+  const res = await axios.get('/signs/', { params: { cursor } });
+  return { signs: res.data, nextCursor: res.headers['x-next-cursor'] as string | undefined };
 }
 
 export async function deleteSign(sign_filename: string) {
@@ -15,8 +16,8 @@ export async function deleteSign(sign_filename: string) {
   return res.data;
 }
 
-// 문서에 서명 이미지 삽입
-export async function insertSignToDocument(doc_filename: string, signer_id: number, signs: Array<{base64: string, x: number, y: number, width: number, height: number, num_page: number}>) {
+// 문서에 서명 삽입 (PNG base64, 벡터 stroke 또는 저장된 벡터 서명 파일명)
+export async function insertSignToDocument(doc_filename: string, signer_id: number, signs: Array<{base64?: string, strokes?: {width: number, height: number, strokes: unknown[]}, sign_filename?: string, x: number, y: number, width: number, height: number, num_page: number}>) {
   const res = await axios.post(`/documents/${doc_filename}/sign/${signer_id}`, signs);
   return res.data;
 } 